@@ -0,0 +1,294 @@
+import hmac                                     # HMAC untuk algoritma simetris (HS*)
+import hashlib                                  # Fungsi hash SHA-2
+
+from functools import lru_cache                 # Cache signer HMAC per (secret, algoritma)
+
+try:
+    # cryptography hanya dibutuhkan untuk algoritma asimetris (RS/PS/ES/EdDSA)
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed448, ed25519, padding, rsa
+    from cryptography.hazmat.primitives.asymmetric.utils import (decode_dss_signature,
+                                                                 encode_dss_signature)
+except ImportError:  # pragma: no cover - tergantung environment
+    hashes = None
+
+
+# ------------------------------------------------------------
+# 1️⃣ REGISTRY ALGORITMA
+# ------------------------------------------------------------
+"""
+Registry nama algoritma (nilai `alg` di header) → class signer.
+
+Setiap signer terikat ke SATU kunci yang sudah di-parse saat startup, dan punya:
+    sign(signing_input: bytes) -> bytes
+    verify(signing_input: bytes, signature: bytes) -> bool
+
+Algoritma baru cukup didaftarkan dengan register_algorithm().
+"""
+ALGORITHMS = {}
+
+
+def register_algorithm(*names):
+    """Decorator: daftarkan class signer untuk satu atau beberapa nama algoritma."""
+    def decorator(cls):
+        for name in names:
+            ALGORITHMS[name] = cls
+        return cls
+    return decorator
+
+
+def _require_cryptography(algorithm: str) -> None:
+    if hashes is None:
+        raise Exception(f"Algoritma {algorithm} membutuhkan paket 'cryptography'")
+
+
+# ------------------------------------------------------------
+# 2️⃣ HMAC (HS256 / HS384 / HS512)
+# ------------------------------------------------------------
+HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+@register_algorithm(*HMAC_DIGESTS)
+class HMACSigner:
+    """
+    Signer yang terikat ke satu secret & satu algoritma.
+
+    hmac.new(key) sudah menghitung state inner/outer (key XOR ipad/opad) sekali.
+    Setiap sign/verify cukup .copy() state tersebut lalu update dengan
+    "header.payload" → tidak ada secret.encode() & key schedule ulang per token.
+    """
+
+    can_sign = True
+
+    def __init__(self, secret: str | bytes, algorithm: str = "HS256"):
+        if algorithm not in HMAC_DIGESTS:
+            raise Exception(f"Algoritma tidak didukung: {algorithm}")
+
+        key = secret.encode() if isinstance(secret, str) else secret
+        self.algorithm = algorithm
+        self._keyed = hmac.new(key, digestmod=HMAC_DIGESTS[algorithm])
+
+    def sign(self, signing_input: bytes) -> bytes:
+        # Salin state yang sudah di-key, lalu hash hanya data token
+        mac = self._keyed.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def verify(self, signing_input: bytes, signature: bytes) -> bool:
+        # Bandingkan byte signature mentah (tanpa encode Base64URL ulang)
+        return hmac.compare_digest(self.sign(signing_input), signature)
+
+
+@lru_cache(maxsize=32)
+def get_signer(secret: str | bytes, algorithm: str = "HS256") -> HMACSigner:
+    """Ambil signer HMAC untuk (secret, algoritma); dibuat sekali lalu dipakai ulang."""
+    return HMACSigner(secret, algorithm)
+
+
+# ------------------------------------------------------------
+# 3️⃣ ASIMETRIS (RSA, RSA-PSS, ECDSA, EdDSA)
+# ------------------------------------------------------------
+def _load_key(key, algorithm: str):
+    """
+    Parse kunci PEM (bytes/str) menjadi objek kunci cryptography.
+    Private key → bisa sign & verify, public key → hanya verify.
+    Objek kunci yang sudah di-parse diterima apa adanya.
+    """
+    _require_cryptography(algorithm)
+
+    if isinstance(key, str):
+        key = key.encode()
+    if not isinstance(key, bytes):
+        return key
+
+    if b"PRIVATE KEY" in key:
+        return serialization.load_pem_private_key(key, password=None)
+    return serialization.load_pem_public_key(key)
+
+
+class _AsymmetricSigner:
+    """Dasar signer asimetris: simpan private key (opsional) & public key."""
+
+    key_types = ()
+
+    def __init__(self, key, algorithm: str):
+        key = _load_key(key, algorithm)
+
+        if not isinstance(key, self.key_types):
+            raise Exception(f"Tipe kunci tidak cocok untuk {algorithm}")
+
+        self.algorithm = algorithm
+        self._private = key if hasattr(key, "sign") else None
+        self._public = key.public_key() if self._private is not None else key
+        self.can_sign = self._private is not None
+
+    def _private_key(self):
+        if self._private is None:
+            raise Exception(f"Kunci {self.algorithm} hanya public key (verify saja)")
+        return self._private
+
+
+RSA_HASHES = {"256": "SHA256", "384": "SHA384", "512": "SHA512"}
+
+
+@register_algorithm("RS256", "RS384", "RS512")
+class RSASigner(_AsymmetricSigner):
+    """RSASSA-PKCS1-v1_5 dengan SHA-2."""
+
+    def __init__(self, key, algorithm: str = "RS256"):
+        _require_cryptography(algorithm)
+        self.key_types = (rsa.RSAPrivateKey, rsa.RSAPublicKey)
+        super().__init__(key, algorithm)
+        self._hash = getattr(hashes, RSA_HASHES[algorithm[2:]])()
+
+    def _padding(self):
+        return padding.PKCS1v15()
+
+    def sign(self, signing_input: bytes) -> bytes:
+        return self._private_key().sign(signing_input, self._padding(), self._hash)
+
+    def verify(self, signing_input: bytes, signature: bytes) -> bool:
+        try:
+            self._public.verify(signature, signing_input, self._padding(), self._hash)
+            return True
+        except InvalidSignature:
+            return False
+
+
+@register_algorithm("PS256", "PS384", "PS512")
+class RSAPSSSigner(RSASigner):
+    """RSASSA-PSS dengan MGF1 & salt sepanjang digest (RFC 7518 §3.5)."""
+
+    def __init__(self, key, algorithm: str = "PS256"):
+        super().__init__(key, algorithm)
+        self._pss = padding.PSS(mgf=padding.MGF1(self._hash), salt_length=self._hash.digest_size)
+
+    def _padding(self):
+        return self._pss
+
+
+EC_CURVES = {
+    # alg   : (hash, nama curve, panjang r/s dalam byte)
+    "ES256": ("SHA256", "secp256r1", 32),
+    "ES384": ("SHA384", "secp384r1", 48),
+    "ES512": ("SHA512", "secp521r1", 66),
+}
+
+
+@register_algorithm(*EC_CURVES)
+class ECSigner(_AsymmetricSigner):
+    """
+    ECDSA. JWS memakai signature mentah r || s (panjang tetap),
+    bukan format DER yang dihasilkan cryptography.
+    """
+
+    def __init__(self, key, algorithm: str = "ES256"):
+        _require_cryptography(algorithm)
+        self.key_types = (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)
+        super().__init__(key, algorithm)
+
+        hash_name, curve_name, self._size = EC_CURVES[algorithm]
+        if self._public.curve.name != curve_name:
+            raise Exception(f"{algorithm} membutuhkan curve {curve_name}")
+        self._ecdsa = ec.ECDSA(getattr(hashes, hash_name)())
+
+    def sign(self, signing_input: bytes) -> bytes:
+        der = self._private_key().sign(signing_input, self._ecdsa)
+        r, s = decode_dss_signature(der)
+        return r.to_bytes(self._size, "big") + s.to_bytes(self._size, "big")
+
+    def verify(self, signing_input: bytes, signature: bytes) -> bool:
+        if len(signature) != 2 * self._size:
+            return False
+        r = int.from_bytes(signature[:self._size], "big")
+        s = int.from_bytes(signature[self._size:], "big")
+        try:
+            self._public.verify(encode_dss_signature(r, s), signing_input, self._ecdsa)
+            return True
+        except InvalidSignature:
+            return False
+
+
+@register_algorithm("EdDSA")
+class EdDSASigner(_AsymmetricSigner):
+    """EdDSA (Ed25519 / Ed448), tanpa parameter hash terpisah."""
+
+    def __init__(self, key, algorithm: str = "EdDSA"):
+        _require_cryptography(algorithm)
+        self.key_types = (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey,
+                          ed448.Ed448PrivateKey, ed448.Ed448PublicKey)
+        super().__init__(key, algorithm)
+
+    def sign(self, signing_input: bytes) -> bytes:
+        return self._private_key().sign(signing_input)
+
+    def verify(self, signing_input: bytes, signature: bytes) -> bool:
+        try:
+            self._public.verify(signature, signing_input)
+            return True
+        except InvalidSignature:
+            return False
+
+
+def create_signer(algorithm: str, key):
+    """Buat signer dari registry berdasarkan nama algoritma."""
+    if algorithm not in ALGORITHMS:
+        raise Exception(f"Algoritma tidak didukung: {algorithm}")
+    return ALGORITHMS[algorithm](key, algorithm)
+
+
+# ------------------------------------------------------------
+# 4️⃣ KEY SET (kid → signer)
+# ------------------------------------------------------------
+class KeySet:
+    """
+    Kumpulan kunci yang di-load & di-parse SEKALI saat startup.
+
+    - Header `kid` memilih kunci yang dipakai untuk verifikasi.
+    - `alg` di header wajib sama dengan algoritma kunci (cegah algorithm confusion,
+      mis. token HS256 yang "ditandatangani" memakai public key RSA).
+    - Node edge cukup memuat public key → bisa verify tanpa shared secret.
+    """
+
+    def __init__(self):
+        self._signers = {}
+        self.default_kid = None
+
+    def add(self, kid: str, algorithm: str, key, default: bool = False) -> None:
+        self._signers[kid] = create_signer(algorithm, key)
+        if default or self.default_kid is None:
+            self.default_kid = kid
+
+    def signer_for(self, kid: str | None = None):
+        """Signer untuk membuat token (default: kunci default)."""
+        kid = kid or self.default_kid
+        signer = self._signers.get(kid)
+        if signer is None:
+            raise Exception(f"Key id tidak dikenal: {kid}")
+        if not signer.can_sign:
+            raise Exception(f"Key id {kid} hanya bisa verify (public key)")
+        return kid, signer
+
+    def resolve(self, header: dict):
+        """Pilih signer untuk verifikasi berdasarkan header `kid` & `alg`."""
+        kid = header.get("kid")
+        if kid is None and len(self._signers) == 1:
+            kid = self.default_kid
+
+        signer = self._signers.get(kid)
+        if signer is None:
+            raise Exception(f"Key id tidak dikenal: {kid}")
+        if header.get("alg") != signer.algorithm:
+            raise Exception("Algoritma header tidak cocok dengan kunci")
+        return signer
+
+    def __contains__(self, kid) -> bool:
+        return kid in self._signers
+
+    def __len__(self) -> int:
+        return len(self._signers)
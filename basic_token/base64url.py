@@ -1,15 +1,42 @@
-import base64  # Modul bawaan Python untuk operasi Base64 (encoding & decoding)
+import binascii  # Codec Base64 level C (tanpa lapisan modul base64)
 
+# Base64 standar ↔ URL-safe cukup menukar 2 karakter: '+' ↔ '-' dan '/' ↔ '_'.
+# Tabel translate dibuat sekali; bytes.translate berjalan di C dalam satu pass.
+_TO_URLSAFE = bytes.maketrans(b"+/", b"-_")
+_FROM_URLSAFE = bytes.maketrans(b"-_", b"+/")
 
-def base64url_encode(data: bytes) -> str:
-    # Encode data bytes ke Base64 varian URL-safe (terdapat '=')
-    encoded = base64.urlsafe_b64encode(data)
-    return encoded.decode().rstrip("=")
+# Padding yang dibutuhkan per (panjang % 4); sisa 1 tidak valid → tetap gagal di a2b_base64
+_STR_PADDING = ("", "===", "==", "=")
+_BYTES_PADDING = (b"", b"===", b"==", b"=")
 
+_b2a = binascii.b2a_base64
+_a2b = binascii.a2b_base64
 
-def base64url_decode(data: str) -> bytes:
-    # (-len(data) % 4) akan menghasilkan 0, 1, 2, atau 3.
-    padding = '=' * (-len(data) % 4)
 
-    # Gabungkan padding dan decode menggunakan varian URL-safe
-    return base64.urlsafe_b64decode(data + padding)
+def base64url_encode(data) -> str:
+    # data: bytes / bytearray / memoryview (dibaca langsung, tanpa salinan)
+    # b2a_base64 → translate ke alfabet URL-safe → buang '=' di ujung
+    return _b2a(data, newline=False).translate(_TO_URLSAFE).rstrip(b"=").decode("ascii")
+
+
+def base64url_decode(data) -> bytes:
+    # data: str (segmen JWT) atau bytes / bytearray / memoryview ASCII
+    # (bytes dipakai langsung; bytearray / memoryview disalin sekali ke bytes sebelum translate)
+    # Padding ditambahkan sesuai sisa panjang (0, 1, 2, atau 3 karakter '='),
+    # lalu alfabet URL-safe dikembalikan ke standar sebelum a2b_base64.
+    if isinstance(data, str):
+        return _a2b((data + _STR_PADDING[len(data) % 4]).encode("ascii").translate(_FROM_URLSAFE))
+    return _a2b(bytes(data).translate(_FROM_URLSAFE) + _BYTES_PADDING[len(data) % 4])
+
+
+def base64url_encode_many(items) -> list:
+    # Encode banyak segmen sekaligus (mis. bulk-issue token)
+    b2a, table = _b2a, _TO_URLSAFE
+    return [b2a(item, newline=False).translate(table).rstrip(b"=").decode("ascii") for item in items]
+
+
+def base64url_decode_many(items) -> list:
+    # Decode banyak segmen sekaligus (mis. audit / decode_jwt_many); jalur str di-inline
+    a2b, table, padding = _a2b, _FROM_URLSAFE, _STR_PADDING
+    return [a2b((item + padding[len(item) % 4]).encode("ascii").translate(table))
+            if isinstance(item, str) else base64url_decode(item) for item in items]
@@ -0,0 +1,209 @@
+# basic_token/bench.py
+# Micro-benchmark sederhana untuk paket basic_token.
+# Jalankan dari root repo:  python -m basic_token.bench
+
+import base64
+import os
+import sqlite3
+import tempfile
+import time
+from bench_utils import timeit
+
+from . import token_db
+from .base64url import base64url_decode, base64url_decode_many, base64url_encode, base64url_encode_many
+from .algorithms import KeySet
+from . import jwt_core
+from .jwt_service import create_jwt, decode_jwt, decode_jwt_many
+from .session_store import MemorySessionBackend, SQLiteSessionBackend
+
+BENCH_SECRET = "bench_secret_key_0123456789abcdef"
+
+
+# ------------------------------------------------------------
+# 1️⃣ BATCH DECODE vs LOOP decode_jwt
+# ------------------------------------------------------------
+def bench_decode_many(count: int = 20000, chunk_size: int = 512) -> None:
+    tokens = [create_jwt({"username": f"user{i}"}, secret=BENCH_SECRET)["token"] for i in range(count)]
+
+    print(f"\n===== decode {count} token =====")
+    timeit("loop decode_jwt (tanpa cache)",
+           lambda: [decode_jwt(t, secret=BENCH_SECRET, use_cache=False) for t in tokens], count)
+    timeit("decode_jwt_many (thread)",
+           lambda: decode_jwt_many(tokens, BENCH_SECRET, chunk_size=chunk_size, executor="thread"), count)
+    timeit("decode_jwt_many (process)",
+           lambda: decode_jwt_many(tokens, BENCH_SECRET, chunk_size=chunk_size, executor="process"), count)
+
+
+# ------------------------------------------------------------
+# 2️⃣ PERBANDINGAN ALGORITMA (sign & verify)
+# ------------------------------------------------------------
+def _bench_keys() -> KeySet:
+    """Buat satu kunci per algoritma (kunci asimetris di-generate sekali)."""
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    keys = KeySet()
+    keys.add("hs256", "HS256", BENCH_SECRET)
+    keys.add("hs384", "HS384", BENCH_SECRET)
+    keys.add("hs512", "HS512", BENCH_SECRET)
+    keys.add("rs256", "RS256", rsa_key)
+    keys.add("ps256", "PS256", rsa_key)
+    keys.add("es256", "ES256", ec.generate_private_key(ec.SECP256R1()))
+    keys.add("eddsa", "EdDSA", ed25519.Ed25519PrivateKey.generate())
+    return keys
+
+
+def bench_algorithms(count: int = 2000) -> None:
+    keys = _bench_keys()
+
+    print(f"\n===== sign / verify {count} token per algoritma =====")
+    for kid in ("hs256", "hs384", "hs512", "rs256", "ps256", "es256", "eddsa"):
+        tokens = []
+        timeit(f"{kid} sign",
+               lambda: tokens.extend(create_jwt({"username": "bench"}, keys=keys, kid=kid)["token"]
+                                     for _ in range(count)), count)
+        timeit(f"{kid} verify",
+               lambda: [decode_jwt(t, keys=keys, use_cache=False) for t in tokens], count)
+
+
+# ------------------------------------------------------------
+# 3️⃣ token_db: connect per pemanggilan vs pool thread-local (WAL)
+# ------------------------------------------------------------
+def bench_token_db(count: int = 2000) -> None:
+    tmp_dir = tempfile.mkdtemp()
+
+    # Cara lama: connect → execute → commit → close di setiap pemanggilan
+    legacy_path = os.path.join(tmp_dir, "legacy.sqlite")
+    with sqlite3.connect(legacy_path) as conn:
+        conn.execute(token_db.SQL_CREATE_TOKENS)
+
+    def legacy():
+        for i in range(count):
+            conn = sqlite3.connect(legacy_path)
+            conn.execute(token_db.SQL_SAVE_TOKENS, (f"user{i % 100}", "a", "r", i, i, "now"))
+            conn.commit()
+            conn.close()
+
+    # Cara baru: koneksi pool + WAL + prepared statement cache
+    token_db.configure_db(db_path=os.path.join(tmp_dir, "pooled.sqlite"))
+    token_db.init_db()
+
+    def pooled():
+        for i in range(count):
+            token_db.save_tokens(f"user{i % 100}", "a", "r", i, i)
+
+    print(f"\n===== token_db: {count} save_tokens =====")
+    timeit("connect per call (journal DELETE)", legacy, count)
+    timeit("pooled thread-local (WAL)", pooled, count)
+    token_db.configure_db(db_path="session_tokens.sqlite")
+
+
+# ------------------------------------------------------------
+# 4️⃣ LOGOUT: sweep folder session (filesystem) vs delete satu key
+# ------------------------------------------------------------
+def bench_session_logout(sizes=(100, 1000, 10000), logouts: int = 100) -> None:
+    payload = '{"username":"bench","token_expiry":0,"refresh_expiry":0}'
+
+    print(f"\n===== latency logout (rata-rata {logouts} logout) =====")
+    for size in sizes:
+        tmp_dir = tempfile.mkdtemp()
+
+        # Cara lama: clear_all_sessions() → os.listdir + hapus semua file session
+        session_dir = os.path.join(tmp_dir, "sessions_server")
+        os.makedirs(session_dir)
+
+        def fill_files():
+            for i in range(size):
+                with open(os.path.join(session_dir, f"s{i}"), "w") as f:
+                    f.write(payload)
+
+        def sweep():
+            for f in os.listdir(session_dir):
+                file_path = os.path.join(session_dir, f)
+                if os.path.isfile(file_path):
+                    os.remove(file_path)
+
+        fill_files()
+        start = time.perf_counter()
+        sweep()                                 # satu logout = hapus semua (lalu isi ulang tidak dihitung)
+        sweep_ms = (time.perf_counter() - start) * 1000
+
+        results = [("filesystem sweep", sweep_ms)]
+        for label, backend in (("memory delete", MemorySessionBackend()),
+                               ("sqlite delete", SQLiteSessionBackend(os.path.join(tmp_dir, "s.sqlite")))):
+            if isinstance(backend, SQLiteSessionBackend):
+                with backend._conn() as conn:
+                    conn.executemany(backend.SQL_SET, ((f"s{i}", payload, 2**31) for i in range(size)))
+            else:
+                for i in range(size):
+                    backend.set(f"s{i}", payload, 3600)
+            start = time.perf_counter()
+            for i in range(logouts):
+                backend.delete(f"s{i}")
+            results.append((label, (time.perf_counter() - start) * 1000 / logouts))
+
+        print(f"  {size:>6} session: " + "  ".join(f"{label} {ms:8.3f} ms" for label, ms in results))
+
+
+# ------------------------------------------------------------
+# 5️⃣ BASE64URL: implementasi lama (base64 + rstrip / padding string) vs binascii + translate
+# ------------------------------------------------------------
+def _legacy_b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _legacy_b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def bench_base64url(count: int = 200000) -> None:
+    token = create_jwt({"username": "bench", "email": "bench@example.com"}, secret=BENCH_SECRET)["token"]
+    segments = token.split(".")
+    raws = [base64url_decode(seg) for seg in segments]
+    bulk_raws, bulk_segments = raws * count, segments * count
+
+    print(f"\n===== base64url {count} x 3 segmen JWT =====")
+    timeit("encode lama", lambda: [_legacy_b64url_encode(r) for _ in range(count) for r in raws], count * 3)
+    timeit("encode baru", lambda: [base64url_encode(r) for _ in range(count) for r in raws], count * 3)
+    timeit("encode_many (bulk)", lambda: base64url_encode_many(bulk_raws), count * 3)
+    timeit("decode lama", lambda: [_legacy_b64url_decode(s) for _ in range(count) for s in segments], count * 3)
+    timeit("decode baru", lambda: [base64url_decode(s) for _ in range(count) for s in segments], count * 3)
+    timeit("decode_many (bulk)", lambda: base64url_decode_many(bulk_segments), count * 3)
+
+
+# ------------------------------------------------------------
+# 6️⃣ SERIALISASI: json.dumps per segmen (lama) vs header cache + backend JSON
+# ------------------------------------------------------------
+def bench_serialization(count: int = 50000) -> None:
+    import json
+
+    payloads = [{"username": f"user{i}", "email": f"user{i}@example.com", "role": "user",
+                 "iss": "jwt-learning-app", "aud": "jwt-clients",
+                 "iat": 1700000000 + i, "nbf": 1700000000 + i, "exp": 1700000300 + i} for i in range(count)]
+
+    def legacy():
+        for p in payloads:
+            jwt_core.base64url_encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+            jwt_core.base64url_encode(json.dumps(p, separators=(",", ":")).encode())
+
+    print(f"\n===== serialisasi header+payload {count} token =====")
+    timeit("json.dumps header + payload (lama)", legacy, count)
+    active = jwt_core.JSON_BACKEND
+    for name in jwt_core.JSON_BACKENDS:
+        jwt_core.set_json_backend(name)
+        timeit(f"encode_header+segment ({name})",
+               lambda: [(jwt_core.encode_header("HS256"), jwt_core.encode_segment(p)) for p in payloads], count)
+    jwt_core.set_json_backend(active)
+
+    timeit(f"create_jwt HS256 ({active})",
+           lambda: [create_jwt(p, secret=BENCH_SECRET) for p in payloads], count)
+
+
+if __name__ == "__main__":
+    bench_decode_many()
+    bench_algorithms()
+    bench_token_db()
+    bench_session_logout()
+    bench_base64url()
+    bench_serialization()
@@ -1,4 +1,5 @@
-from datetime import datetime, timezone, timedelta
+from datetime import timedelta
+from .clock import clock
 
 def token_standard_claims(custom_payload: dict,
                              issuer: str | None = None,
@@ -10,22 +11,18 @@ def token_standard_claims(custom_payload: dict,
     AUDIENCE = "jwt-clients"
 
 
-    # Waktu saat ini (UTC), karena JWT standar menggunakan UTC, bukan lokal time.
-    now = datetime.now(timezone.utc)
+    # Waktu saat ini sebagai detik UNIX (UTC) integer dari clock bersama.
+    now = clock.now()
 
     # Gunakan nilai default dari konfigurasi jika parameter opsional tidak diberikan.
     issuer = issuer or ISSUER
     audience = audience or AUDIENCE
     expires_delta = expires_delta or ACCESS_EXPIRES
 
-    # Waktu kadaluarsa dihitung dari waktu sekarang + durasi expire
-    exp_time = now + expires_delta
-
-    # Konversi ke timestamp (float detik UNIX UTC)
-    # JWT menggunakan waktu berbasis detik, bukan datetime object.
-    iat = now.timestamp()   # issued-at (token dibuat)
-    nbf = now.timestamp()   # not-before (token berlaku mulai kapan)
-    exp = exp_time.timestamp()  # expiration (token berakhir kapan)
+    # JWT menggunakan waktu berbasis detik (NumericDate), bukan datetime object.
+    iat = now                                           # issued-at (token dibuat)
+    nbf = now                                           # not-before (token berlaku mulai kapan)
+    exp = now + int(expires_delta.total_seconds())      # expiration (token berakhir kapan)
 
     # Gabungkan klaim standar dengan payload kustom pengguna
     payload = {
@@ -0,0 +1,103 @@
+import threading                                # Ticker opsional di background
+import time                                     # Sumber waktu epoch
+
+
+# ------------------------------------------------------------
+# 1️⃣ CLOCK: EPOCH DETIK (INTEGER) YANG DI-CACHE
+# ------------------------------------------------------------
+"""
+Jam bersama untuk basic_token dan sample_token.py.
+
+Klaim JWT (iat, nbf, exp) adalah detik UNIX integer, jadi pengecekan expiry cukup
+membandingkan integer — tidak perlu membuat datetime.now(timezone.utc) lalu
+.timestamp() di setiap request.
+
+- now()            : epoch detik (int); di-refresh paling sering sekali per tick.
+- start_ticker()   : opsional, thread background yang memperbarui nilai per tick
+                     sehingga now() cukup membaca atribut.
+- freeze / advance : override waktu untuk test (reset() kembali ke waktu nyata).
+- leeway           : toleransi clock skew (detik) default untuk is_expired / is_not_yet_valid.
+"""
+class Clock:
+
+    def __init__(self, tick: float = 1.0, leeway: int = 0):
+        self.tick = tick                # resolusi cache (detik)
+        self.leeway = leeway            # toleransi skew default (detik)
+        self._value = int(time.time())  # epoch detik terakhir
+        self._next = self._value + tick # kapan nilai cache perlu diperbarui
+        self._frozen = None             # nilai override (test)
+        self._ticker = None
+
+    def now(self) -> int:
+        if self._frozen is not None:
+            return self._frozen
+        if self._ticker is not None:
+            return self._value
+        t = time.time()
+        if t >= self._next:
+            self._value = int(t)
+            self._next = self._value + self.tick    # batas detik berikutnya → nilai = floor(t) untuk tick 1
+        return self._value
+
+    # -----------------------------
+    # Ticker background (opsional)
+    # -----------------------------
+    def start_ticker(self) -> None:
+        if self._ticker is not None:
+            return
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(self.tick):
+                self._value = int(time.time())
+
+        self._value = int(time.time())
+        self._ticker = (threading.Thread(target=run, name="basic-token-clock", daemon=True), stop)
+        self._ticker[0].start()
+
+    def stop_ticker(self) -> None:
+        if self._ticker is not None:
+            thread, stop = self._ticker
+            self._ticker = None
+            stop.set()
+            thread.join()
+
+    # -----------------------------
+    # Override untuk test
+    # -----------------------------
+    def freeze(self, epoch: int | None = None) -> None:
+        """Bekukan waktu di epoch tertentu (default: sekarang)."""
+        self._frozen = int(time.time()) if epoch is None else int(epoch)
+
+    def advance(self, seconds: int) -> None:
+        """Majukan waktu beku (freeze otomatis jika belum)."""
+        if self._frozen is None:
+            self.freeze()
+        self._frozen += int(seconds)
+
+    def reset(self) -> None:
+        """Kembali ke waktu nyata."""
+        self._frozen = None
+        self._next = 0
+
+    # -----------------------------
+    # Pengecekan klaim waktu
+    # -----------------------------
+    def is_expired(self, exp, leeway: int | None = None, now: int | None = None) -> bool:
+        """True jika waktu sekarang sudah melewati exp (+ leeway)."""
+        leeway = self.leeway if leeway is None else leeway
+        return (self.now() if now is None else now) - leeway > exp
+
+    def is_not_yet_valid(self, nbf, leeway: int | None = None, now: int | None = None) -> bool:
+        """True jika waktu sekarang (+ leeway) masih sebelum nbf (nbf float dibulatkan ke bawah)."""
+        leeway = self.leeway if leeway is None else leeway
+        return (self.now() if now is None else now) + leeway < int(nbf)
+
+
+# Instance bersama (dipakai jwt_core, claims, token_cache, sample_token)
+clock = Clock()
+
+
+def now_ts() -> int:
+    """Epoch detik saat ini dari clock bersama."""
+    return clock.now()
@@ -1,9 +1,11 @@
 import json                                     # Untuk serialisasi dan deserialisasi JSON (header/payload JWT)
-import hmac                                     # Untuk operasi HMAC (hash-based message authentication code)
-import hashlib                                  # Untuk algoritma hash seperti SHA256
+import os
 
-from .base64url import base64url_encode      
-from datetime import datetime, timezone
+from functools import lru_cache                 # Cache segmen header per (alg, kid)
+
+from .algorithms import get_signer              # Registry signer (HMAC / RSA / ECDSA / EdDSA)
+from .base64url import base64url_encode, base64url_decode
+from .clock import clock                        # Epoch detik (int) yang di-cache, bisa di-override saat test
 
 
 # ------------------------------------------------------------
@@ -28,6 +30,9 @@ List Algoritma Detail
 | **RS256/RS384/RS512** | Asimetris (RSA)     | RSA-SHAxxx                                          |
 | **ES256/ES384/ES512** | Asimetris (ECDSA)   | ECDSA-SHAxxx                                        |
 | **PS256/PS384/PS512** | Asimetris (RSA-PSS) | RSA-PSS dengan SHAxxx                               |
+| **EdDSA**             | Asimetris (EdDSA)   | Ed25519 / Ed448                                     |
+
+Semua algoritma di atas terdaftar di algorithms.ALGORITHMS (lihat algorithms.KeySet).
 
 
 List Parameter Header
@@ -47,28 +52,105 @@ List Parameter Header
 | `app`      | Nama aplikasi penerbit                                                      | `"MyAppAPI"`                                  |
 
 """
-def build_header(algorithm: str = "HS256") -> dict:
-    return {"alg": algorithm, 
-            "typ": "JWT"}
+def build_header(algorithm: str = "HS256", kid: str | None = None) -> dict:
+    header = {"alg": algorithm, 
+              "typ": "JWT"}
+
+    # kid dipakai penerima untuk memilih kunci verifikasi (lihat algorithms.KeySet)
+    if kid is not None:
+        header["kid"] = kid
+    return header
+
+
+@lru_cache(maxsize=64)
+def encode_header(algorithm: str = "HS256", kid: str | None = None) -> str:
+    """
+        Header hanya bergantung pada (alg, kid) → segmen Base64URL-nya
+        dihitung sekali lalu dipakai ulang untuk setiap token.
+    """
+    return base64url_encode(_json_stdlib(build_header(algorithm, kid)))
 
 
 # ------------------------------------------------------------
 # 2️⃣ ENCODE HEADER & PAYLOAD
 # ------------------------------------------------------------
+"""
+Serializer JSON payload (pluggable):
+
+- Default "json": encoder json standar yang dibuat sekali (json.dumps dengan kwargs
+  membuat JSONEncoder baru di setiap panggilan). Output byte-identik dengan
+  json.dumps(obj, separators=(",", ":")) — termasuk ensure_ascii, NaN, 1e+16,
+  dan TypeError untuk tipe non-JSON.
+- Opt-in "orjson" / "msgspec" (jika terinstall) lewat set_json_backend() atau env
+  JWT_JSON_BACKEND. Keduanya lebih cepat tetapi outputnya BERBEDA dari json standar:
+    * teks non-ASCII ditulis sebagai UTF-8 (bukan \\uXXXX);
+    * float besar/kecil ditulis "1e16" (bukan "1e+16");
+    * NaN / Infinity menjadi null (json standar menulis NaN yang bukan JSON valid);
+    * msgspec meng-encode datetime/UUID/dataclass; orjson dikonfigurasi menolaknya
+      (passthrough) sehingga fallback ke json standar dan tetap TypeError.
+  Token tetap valid & bisa di-decode, hanya byte payload yang bisa berbeda.
+- Objek yang ditolak backend cepat (mis. int > 64 bit) di-encode ulang dengan json standar.
+"""
+_STDLIB_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+def _json_stdlib(obj) -> bytes:
+    return _STDLIB_ENCODER.encode(obj).encode()
+
+
+JSON_BACKENDS = {"json": _json_stdlib}
+
+try:
+    import orjson
+    _ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                       | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS)
+    JSON_BACKENDS["orjson"] = lambda obj: orjson.dumps(obj, option=_ORJSON_OPTIONS)
+except ImportError:  # pragma: no cover - tergantung environment
+    pass
+
+try:
+    import msgspec
+    JSON_BACKENDS["msgspec"] = msgspec.json.Encoder().encode
+except ImportError:  # pragma: no cover - tergantung environment
+    pass
+
+
+def set_json_backend(name: str) -> None:
+    """Pilih backend serializer payload ("json", "orjson", atau "msgspec")."""
+    global _json_dumps, JSON_BACKEND
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"JSON backend tidak tersedia: {name} (tersedia: {', '.join(JSON_BACKENDS)})")
+    _json_dumps = JSON_BACKENDS[name]
+    JSON_BACKEND = name
+
+
+JSON_BACKEND = os.getenv("JWT_JSON_BACKEND", "json")
+set_json_backend(JSON_BACKEND)
+
+
 def encode_segment(obj: dict) -> str:
     """
-        json.dumps dengan separators=(",", ":") menghasilkan JSON tanpa spasi,
-        supaya token lebih pendek dan konsisten.  
+        JSON kanonik (tanpa spasi) supaya token lebih pendek dan konsisten,
+        lalu di-encode Base64URL.
     """
-    
-    json_bytes = json.dumps(obj, separators=(",", ":")).encode()
+    try:
+        json_bytes = _json_dumps(obj)
+    except (TypeError, OverflowError):
+        json_bytes = _json_stdlib(obj)
     return base64url_encode(json_bytes)
 
 
 # ------------------------------------------------------------
 # 3️⃣ SIGN TOKEN (MEMBUAT SIGNATURE)
 # ------------------------------------------------------------
-def sign_token(header_b64: str, payload_b64: str, secret: str) -> str:
+def _resolve_signer(secret, algorithm: str):
+    # Objek signer (dari KeySet) dipakai langsung, string/bytes dianggap secret HMAC
+    if hasattr(secret, "sign"):
+        return secret
+    return get_signer(secret, algorithm)
+
+
+def sign_token(header_b64: str, payload_b64: str, secret, algorithm: str = "HS256") -> str:
     """
     header_b64 : str
         Header JWT yang sudah di-encode Base64URL.
@@ -76,15 +158,18 @@ def sign_token(header_b64: str, payload_b64: str, secret: str) -> str:
     payload_b64 : str
         Payload JWT yang sudah di-encode Base64URL.
 
-    secret : str
-        Secret key yang digunakan untuk membuat tanda tangan.
+    secret : str | signer
+        Secret key HMAC, atau objek signer dari algorithms.KeySet.
+
+    algorithm : str
+        Nama algoritma HMAC (HS256/HS384/HS512) bila secret berupa string.
     """
     
     # 1️⃣ Bentuk string input: "header.payload"
     signing_input = f"{header_b64}.{payload_b64}".encode()
 
-    # 2️⃣ HMAC dengan algoritma SHA256 menggunakan secret
-    signature = hmac.new(secret.encode(), signing_input, hashlib.sha256).digest()
+    # 2️⃣ Tanda tangani dengan signer yang kuncinya sudah di-parse / di-key
+    signature = _resolve_signer(secret, algorithm).sign(signing_input)
 
     # 3️⃣ Encode hasil hash ke Base64URL
     return base64url_encode(signature)
@@ -93,28 +178,37 @@ def sign_token(header_b64: str, payload_b64: str, secret: str) -> str:
 # ------------------------------------------------------------
 # 4️⃣ VERIFIKASI SIGNATURE
 # ------------------------------------------------------------
-def verify_signature(header_b64, payload_b64, signature_b64, secret):
-    # Buat ulang signature dari header & payload menggunakan secret
-    valid_sig = sign_token(header_b64, payload_b64, secret)
+def verify_signature(header_b64, payload_b64, signature_b64, secret, algorithm="HS256"):
+    # Decode signature dari token menjadi byte mentah
+    try:
+        signature = base64url_decode(signature_b64)
+    except (ValueError, TypeError):
+        raise Exception("Signature tidak valid")
 
-    # Gunakan compare_digest agar aman terhadap timing attack
-    if not hmac.compare_digest(valid_sig, signature_b64):
+    # a2b_base64 tidak strict (karakter asing dilewati, trailing bit bukan nol diterima)
+    # → hanya bentuk kanonik yang diterima, agar satu signature = satu string token
+    if base64url_encode(signature) != signature_b64:
+        raise Exception("Signature tidak valid")
+
+    # Verifikasi "header.payload" (HMAC: hitung ulang & compare_digest, asimetris: public key)
+    signing_input = f"{header_b64}.{payload_b64}".encode()
+    if not _resolve_signer(secret, algorithm).verify(signing_input, signature):
         raise Exception("Signature tidak valid")
 
 
 # ------------------------------------------------------------
 # 5️⃣ VERIFIKASI WAKTU (exp dan nbf)
 # ------------------------------------------------------------
-def verify_timestamps(payload):
+def verify_timestamps(payload, leeway: int | None = None):
 
-    # Dapatkan waktu sekarang dalam UTC (format detik UNIX)
-    now = datetime.now(timezone.utc).timestamp()
+    # Waktu sekarang sebagai detik UNIX integer (tanpa membuat objek datetime)
+    now = clock.now()
 
-    # Jika waktu sekarang lebih besar dari exp → token sudah kadaluarsa
-    if now > payload.get("exp", 0):
+    # Jika waktu sekarang lebih besar dari exp (+ leeway) → token sudah kadaluarsa
+    if clock.is_expired(payload.get("exp", 0), leeway, now):
         raise Exception("Token kadaluarsa")
 
-    # Jika waktu sekarang lebih kecil dari nbf → token belum berlaku
-    if now < payload.get("nbf", 0):
+    # Jika waktu sekarang (+ leeway) lebih kecil dari nbf → token belum berlaku
+    if clock.is_not_yet_valid(payload.get("nbf", 0), leeway, now):
         raise Exception("Token belum aktif")
 
@@ -1,34 +1,47 @@
 from .claims import token_standard_claims
 from .base64url import base64url_decode
-from .jwt_core import (build_header, encode_segment, sign_token, 
+from .jwt_core import (build_header, encode_header, encode_segment, sign_token,
                        verify_signature, verify_timestamps)
+from .token_cache import VerifiedTokenCache
+from .algorithms import HMAC_DIGESTS, KeySet, get_signer
 
 import os, json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
 
+# Cache token terverifikasi: client memakai access token yang sama berkali-kali,
+# sehingga verifikasi signature cukup dilakukan sekali per token.
+TOKEN_CACHE = VerifiedTokenCache(maxsize=1024)
+
 # ------------------------------------------------------------
 # 1️⃣ CREATE JWT (ENCODING)
 # ------------------------------------------------------------
-def create_jwt(payload: dict, secret: str = None, algorithm: str = None) -> dict:
+def create_jwt(payload: dict, secret: str = None, algorithm: str = None,
+               keys: KeySet = None, kid: str = None) -> dict:
 
     # Gunakan secret dan algoritma default dari Config jika tidak diberikan
     secret = secret or SECRET_KEY
     algorithm = algorithm or ALGORITHM
 
+    # KeySet diberikan → signer & algoritma diambil dari kunci (kid) yang dipilih
+    if keys is not None:
+        kid, secret = keys.signer_for(kid)
+        algorithm = secret.algorithm
+
     # Membuat header
-    header = build_header(algorithm)
+    header = build_header(algorithm, kid)
 
     # membuat payload (isi dari token)
     payload = token_standard_claims(payload)
 
     # Encode header dan payload ke format Base64URL (tanpa '=')
-    header_b64 = encode_segment(header)
+    header_b64 = encode_header(algorithm, kid)        # segmen header di-cache per (alg, kid)
     payload_b64 = encode_segment(payload)
 
-    # Buat signature berdasarkan HMAC-SHA256 dari "header.payload"
-    signature_b64 = sign_token(header_b64, payload_b64, secret)
+    # Buat signature dari "header.payload" (HMAC / RSA / ECDSA / EdDSA)
+    signature_b64 = sign_token(header_b64, payload_b64, secret, algorithm)
 
     # Gabungkan ketiganya menjadi JWT utuh (header.payload.signature)
     token = f"{header_b64}.{payload_b64}.{signature_b64}"
@@ -47,9 +60,22 @@ def create_jwt(payload: dict, secret: str = None, algorithm: str = None) -> dict
 # ------------------------------------------------------------
 # 2️⃣ DECODE JWT (DECODING + VERIFIKASI)
 # ------------------------------------------------------------
-def decode_jwt(token: str, secret: str = None) -> dict:
-
-    secret = secret or SECRET_KEY
+def decode_jwt(token: str, secret: str = None, use_cache: bool = True,
+               keys: KeySet = None, leeway: int = None) -> dict:
+
+    # Sumber kunci: KeySet (dipilih lewat header kid) atau secret HMAC
+    secret = keys if keys is not None else (secret or SECRET_KEY)
+
+    # Token yang sama sudah pernah diverifikasi → cukup cek ulang waktu (exp/nbf)
+    if use_cache:
+        cached = TOKEN_CACHE.get(token, secret)
+        if cached is not None:
+            verify_timestamps(cached["payload"], leeway)
+            return {
+                "header": cached["header"],
+                "payload": cached["payload"],
+                "signature": cached["signature"]
+            }
 
     # JWT valid memiliki 3 bagian: header.payload.signature
     try:
@@ -66,11 +92,22 @@ def decode_jwt(token: str, secret: str = None) -> dict:
     header = json.loads(header_json)
     payload = json.loads(payload_json)
 
+    # Pilih signer: kid → KeySet, atau HMAC sesuai alg header (hanya HS* untuk secret)
+    if keys is not None:
+        signer = keys.resolve(header)
+    elif header.get("alg") in HMAC_DIGESTS:
+        signer = get_signer(secret, header["alg"])
+    else:
+        raise Exception(f"Algoritma tidak didukung: {header.get('alg')}")
+
     # Verifikasi signature untuk memastikan integritas token
-    verify_signature(header_b64, payload_b64, signature_b64, secret)
+    verify_signature(header_b64, payload_b64, signature_b64, signer)
+
+    # Verifikasi waktu token (expired atau belum aktif, toleransi skew = leeway detik)
+    verify_timestamps(payload, leeway)
 
-    # Verifikasi waktu token (expired atau belum aktif)
-    verify_timestamps(payload)
+    if use_cache:
+        TOKEN_CACHE.put(token, secret, header, payload)
 
     # Return hasil decode lengkap
     return {
@@ -78,3 +115,60 @@ def decode_jwt(token: str, secret: str = None) -> dict:
         "payload": payload,
         "signature": signature_b64
     }
+
+
+# ------------------------------------------------------------
+# 3️⃣ DECODE BANYAK JWT SEKALIGUS (BATCH / OFFLINE)
+# ------------------------------------------------------------
+def _decode_chunk(tokens: list, secret: str) -> list:
+    """
+    Decode satu potongan (chunk) token.
+    Fungsi level-modul agar bisa di-pickle oleh ProcessPoolExecutor.
+    Error per token dikembalikan sebagai hasil, bukan di-raise.
+    """
+    results = []
+    for token in tokens:
+        try:
+            decoded = decode_jwt(token, secret=secret, use_cache=False)
+            results.append({"ok": True, "error": None, "decoded": decoded})
+        except Exception as e:
+            results.append({"ok": False, "error": str(e), "decoded": None})
+    return results
+
+
+def decode_jwt_many(tokens, secret: str = None, workers: int = None,
+                    chunk_size: int = 256, executor: str = "process") -> list:
+    """
+    Verifikasi banyak token (audit tabel tokens, replay access log, dsb).
+
+    tokens     : iterable token JWT
+    workers    : jumlah worker pool (default: jumlah CPU)
+    chunk_size : jumlah token per tugas yang dikirim ke worker
+    executor   : "process" (paralel sungguhan, HMAC tidak terhalang GIL)
+                 atau "thread"
+
+    Return list dengan urutan sama seperti input:
+        {"ok": bool, "error": str | None, "decoded": dict | None}
+    """
+    secret = secret or SECRET_KEY
+    tokens = list(tokens)
+
+    # Batch kecil → overhead pool lebih mahal daripada decode langsung
+    if len(tokens) <= chunk_size:
+        return _decode_chunk(tokens, secret)
+
+    if executor == "process":
+        pool_class = ProcessPoolExecutor
+    elif executor == "thread":
+        pool_class = ThreadPoolExecutor
+    else:
+        raise ValueError("executor harus 'process' atau 'thread'")
+
+    chunks = [tokens[i:i + chunk_size] for i in range(0, len(tokens), chunk_size)]
+
+    # pool.map menjaga urutan chunk sesuai input
+    results = []
+    with pool_class(max_workers=workers) as pool:
+        for chunk_results in pool.map(_decode_chunk, chunks, [secret] * len(chunks)):
+            results.extend(chunk_results)
+    return results
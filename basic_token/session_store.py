@@ -0,0 +1,232 @@
+import heapq                                    # Antrian expiry (min-heap) untuk backend memori
+import secrets                                  # Session id acak
+import sqlite3
+import threading
+import time
+
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+
+# ------------------------------------------------------------
+# 1️⃣ BACKEND SESSION (TTL per key)
+# ------------------------------------------------------------
+"""
+Penyimpanan session server-side pengganti SESSION_TYPE="filesystem".
+
+- Setiap session = satu key (session id) dengan TTL sendiri.
+- delete(sid) hanya menghapus session milik user tersebut → O(1),
+  tidak ada lagi sweep os.listdir yang me-logout semua user.
+- Key yang sudah lewat TTL tidak pernah dikembalikan oleh get(), lalu dibuang
+  bertahap oleh purge_expired() (dipanggil otomatis tiap `purge_every` set()).
+"""
+class MemorySessionBackend:
+
+    def __init__(self, purge_every: int = 1000, purge_batch: int = 1000):
+        self.purge_every = purge_every      # jalankan purge_expired setiap N set()
+        self.purge_batch = purge_batch      # maksimal key yang dibuang per purge
+        self._data = {}                     # sid -> (expires_at, payload)
+        self._expiry = []                   # heap (expires_at, sid); entry usang dilewati saat purge
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def get(self, sid: str) -> str | None:
+        entry = self._data.get(sid)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            self.delete(sid)
+            return None
+        return entry[1]
+
+    def set(self, sid: str, payload: str, ttl: int) -> None:
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._data[sid] = (expires_at, payload)
+            heapq.heappush(self._expiry, (expires_at, sid))
+            self._writes += 1
+            purge = self._writes % self.purge_every == 0
+        if purge:
+            self.purge_expired()
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def purge_expired(self, limit: int | None = None) -> int:
+        """Buang key yang sudah expired (paling banyak `limit`), kembalikan jumlahnya."""
+        limit = limit or self.purge_batch
+        now = time.time()
+        removed = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now and removed < limit:
+                expires_at, sid = heapq.heappop(self._expiry)
+                entry = self._data.get(sid)
+                # hanya hapus jika entry heap ini masih entry terbaru untuk sid tsb
+                if entry is not None and entry[0] == expires_at:
+                    del self._data[sid]
+                    removed += 1
+            # heap membengkak oleh entry usang (set ulang / delete) → bangun ulang
+            if len(self._expiry) > 2 * len(self._data) + self.purge_batch:
+                self._expiry = [(exp, sid) for sid, (exp, _) in self._data.items()]
+                heapq.heapify(self._expiry)
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteSessionBackend:
+
+    SQL_CREATE = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            sid TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            expires_at INTEGER NOT NULL
+        )
+    """
+    SQL_INDEX = "CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)"
+    SQL_GET = "SELECT payload FROM sessions WHERE sid = ? AND expires_at > ?"
+    SQL_SET = "INSERT OR REPLACE INTO sessions (sid, payload, expires_at) VALUES (?, ?, ?)"
+    SQL_DELETE = "DELETE FROM sessions WHERE sid = ?"
+    SQL_PURGE = """
+        DELETE FROM sessions WHERE rowid IN (
+            SELECT rowid FROM sessions WHERE expires_at <= ? LIMIT ?
+        )
+    """
+
+    def __init__(self, db_path: str = "sessions_server.sqlite", purge_every: int = 1000,
+                 purge_batch: int = 1000):
+        self.db_path = db_path
+        self.purge_every = purge_every
+        self.purge_batch = purge_batch
+        self._writes = 0
+        self._local = threading.local()     # satu koneksi per thread (seperti token_db)
+        with self._conn() as conn:
+            conn.execute(self.SQL_CREATE)
+            conn.execute(self.SQL_INDEX)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, sid: str) -> str | None:
+        row = self._conn().execute(self.SQL_GET, (sid, int(time.time()))).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid: str, payload: str, ttl: int) -> None:
+        with self._conn() as conn:
+            conn.execute(self.SQL_SET, (sid, payload, int(time.time()) + ttl))
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            self.purge_expired()
+
+    def delete(self, sid: str) -> None:
+        with self._conn() as conn:
+            conn.execute(self.SQL_DELETE, (sid,))
+
+    def purge_expired(self, limit: int | None = None) -> int:
+        with self._conn() as conn:
+            return conn.execute(self.SQL_PURGE, (int(time.time()), limit or self.purge_batch)).rowcount
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+# ------------------------------------------------------------
+# 2️⃣ FLASK SESSION INTERFACE
+# ------------------------------------------------------------
+class ServerSession(CallbackDict, SessionMixin):
+    """Dict session; `modified` otomatis True saat isinya berubah."""
+
+    def __init__(self, initial=None, sid: str = None, new: bool = False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class ServerSessionInterface(SessionInterface):
+    """
+    Session server-side: cookie hanya berisi session id yang ditandatangani,
+    isi session ada di backend (MemorySessionBackend / SQLiteSessionBackend).
+
+    - ttl          : umur default session (detik) di backend.
+    - expiry_key   : jika session berisi key ini (epoch detik, mis. "refresh_expiry"),
+                     TTL mengikuti nilai tersebut → session tidak hidup lebih lama dari token.
+    - session.clear() → key session dihapus dari backend saat response (O(1)).
+    """
+
+    serializer = session_json_serializer
+
+    def __init__(self, backend, ttl: int = 3600, expiry_key: str | None = None,
+                 salt: str = "basic-token-session"):
+        self.backend = backend
+        self.ttl = ttl
+        self.expiry_key = expiry_key
+        self.salt = salt
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt=self.salt)
+
+    def _ttl_for(self, session) -> int:
+        if self.expiry_key:
+            expires_at = session.get(self.expiry_key)
+            if isinstance(expires_at, (int, float)):
+                return max(1, int(expires_at - time.time()))
+        return self.ttl
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie and app.secret_key:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            if sid:
+                payload = self.backend.get(sid)
+                if payload is not None:
+                    return ServerSession(self.serializer.loads(payload), sid=sid)
+        return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        # Session dikosongkan (logout / token expired) → hapus HANYA session ini
+        if not session:
+            if session.modified:
+                self.backend.delete(session.sid)
+                if not session.new:
+                    response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if not session.modified and not session.new:
+            return
+
+        self.backend.set(session.sid, self.serializer.dumps(dict(session)), self._ttl_for(session))
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid).decode(),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def destroy_session(session) -> None:
+    """Akhiri session aktif milik request ini saja (key dihapus dari backend saat response)."""
+    session.clear()
+    session.modified = True
@@ -0,0 +1,103 @@
+import copy                                     # Salinan header/payload (cache tidak boleh ikut termutasi)
+import threading                                # Lock agar cache aman dipakai banyak thread (dev server Flask)
+from .clock import clock                        # Sumber waktu epoch (int, di-cache) untuk TTL
+
+from collections import OrderedDict             # Menyimpan urutan akses → dasar LRU
+
+
+def _snapshot(claims: dict) -> dict:
+    # Salinan dict; hanya nilai bersarang (list/dict) yang di-deepcopy → murah untuk klaim datar
+    return {k: copy.deepcopy(v) if isinstance(v, (dict, list)) else v for k, v in claims.items()}
+
+
+# ------------------------------------------------------------
+# 1️⃣ VERIFIED TOKEN CACHE (LRU + TTL)
+# ------------------------------------------------------------
+"""
+Cache untuk token yang SUDAH lolos verifikasi signature.
+
+- Key   : segmen signature (bagian ke-3 JWT), unik per token.
+- Value : header & payload hasil decode + token utuh + sumber kunci (secret).
+- Entry dibuang paling lambat saat `exp` token tercapai (atau `ttl` cache, mana yang lebih dulu).
+- Saat hit, token utuh & secret tetap dibandingkan → signature yang sama
+  dengan header/payload berbeda tidak akan pernah dianggap valid.
+- header & payload disalin saat put dan saat get → caller yang mengubah hasil
+  decode tidak mengubah isi cache.
+"""
+class VerifiedTokenCache:
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 300):
+        self.maxsize = maxsize          # jumlah entry maksimum sebelum LRU membuang entry terlama
+        self.ttl = ttl                  # batas umur entry (detik) walau token belum expired
+        self.hits = 0                   # counter: token ditemukan di cache
+        self.misses = 0                 # counter: token harus diverifikasi ulang
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str, secret) -> dict | None:
+        """Ambil hasil verifikasi untuk token; None jika tidak ada / sudah kadaluarsa."""
+        signature_b64 = token.rpartition(".")[2]
+        now = clock.now()
+
+        with self._lock:
+            entry = self._entries.get(signature_b64)
+
+            # Token utuh dan secret harus identik dengan yang diverifikasi sebelumnya
+            if entry is None or entry["token"] != token or entry["secret"] != secret:
+                self.misses += 1
+                return None
+
+            # Entry melewati exp token / ttl cache → buang
+            if now >= entry["expires_at"]:
+                del self._entries[signature_b64]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(signature_b64)
+            self.hits += 1
+            return {**entry, "header": _snapshot(entry["header"]), "payload": _snapshot(entry["payload"])}
+
+    def put(self, token: str, secret, header: dict, payload: dict) -> None:
+        """Simpan token yang sudah terverifikasi (hanya jika memiliki klaim exp)."""
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+
+        expires_at = min(exp, clock.now() + self.ttl)
+        signature_b64 = token.rpartition(".")[2]
+
+        with self._lock:
+            self._entries[signature_b64] = {
+                "token": token,
+                "secret": secret,
+                "header": _snapshot(header),
+                "payload": _snapshot(payload),
+                "signature": signature_b64,
+                "expires_at": expires_at,
+            }
+            self._entries.move_to_end(signature_b64)
+
+            # Buang entry paling lama tidak dipakai jika melebihi kapasitas
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Counter hit/miss untuk monitoring."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,85 +1,278 @@
 # basic_token/token_db.py
+import csv
+import io
+import json
 import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
 
 DB_PATH = "session_tokens.sqlite"
 
+# Pragma default (bisa diubah lewat configure_db)
+JOURNAL_MODE = "WAL"        # reader tidak memblokir writer → tidak ada "database is locked" saat refresh bersamaan
+SYNCHRONOUS = "NORMAL"      # aman untuk WAL, fsync hanya saat checkpoint
+CACHE_SIZE = -8000          # negatif = KiB (≈ 8 MB page cache per koneksi)
+BUSY_TIMEOUT_MS = 5000      # tunggu lock writer lain, bukan langsung error
+STATEMENT_CACHE = 128       # jumlah prepared statement yang disimpan per koneksi
+
+
+# =====================================================
+# CONNECTION POOL (satu koneksi per thread)
+# =====================================================
+class _ThreadConnection:
+    """Pemegang koneksi milik satu thread; koneksi ditutup saat thread selesai (thread-local dibuang)."""
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def close(self):
+        try:
+            self.conn.close()
+        except sqlite3.Error:
+            pass
+
+    __del__ = close
+
+
+class ConnectionPool:
+    """
+    Pool koneksi SQLite thread-local.
+
+    - Setiap thread memakai ulang koneksinya sendiri (tidak connect/close per query).
+    - Koneksi ditutup otomatis saat thread-nya selesai (dev server membuat thread per request),
+      pool hanya menyimpan weakref untuk close_all.
+    - Pragma (WAL, synchronous, cache_size) diset sekali saat koneksi dibuat.
+    - SQL di modul ini berupa konstanta → prepared statement di-cache oleh sqlite3
+      (cached_statements) dan dipakai ulang di setiap pemanggilan.
+    """
+
+    def __init__(self, db_path=DB_PATH, journal_mode=JOURNAL_MODE, synchronous=SYNCHRONOUS,
+                 cache_size=CACHE_SIZE, busy_timeout_ms=BUSY_TIMEOUT_MS,
+                 statement_cache=STATEMENT_CACHE):
+        self.db_path = db_path
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size = cache_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.statement_cache = statement_cache
+        self._local = threading.local()
+        self._all = weakref.WeakSet()   # koneksi thread yang masih hidup (untuk close_all)
+        self._lock = threading.Lock()
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.statement_cache,
+            check_same_thread=False,
+        )
+        conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size={int(self.cache_size)}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        holder = _ThreadConnection(conn)
+        with self._lock:
+            self._all.add(holder)
+        return holder
+
+    def connection(self):
+        """Koneksi milik thread saat ini (dibuat saat pertama kali dipakai)."""
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = self._local.holder = self._open()
+        return holder.conn
+
+    @contextmanager
+    def transaction(self):
+        """Commit jika blok sukses, rollback jika terjadi exception."""
+        conn = self.connection()
+        with conn:
+            yield conn
+
+    def close_all(self):
+        """Tutup semua koneksi (dipanggil saat shutdown atau saat konfigurasi berubah)."""
+        with self._lock:
+            holders, self._all = list(self._all), weakref.WeakSet()
+        for holder in holders:
+            holder.close()
+        self._local = threading.local()
+
+
+_pool = ConnectionPool(DB_PATH)
+
+
+def configure_db(**options):
+    """
+    Ubah path / pragma pool, mis. configure_db(db_path="x.sqlite", synchronous="FULL").
+    Koneksi lama ditutup; koneksi baru memakai konfigurasi terbaru.
+    """
+    global _pool, DB_PATH
+    _pool.close_all()
+    DB_PATH = options.get("db_path", DB_PATH)
+    _pool = ConnectionPool(**{"db_path": DB_PATH, **options})
+
+
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    return _pool.connection()
+
+
+# =====================================================
+# SQL (konstanta → prepared statement di-cache)
+# =====================================================
+SQL_CREATE_TOKENS = """
+    CREATE TABLE IF NOT EXISTS tokens (
+        id INTEGER PRIMARY KEY,
+        username TEXT NOT NULL UNIQUE,
+        access_token TEXT,
+        refresh_token TEXT,
+        token_expiry INTEGER,
+        refresh_expiry INTEGER,
+        status TEXT DEFAULT 'active',
+        created_at TEXT
+    )
+"""
+
+SQL_SAVE_TOKENS = """
+    INSERT INTO tokens (username, access_token, refresh_token, token_expiry, refresh_expiry, status, created_at)
+    VALUES (?, ?, ?, ?, ?, 'active', ?)
+    ON CONFLICT(username) DO UPDATE SET
+        access_token = excluded.access_token,
+        refresh_token = excluded.refresh_token,
+        token_expiry = excluded.token_expiry,
+        refresh_expiry = excluded.refresh_expiry,
+        status = 'active',
+        created_at = excluded.created_at
+"""
+
+SQL_UPDATE_ACCESS = """
+    UPDATE tokens
+    SET access_token = ?, token_expiry = ?, created_at = ?
+    WHERE username = ? AND status = 'active'
+"""
+
+SQL_REVOKE_USER = """
+    UPDATE tokens
+    SET status = 'revoked'
+    WHERE username = ? AND status = 'active'
+"""
+
+SQL_ALL_TOKENS = "SELECT id, username, status, token_expiry, refresh_expiry, created_at FROM tokens"
+
+EXPORT_COLUMNS = ("id", "username", "status", "token_expiry", "refresh_expiry", "created_at")
+
+# Filter export → potongan WHERE (nilai selalu lewat parameter "?")
+_EXPORT_FILTERS = (
+    ("status", "status = ?"),
+    ("token_expiry_from", "token_expiry >= ?"),
+    ("token_expiry_to", "token_expiry < ?"),
+    ("refresh_expiry_from", "refresh_expiry >= ?"),
+    ("refresh_expiry_to", "refresh_expiry < ?"),
+)
+
 
 def init_db():
     """Membuat tabel tokens jika belum ada."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS tokens (
-            id INTEGER PRIMARY KEY,
-            username TEXT NOT NULL UNIQUE,
-            access_token TEXT,
-            refresh_token TEXT,
-            token_expiry INTEGER,
-            refresh_expiry INTEGER,
-            status TEXT DEFAULT 'active',
-            created_at TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
+    with _pool.transaction() as conn:
+        conn.execute(SQL_CREATE_TOKENS)
 
 
 def save_tokens(username, access_token, refresh_token, token_expiry, refresh_expiry):
     """Simpan atau perbarui token user (UPSERT)."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO tokens (username, access_token, refresh_token, token_expiry, refresh_expiry, status, created_at)
-        VALUES (?, ?, ?, ?, ?, 'active', ?)
-        ON CONFLICT(username) DO UPDATE SET
-            access_token = excluded.access_token,
-            refresh_token = excluded.refresh_token,
-            token_expiry = excluded.token_expiry,
-            refresh_expiry = excluded.refresh_expiry,
-            status = 'active',
-            created_at = excluded.created_at
-    """, (
-        username, access_token, refresh_token,
-        token_expiry, refresh_expiry, datetime.utcnow().isoformat()
-    ))
-    conn.commit()
-    conn.close()
+    with _pool.transaction() as conn:
+        conn.execute(SQL_SAVE_TOKENS, (
+            username, access_token, refresh_token,
+            token_expiry, refresh_expiry, datetime.utcnow().isoformat()
+        ))
 
 
 def update_access_token(username, new_access_token, new_expiry):
     """Perbarui access token setelah refresh."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        UPDATE tokens
-        SET access_token = ?, token_expiry = ?, created_at = ?
-        WHERE username = ? AND status = 'active'
-    """, (new_access_token, new_expiry, datetime.utcnow().isoformat(), username))
-    conn.commit()
-    conn.close()
+    with _pool.transaction() as conn:
+        conn.execute(SQL_UPDATE_ACCESS, (new_access_token, new_expiry, datetime.utcnow().isoformat(), username))
 
 
 def revoke_user_tokens(username):
     """Menonaktifkan semua token user (misal saat logout)."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("""
-        UPDATE tokens
-        SET status = 'revoked'
-        WHERE username = ? AND status = 'active'
-    """, (username,))
-    conn.commit()
-    conn.close()
+    with _pool.transaction() as conn:
+        conn.execute(SQL_REVOKE_USER, (username,))
 
 
 def get_all_tokens():
-    """Ambil semua isi tabel tokens (untuk debugging)."""
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("SELECT id, username, status, token_expiry, refresh_expiry, created_at FROM tokens")
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    """Ambil semua isi tabel tokens (untuk debugging; tabel besar → pakai iter_tokens)."""
+    return get_connection().execute(SQL_ALL_TOKENS).fetchall()
+
+
+# =====================================================
+# EXPORT STREAMING (audit)
+# =====================================================
+def _export_query(filters, after_id, limit):
+    clauses, params = ["id > ?"], [after_id]
+    for key, clause in _EXPORT_FILTERS:
+        if filters.get(key) is not None:
+            clauses.append(clause)
+            params.append(filters[key])
+    sql = f"{SQL_ALL_TOKENS} WHERE {' AND '.join(clauses)} ORDER BY id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return sql, params
+
+
+def _fetch_batches(cursor, batch_size):
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        cursor.close()
+
+
+def iter_tokens(after_id=0, limit=None, batch_size=500, **filters):
+    """
+    Iterator baris tabel tokens, urut id (keyset pagination: lanjutkan dengan after_id = id terakhir).
+
+    filters: status, token_expiry_from/_to, refresh_expiry_from/_to (epoch; "_to" eksklusif).
+    Baris dibaca per batch_size dengan fetchmany → memori konstan berapapun ukuran tabel.
+    Filter tidak dikenal → ValueError (langsung, sebelum iterasi).
+    """
+    unknown = set(filters) - {key for key, _ in _EXPORT_FILTERS}
+    if unknown:
+        raise ValueError(f"filter tidak dikenal: {', '.join(sorted(unknown))}")
+
+    sql, params = _export_query(filters, after_id, limit)
+    return _fetch_batches(get_connection().execute(sql, params), batch_size)
+
+
+def export_ndjson(rows, chunk_rows=500):
+    """Satu objek JSON per baris (NDJSON); beberapa baris digabung per chunk."""
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(dict(zip(EXPORT_COLUMNS, row)), separators=(",", ":")))
+        if len(chunk) == chunk_rows:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def export_csv(rows, chunk_rows=500):
+    """CSV dengan header; beberapa baris digabung per chunk agar jumlah write ke socket kecil."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
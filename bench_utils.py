@@ -0,0 +1,15 @@
+# bench_utils.py
+# Helper bersama untuk modul bench.py (basic_token, web_f_secure.cookies / header / tokens).
+# Jalankan benchmark dari root repo (python -m <paket>.bench) agar modul ini bisa di-import.
+
+import time
+
+
+def timeit(label, func, count):
+    """Jalankan func sekali, cetak durasi total, latency per item & throughput, kembalikan durasi."""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<38}: {elapsed * 1000:9.1f} ms  {elapsed / count * 1e6:8.2f} us/item"
+          f"  ({count / elapsed:12,.0f} /s)")
+    return elapsed
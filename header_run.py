@@ -1,12 +1,21 @@
 from flask import Flask
 from web_f_secure.header import (
+    NonceGlobals,
     generate_nonce,
-    apply_secure_headers
+    apply_secure_headers,
+    CSPReportCollector,
+    SQLiteReportSink,
+    create_csp_report_blueprint
 )
 
 app = Flask(__name__)
 
-# sebelum request — buat nonce unik per request
+# endpoint /csp-report — terima laporan pelanggaran CSP (report-uri & report-to)
+csp_reports = CSPReportCollector(SQLiteReportSink("csp_reports.db"))
+app.register_blueprint(create_csp_report_blueprint(csp_reports))
+
+# sebelum request — buat nonce unik per request (g.nonce str, dibuat saat pertama dibaca)
+app.app_ctx_globals_class = NonceGlobals
 app.before_request(generate_nonce)
 
 # setelah request — terapkan semua header keamanan
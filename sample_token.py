@@ -1,18 +1,25 @@
-from flask import Flask, request, render_template_string, session, redirect, url_for
-from flask_session import Session
+from flask import (Flask, Response, request, render_template_string, session, redirect, url_for,
+                   stream_with_context)
 from basic_token.jwt_service import create_jwt, decode_jwt
 from basic_token.token_html import GENERATE_TEMPLATE, DECODE_TEMPLATE
+from basic_token.session_store import (
+    MemorySessionBackend,
+    SQLiteSessionBackend,
+    ServerSessionInterface,
+    destroy_session,
+)
 from basic_token.token_db import (
     init_db,
     save_tokens,
     update_access_token,
     revoke_user_tokens,
-    get_all_tokens,
+    iter_tokens,
+    export_ndjson,
+    export_csv,
 )
-from datetime import datetime, timezone, timedelta
+from basic_token.clock import clock
 import os
 from functools import wraps
-import shutil
 
 # =====================================================
 # KONFIGURASI APLIKASI
@@ -20,19 +27,16 @@ import shutil
 app = Flask(__name__)
 app.secret_key = "super_secret_flask_session_67890"
 
-SESSION_DIR = "./sessions_server"
-os.makedirs(SESSION_DIR, exist_ok=True)
+# Backend session server-side: "memory" (default, satu proses) atau "sqlite"
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "sessions_server.sqlite")
 
 app.config.update(
-    SESSION_TYPE="filesystem",
-    SESSION_FILE_DIR=SESSION_DIR,
     SESSION_PERMANENT=False,
-    SESSION_USE_SIGNER=True,
     SESSION_COOKIE_HTTPONLY=True,
     SESSION_COOKIE_SECURE=False,
     SESSION_COOKIE_SAMESITE="Lax",
 )
-Session(app)
 
 
 # =====================================================
@@ -43,6 +47,15 @@ DEFAULT_ROLE = "user"
 TOKEN_DURATION_MINUTES = 1
 REFRESH_DURATION_MINUTES = 5
 
+# Session disimpan per key dengan TTL = sisa umur refresh token (logout hanya menghapus key milik user)
+session_backend = (SQLiteSessionBackend(SESSION_DB_PATH) if SESSION_BACKEND == "sqlite"
+                   else MemorySessionBackend())
+app.session_interface = ServerSessionInterface(
+    session_backend,
+    ttl=REFRESH_DURATION_MINUTES * 60,
+    expiry_key="refresh_expiry",
+)
+
 
 # =====================================================
 # HELPER: Ambil Bearer Token dari Authorization Header
@@ -56,18 +69,12 @@ def get_bearer_token():
 
 
 # =====================================================
-# HELPER: Hapus semua session di direktori SESSION_DIR
+# HELPER: Hapus session milik user saat ini saja
 # =====================================================
-def clear_all_sessions():
-    """Menghapus seluruh file session di ./sessions_server"""
-    try:
-        for f in os.listdir(SESSION_DIR):
-            file_path = os.path.join(SESSION_DIR, f)
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-        print("🧹 Semua session dihapus dari folder sessions_server")
-    except Exception as e:
-        print(f"⚠️ Gagal menghapus session files: {e}")
+def end_session():
+    """Menghapus session request ini dari backend (O(1), user lain tidak ikut logout)"""
+    destroy_session(session)
+    print("🧹 Session user ini dihapus dari session store")
 
 
 # =====================================================
@@ -77,7 +84,7 @@ def token_required(f):
     """Decorator untuk memeriksa validitas token di setiap endpoint"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        now_ts = int(datetime.now(timezone.utc).timestamp())
+        now_ts = clock.now()                # epoch detik (int) yang di-cache, tanpa datetime
         username = session.get("username")
         refresh_token = session.get("refresh_token")
         token_expiry = session.get("token_expiry", 0)
@@ -88,8 +95,7 @@ def token_required(f):
             print("⚠️ Kedua token kadaluarsa → hapus session dan revoke DB")
             if username:
                 revoke_user_tokens(username)
-            session.clear()
-            clear_all_sessions()  # <--- tambahkan di sini
+            end_session()
             return redirect(url_for("generate"))
 
         # Jika access token expired tapi refresh masih valid → redirect ke refresh
@@ -112,9 +118,8 @@ def generate():
         email = request.form.get("email")
         password = request.form.get("password")
 
-        now = datetime.now(timezone.utc)
-        exp_time = now + timedelta(minutes=TOKEN_DURATION_MINUTES)
-        exp_ts = int(exp_time.timestamp())
+        now_ts = clock.now()
+        exp_ts = now_ts + TOKEN_DURATION_MINUTES * 60
 
         # Access Token
         payload = {
@@ -122,8 +127,8 @@ def generate():
             "email": email,
             "password": password,  # ⚠️ hanya untuk pembelajaran
             "role": DEFAULT_ROLE,
-            "iat": int(now.timestamp()),
-            "nbf": int(now.timestamp()),
+            "iat": now_ts,
+            "nbf": now_ts,
             "exp": exp_ts,
         }
 
@@ -133,17 +138,17 @@ def generate():
             session["token_expiry"] = exp_ts
 
             # Refresh Token
-            refresh_exp_time = now + timedelta(minutes=REFRESH_DURATION_MINUTES)
+            refresh_exp_ts = now_ts + REFRESH_DURATION_MINUTES * 60
             refresh_payload = {
                 "sub": username,
                 "type": "refresh",
-                "iat": int(now.timestamp()),
-                "exp": int(refresh_exp_time.timestamp()),
+                "iat": now_ts,
+                "exp": refresh_exp_ts,
             }
             refresh_result = create_jwt(refresh_payload, secret=HARDCODED_SECRET)
 
             session["refresh_token"] = refresh_result["token"]
-            session["refresh_expiry"] = int(refresh_exp_time.timestamp())
+            session["refresh_expiry"] = refresh_exp_ts
             session["username"] = username
             session.modified = True
 
@@ -153,7 +158,7 @@ def generate():
                 access_token=result["token"],
                 refresh_token=refresh_result["token"],
                 token_expiry=exp_ts,
-                refresh_expiry=int(refresh_exp_time.timestamp()),
+                refresh_expiry=refresh_exp_ts,
             )
 
             print("\n===== TOKEN DIBUAT =====")
@@ -184,7 +189,7 @@ def decode():
     token = None
     token_source = None
 
-    now_ts = int(datetime.now(timezone.utc).timestamp())
+    now_ts = clock.now()
 
     print("\n===== DEBUG DECODE =====")
     print("Session saat ini:")
@@ -200,8 +205,7 @@ def decode():
             return redirect(url_for("refresh"))
         else:
             print("❌ Kedua token kadaluarsa, hapus session dan file session\n")
-            session.clear()
-            clear_all_sessions()  # <--- tambahkan di sini juga
+            end_session()
             error = "❌ Token dan refresh token telah kadaluarsa."
             return render_template_string(DECODE_TEMPLATE, error=error)
 
@@ -232,7 +236,7 @@ def decode():
         except Exception as e:
             error = f"Error parsing token: {str(e)}"
             print(f"❌ Gagal decode token: {error}")
-            clear_all_sessions()  # <--- jika token invalid
+            end_session()  # <--- jika token invalid
 
     print("========================\n")
 
@@ -246,7 +250,7 @@ def decode():
 # =====================================================
 @app.route("/refresh")
 def refresh():
-    now_ts = int(datetime.now(timezone.utc).timestamp())
+    now_ts = clock.now()
 
     print("\n===== DEBUG REFRESH =====")
     print("Session sebelum refresh:")
@@ -258,38 +262,36 @@ def refresh():
 
     if not refresh_token or not username:
         print("❌ Tidak ada refresh token atau username dalam session\n")
-        clear_all_sessions()
+        end_session()
         return redirect(url_for("generate"))
 
     if now_ts > session.get("refresh_expiry", 0):
         print("❌ Refresh token kadaluarsa → hapus session & revoke DB\n")
         revoke_user_tokens(username)
-        session.clear()
-        clear_all_sessions()
+        end_session()
         return redirect(url_for("generate"))
 
     try:
         refresh_decoded = decode_jwt(refresh_token, secret=HARDCODED_SECRET)
-        now = datetime.now(timezone.utc)
-        new_exp_time = now + timedelta(minutes=TOKEN_DURATION_MINUTES)
+        new_exp_ts = now_ts + TOKEN_DURATION_MINUTES * 60
         new_payload = {
             "username": username,
             "role": DEFAULT_ROLE,
-            "iat": int(now.timestamp()),
-            "nbf": int(now.timestamp()),
-            "exp": int(new_exp_time.timestamp()),
+            "iat": now_ts,
+            "nbf": now_ts,
+            "exp": new_exp_ts,
         }
         new_token = create_jwt(new_payload, secret=HARDCODED_SECRET)
 
         session["jwt_token"] = new_token["token"]
-        session["token_expiry"] = int(new_exp_time.timestamp())
+        session["token_expiry"] = new_exp_ts
         session.modified = True
 
-        update_access_token(username, new_token["token"], int(new_exp_time.timestamp()))
+        update_access_token(username, new_token["token"], new_exp_ts)
 
         print("✅ TOKEN BERHASIL DIREFRESH")
         print(f"🔐 Access Token Baru: {new_token['token']}")
-        print(f"🕒 Expiry Baru       : {int(new_exp_time.timestamp())}")
+        print(f"🕒 Expiry Baru       : {new_exp_ts}")
         print("💾 Database diperbarui")
         print("Session sesudah refresh:")
         for k, v in dict(session).items():
@@ -301,8 +303,7 @@ def refresh():
     except Exception as e:
         print(f"❌ Gagal decode refresh token: {e}\n")
         revoke_user_tokens(username)
-        session.clear()
-        clear_all_sessions()
+        end_session()
         return f"Refresh token tidak valid: {str(e)}"
 
 
@@ -314,24 +315,41 @@ def logout():
     username = session.get("username")
     if username:
         revoke_user_tokens(username)
-    session.clear()
-    clear_all_sessions()
-    print("🔒 Logout → token direvoke & semua session dihapus\n")
+    end_session()
+    print("🔒 Logout → token direvoke & session user dihapus\n")
     return redirect(url_for("generate"))
 
 
 # =====================================================
-# ROUTE: CEK ISI DATABASE (debug)
+# ROUTE: CEK ISI DATABASE (audit export, streaming)
 # =====================================================
+# /db?format=ndjson|csv&status=active&token_expiry_from=..&token_expiry_to=..
+#    &refresh_expiry_from=..&refresh_expiry_to=..&after_id=..&limit=..
+# Response chunked: baris dibaca per batch (fetchmany) dan langsung dikirim,
+# halaman berikutnya diminta dengan after_id = id terakhir yang diterima.
+EXPORT_FORMATS = {
+    "ndjson": (export_ndjson, "application/x-ndjson"),
+    "csv": (export_csv, "text/csv"),
+}
+EXPORT_INT_ARGS = ("token_expiry_from", "token_expiry_to", "refresh_expiry_from", "refresh_expiry_to")
+
+
 @app.route("/db")
 @token_required
 def show_db():
-    rows = get_all_tokens()
-    print("\n===== DEBUG DATABASE =====")
-    for row in rows:
-        print(row)
-    print("==========================\n")
-    return f"<pre>{rows}</pre>"
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in EXPORT_FORMATS:
+        return {"error": f"format harus salah satu dari: {', '.join(EXPORT_FORMATS)}"}, 400
+
+    # argumen angka yang tidak valid diabaikan (request.args.get type=int → None)
+    filters = {key: request.args.get(key, type=int) for key in EXPORT_INT_ARGS}
+    filters["status"] = request.args.get("status")
+    after_id = request.args.get("after_id", 0, type=int)
+    rows = iter_tokens(after_id=after_id, limit=request.args.get("limit", type=int), **filters)
+
+    serializer, mimetype = EXPORT_FORMATS[fmt]
+    print(f"📤 Export tabel tokens ({fmt}) mulai id > {after_id}")
+    return Response(stream_with_context(serializer(rows)), mimetype=mimetype)
 
 
 # =====================================================
@@ -345,7 +363,7 @@ def protected():
     token_source = "Authorization header" if get_bearer_token() else "session"
 
     if not token:
-        clear_all_sessions()
+        end_session()
         return {"error": "Missing Bearer or session token"}, 401
 
     try:
@@ -359,7 +377,7 @@ def protected():
             "expires_at": decoded["payload"].get("exp"),
         }
     except Exception as e:
-        clear_all_sessions()
+        end_session()
         return {"error": f"Invalid or expired token: {str(e)}"}, 401
 
 
@@ -0,0 +1,79 @@
+# Codec base64url (binascii + translate) harus identik dengan implementasi lama
+# berbasis modul base64, termasuk input tidak valid.
+
+import base64
+import os
+
+import pytest
+
+from basic_token.base64url import (
+    base64url_decode, base64url_decode_many, base64url_encode, base64url_encode_many,
+)
+
+
+def _legacy_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _legacy_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+@pytest.mark.parametrize("size", range(0, 97))
+def test_round_trip_matches_legacy(size):
+    raw = os.urandom(size)
+    encoded = base64url_encode(raw)
+    assert encoded == _legacy_encode(raw)
+    assert "=" not in encoded and "+" not in encoded and "/" not in encoded
+    assert base64url_decode(encoded) == raw
+    assert base64url_decode(encoded.encode()) == raw
+
+
+@pytest.mark.parametrize("size, padding", [(3, 0), (4, 2), (5, 1), (6, 0)])
+def test_padding_lengths(size, padding):
+    # '=' yang dibuang encode harus dikembalikan decode (0, 1 atau 2 karakter;
+    # sisa panjang 1 → butuh 3 '=' → tidak valid, lihat test_invalid_input_raises_value_error)
+    raw = bytes(range(250, 250 + size))
+    encoded = base64url_encode(raw)
+    assert base64.urlsafe_b64encode(raw).decode() == encoded + "=" * padding
+    assert (len(encoded) + padding) % 4 == 0
+    assert base64url_decode(encoded) == raw
+
+
+def test_url_safe_alphabet():
+    raw = b"\xfb\xff\xbf"               # standar: "+/+/" → URL-safe: "-_-_"
+    assert base64url_encode(raw) == "-_-_"
+    assert base64url_decode("-_-_") == raw
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview])
+def test_buffer_input(wrap):
+    raw = os.urandom(33)
+    encoded = _legacy_encode(raw)
+    assert base64url_encode(wrap(raw)) == encoded
+    assert base64url_decode(wrap(encoded.encode())) == raw
+
+
+def test_memoryview_slice():
+    raw = os.urandom(48)
+    buf = memoryview(b"xx" + raw + b"yy")[2:-2]
+    assert base64url_encode(buf) == _legacy_encode(raw)
+
+
+@pytest.mark.parametrize("bad", ["a", "abcde", "abéc", b"a", memoryview(b"abcde")])
+def test_invalid_input_raises_value_error(bad):
+    with pytest.raises(ValueError):
+        base64url_decode(bad)
+
+
+def test_many_matches_single():
+    raws = [os.urandom(n) for n in range(64)]
+    encoded = [_legacy_encode(r) for r in raws]
+    assert base64url_encode_many(raws) == encoded
+    assert base64url_decode_many(encoded) == raws
+    assert base64url_decode_many([e.encode() for e in encoded]) == raws
+
+
+def test_many_invalid_input_raises_value_error():
+    with pytest.raises(ValueError):
+        base64url_decode_many(["YQ", "a"])
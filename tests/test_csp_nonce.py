@@ -0,0 +1,51 @@
+# g.nonce tetap str; dengan NonceGlobals baru dibuat saat pertama kali dibaca.
+
+import json
+
+import pytest
+from flask import Flask, g, jsonify
+
+from web_f_secure.header import NonceGlobals, apply_secure_headers, generate_nonce
+
+
+def _app(lazy):
+    app = Flask(__name__)
+    if lazy:
+        app.app_ctx_globals_class = NonceGlobals
+    app.before_request(generate_nonce)
+    app.after_request(apply_secure_headers)
+
+    @app.route("/nonce")
+    def nonce():
+        return jsonify(nonce=g.nonce, is_str=isinstance(g.nonce, str), dumped=json.loads(json.dumps(g.nonce)),
+                       via_get=g.get("nonce"), upper=g.nonce.upper())
+
+    @app.route("/plain")
+    def plain():
+        return "ok"
+
+    return app
+
+
+def _script_src(response):
+    return next(part for part in response.headers["Content-Security-Policy"].split(";") if "script-src" in part)
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_nonce_is_a_plain_str(lazy):
+    response = _app(lazy).test_client().get("/nonce")
+    body = response.get_json()
+    assert body["is_str"] is True
+    assert body["nonce"] == body["dumped"] == body["via_get"]
+    assert body["upper"] == body["nonce"].upper()
+    assert f"'nonce-{body['nonce']}'" in _script_src(response)
+
+
+def test_unread_lazy_nonce_is_left_out_of_csp():
+    response = _app(lazy=True).test_client().get("/plain")
+    assert "nonce-" not in _script_src(response)
+
+
+def test_nonce_is_unique_per_request():
+    client = _app(lazy=True).test_client()
+    assert client.get("/nonce").get_json()["nonce"] != client.get("/nonce").get_json()["nonce"]
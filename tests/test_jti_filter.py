@@ -0,0 +1,62 @@
+# Bloom filter jti + rotasi refresh token: reuse token lama tetap memicu revoke-all
+# walaupun filter sudah di-rebuild (startup / compaction) setelah rotasi.
+
+import pytest
+
+from web_f_secure.tokens.storage import TokenStore
+from web_f_secure.tokens.storage_memory import MemoryTokenStore
+from web_f_secure.tokens.token_manager import TokenManager
+from web_f_secure.tokens.utils import hash_token_hmac
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        store = MemoryTokenStore(shards=4)
+    else:
+        store = TokenStore(str(tmp_path / "tokens.db"))
+    store.enable_jti_filter(capacity=1000, fp_rate=0.01)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def manager():
+    return TokenManager(secret_key="test-secret", issuer="test", salt="test-salt", verify_cache_size=0)
+
+
+def _login(manager, store, username="alice"):
+    _, refresh, jti = manager.create_token_pair(username)
+    store.insert_refresh(jti, username, hash_token_hmac(refresh, manager.salt), manager.refresh_exp_ts())
+    return refresh, jti
+
+
+def test_reuse_after_rebuild_revokes_all(manager, store):
+    old_refresh, old_jti = _login(manager, store)
+    rotated = manager.rotate_refresh(old_refresh, store)
+    assert rotated["ok"]
+    _, _, new_jti = rotated["tokens"]
+
+    store.rebuild_jti_filter()
+    assert store.might_have_refresh(old_jti)
+
+    reused = manager.rotate_refresh(old_refresh, store)
+    assert not reused["ok"]
+    assert reused["msg"] == "refresh token reuse detected"
+    assert store.get_refresh_by_jti(new_jti)["revoked"]
+
+
+def test_revoked_hit_is_not_a_false_positive(manager, store):
+    old_refresh, _ = _login(manager, store)
+    manager.rotate_refresh(old_refresh, store)
+    manager.rotate_refresh(old_refresh, store)
+    assert store.jti_filter.false_positives == 0
+
+
+def test_unknown_jti_rejected_without_revoke(manager, store):
+    _, jti = _login(manager, store)
+    _, forged, _ = manager.create_token_pair("alice")   # signed but never stored
+
+    result = manager.rotate_refresh(forged, store)
+    assert result == {"ok": False, "msg": "refresh token not recognized", "tokens": None}
+    assert not store.get_refresh_by_jti(jti)["revoked"]
@@ -0,0 +1,31 @@
+# verify_signature hanya menerima signature Base64URL kanonik (tanpa token malleability).
+
+import string
+
+import pytest
+
+from basic_token.jwt_service import create_jwt, decode_jwt
+
+SECRET = "test-secret"
+ALPHABET = string.ascii_letters + string.digits + "-_"
+
+
+@pytest.fixture
+def token():
+    return create_jwt({"username": "alice"}, secret=SECRET)["token"]
+
+
+def test_canonical_signature_verifies(token):
+    assert decode_jwt(token, secret=SECRET, use_cache=False)["payload"]["username"] == "alice"
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda sig: sig[:-1] + ALPHABET[ALPHABET.index(sig[-1]) ^ 1],   # trailing bit bukan nol
+    lambda sig: sig + "=",                                          # padding
+    lambda sig: sig[:5] + "\n" + sig[5:],                           # karakter di luar alfabet
+    lambda sig: sig[:5] + "+" + sig[5:],
+])
+def test_non_canonical_signature_rejected(token, mutate):
+    header, payload, signature = token.split(".")
+    with pytest.raises(Exception, match="Signature tidak valid"):
+        decode_jwt(f"{header}.{payload}.{mutate(signature)}", secret=SECRET, use_cache=False)
@@ -0,0 +1,71 @@
+# load_secure_session: cache per request tidak boleh memenuhi panggilan yang
+# meminta pemeriksaan lebih ketat daripada yang sudah dijalankan.
+
+import pytest
+from flask import Flask
+
+from web_f_secure.cookies.session_protection import load_secure_session
+from web_f_secure.cookies.utils import sign_data
+
+app = Flask(__name__)
+app.secret_key = "test-secret"
+
+
+@pytest.fixture
+def make_request():
+    contexts = []
+
+    def make(cookie):
+        ctx = app.test_request_context("/", headers={"Cookie": f"session_id={cookie}"})
+        ctx.push()
+        contexts.append(ctx)
+        return ctx.request
+
+    yield make
+    for ctx in reversed(contexts):
+        ctx.pop()
+
+
+def _signed(value):
+    with app.app_context():
+        return f"{value}|{sign_data(value)}"
+
+
+def test_unverified_parse_does_not_satisfy_verified_call(make_request):
+    request = make_request("abc|not-a-signature")
+    assert load_secure_session(request, verify_signature_flag=False).valid
+    assert not load_secure_session(request, verify_signature_flag=True).valid
+
+
+def test_stricter_result_is_reused(make_request):
+    request = make_request(_signed("abc"))
+    calls = []
+
+    def lookup(session_id):
+        calls.append(session_id)
+        return {"revoked": True}
+
+    first = load_secure_session(request, server_side_lookup=lookup)
+    assert not first.valid
+    # panggilan tanpa lookup memakai hasil yang lebih ketat (revoked tetap tidak valid)
+    assert load_secure_session(request) is first
+    assert load_secure_session(request, server_side_lookup=lookup) is first
+    assert calls == ["abc"]
+
+
+def test_lookup_requested_after_plain_verify(make_request):
+    request = make_request(_signed("abc"))
+    assert load_secure_session(request).valid
+    assert not load_secure_session(request, server_side_lookup=lambda sid: {"revoked": True}).valid
+
+
+def test_fingerprint_func_is_part_of_the_check(make_request):
+    request = make_request(_signed("abc|fp-1"))
+    assert load_secure_session(request, fingerprint_func=lambda: "fp-1").valid
+    assert not load_secure_session(request, fingerprint_func=lambda: "fp-2").valid
+
+
+def test_unbound_result_does_not_satisfy_bound_call(make_request):
+    request = make_request(_signed("abc|fp-1"))
+    assert load_secure_session(request, bind_fingerprint=False).valid
+    assert not load_secure_session(request, fingerprint_func=lambda: "fp-2").valid
@@ -0,0 +1,56 @@
+# SessionStore (timing wheel): eviction saat memori penuh & counter stats antar thread.
+
+import threading
+import time
+
+from web_f_secure.cookies.session_store import SessionStore
+
+
+def _meta(max_age=3600):
+    now = int(time.time())
+    return {"created_at": now, "last_activity": now, "max_age": max_age,
+            "idle_timeout": None, "absolute_timeout": None}
+
+
+def test_evicts_nearest_expiry_when_full():
+    store = SessionStore(shards=4, wheel_slots=64, max_sessions=2)
+    store.save("soon", _meta(max_age=5))
+    store.save("late-1", _meta(max_age=30))
+    store.save("late-2", _meta(max_age=40))
+    assert len(store) == 2
+    assert store.lookup("soon") is None
+    assert store.lookup("late-1") is not None
+    assert store.stats["evicted"] == 1
+
+
+def test_insert_does_not_spin_when_wheel_has_nothing_to_evict(monkeypatch):
+    store = SessionStore(shards=4, wheel_slots=16, max_sessions=1)
+    store.save("a", _meta())
+    # slot hanya berisi id usang & entry baru langsung diambil thread lain
+    for slot in store._wheel:
+        slot.clear()
+        slot.add("stale-id")
+    monkeypatch.setattr(store, "_schedule", lambda session_id, deadline: None)
+
+    done = threading.Event()
+    worker = threading.Thread(target=lambda: (store.save("b", _meta()), done.set()), daemon=True)
+    worker.start()
+    assert done.wait(5), "save() spun forever in the eviction loop"
+    assert len(store) == 2
+
+
+def test_stats_are_not_lost_across_threads():
+    store = SessionStore(shards=8, wheel_slots=64)
+    threads, per_thread = 8, 500
+
+    def worker(n):
+        for i in range(per_thread):
+            store.save(f"s{n}-{i}", _meta())
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    assert store.stats["stored"] == threads * per_thread
+    assert len(store) == threads * per_thread
@@ -0,0 +1,116 @@
+# Kontrak BaseTokenStore dijalankan terhadap setiap backend:
+# MemoryTokenStore, TokenStore (SQLite) dan RedisTokenStore di atas FakeRedisServer lokal.
+
+import time
+import uuid
+
+import pytest
+
+from web_f_secure.tokens.fake_redis import FakeRedisServer
+from web_f_secure.tokens.storage import TokenStore
+from web_f_secure.tokens.storage_base import BaseTokenStore
+from web_f_secure.tokens.storage_memory import MemoryTokenStore
+from web_f_secure.tokens.storage_redis import RedisTokenStore
+
+
+@pytest.fixture(scope="module")
+def redis_server():
+    server = FakeRedisServer(port=0)
+    host, port = server.start()
+    yield host, port
+    server.stop()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        store = MemoryTokenStore(shards=4)
+    elif request.param == "sqlite":
+        store = TokenStore(str(tmp_path / "tokens.db"))
+    else:
+        host, port = request.getfixturevalue("redis_server")
+        # prefix unik per test → keyspace server bersama tidak saling bocor
+        store = RedisTokenStore(host=host, port=port, prefix=f"t{uuid.uuid4().hex[:8]}:")
+    assert isinstance(store, BaseTokenStore)
+    yield store
+    store.close()
+
+
+def _future(seconds=3600):
+    return int(time.time()) + seconds
+
+
+def test_insert_and_get(store):
+    store.insert_refresh("jti-1", "alice", "hash-1", _future())
+    assert store.get_refresh_by_jti("jti-1") == {
+        "jti": "jti-1", "username": "alice", "token_hash": "hash-1", "revoked": False,
+    }
+    assert store.get_refresh_by_jti("missing") is None
+
+
+def test_insert_same_jti_replaces_record(store):
+    store.insert_refresh("jti-1", "alice", "hash-1", _future())
+    store.mark_revoked("jti-1")
+    store.insert_refresh("jti-1", "alice", "hash-2", _future())
+    rec = store.get_refresh_by_jti("jti-1")
+    assert rec["token_hash"] == "hash-2"
+    assert rec["revoked"] is False
+
+
+def test_mark_revoked(store):
+    store.insert_refresh("jti-1", "alice", "hash-1", _future())
+    store.insert_refresh("jti-2", "alice", "hash-2", _future())
+    store.mark_revoked("jti-1")
+    store.mark_revoked("missing")              # jti tak dikenal: no-op
+    assert store.get_refresh_by_jti("jti-1")["revoked"] is True
+    assert store.get_refresh_by_jti("jti-2")["revoked"] is False
+    assert store.get_refresh_by_jti("missing") is None
+
+
+def test_revoke_all_for_user(store):
+    for i in range(3):
+        store.insert_refresh(f"a-{i}", "alice", f"hash-{i}", _future())
+    store.insert_refresh("b-0", "bob", "hash-b", _future())
+
+    store.revoke_all_for_user("alice")
+    store.revoke_all_for_user("nobody")
+    assert all(store.get_refresh_by_jti(f"a-{i}")["revoked"] for i in range(3))
+    assert store.get_refresh_by_jti("b-0")["revoked"] is False
+
+
+def test_csrf_lookup(store):
+    store.insert_refresh("jti-1", "alice", "hash-1", _future())
+    store.store_csrf_for_jti("jti-1", "csrf-value")
+    store.store_csrf_for_jti("no-refresh", "orphan-value")
+    assert store.get_csrf_for_jti("jti-1") == "csrf-value"
+    assert store.get_csrf_for_jti("no-refresh") == "orphan-value"
+    assert store.get_csrf_for_jti("missing") is None
+
+    store.store_csrf_for_jti("jti-1", "rotated")
+    assert store.get_csrf_for_jti("jti-1") == "rotated"
+
+
+def test_purge_expired(store):
+    store.insert_refresh("live", "alice", "hash-live", _future())
+    store.store_csrf_for_jti("live", "csrf-live")
+    store.insert_refresh("dead", "alice", "hash-dead", int(time.time()) - 10)
+
+    stats = store.purge_expired(batch_size=10)
+    assert {"refresh_purged", "csrf_purged", "batches", "elapsed_ms"} <= stats.keys()
+    assert store.get_refresh_by_jti("dead") is None
+    assert store.get_refresh_by_jti("live")["revoked"] is False
+    assert store.get_csrf_for_jti("live") == "csrf-live"
+
+    # index user tetap konsisten setelah purge
+    store.revoke_all_for_user("alice")
+    assert store.get_refresh_by_jti("live")["revoked"] is True
+    assert store.get_refresh_by_jti("dead") is None
+
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class Partial(BaseTokenStore):
+        def insert_refresh(self, jti, username, token_hash, expires_at):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -2,40 +2,55 @@ from flask import request, g
 import logging
 
 from .cookies_xss import mitigate_cookie_theft_via_xss
-from .csrf_protection import set_csrf_cookie, verify_csrf_request
-from .session_protection import create_secure_session_cookie, verify_secure_session_cookie
+from .csrf_protection import set_csrf_cookie, verify_csrf_request, CSRFSigner
+from .session_protection import (
+    create_secure_session_cookie, verify_secure_session_cookie, load_secure_session, VerifiedSession,
+)
 from .headers import set_security_headers
+from .session_store import SessionStore, SQLiteSessionTier
+from .route_rules import RouteMatcher, RouteRules
 
 logger = logging.getLogger("security")
 
 
-def apply_secure_cookies(app, excluded_routes=None):
+def apply_secure_cookies(app, excluded_routes=None, session_store=None, idle_timeout=None,
+                         absolute_timeout=None, included_routes=None, csrf_signer=None):
     """
     Middleware entry+exit untuk keamanan cookie, session, CSRF, dan header.
+    excluded_routes / included_routes: rule endpoint, blueprint ("admin.*"), glob path
+    ("/static/**") dan method ("GET /health") — lihat route_rules; boleh juga RouteMatcher.
+    session_store (mis. SessionStore) mengaktifkan validasi server-side
+    (revoke, idle_timeout, absolute_timeout) lewat save/lookup.
+    csrf_signer (CSRFSigner) mengaktifkan token CSRF stateless yang terikat ke session id.
     """
-    if excluded_routes is None:
-        excluded_routes = []
+    # compile rule sekali saat registrasi
+    if isinstance(excluded_routes, RouteMatcher):
+        matcher = excluded_routes
+    else:
+        matcher = RouteMatcher(excluded_routes or (), included_routes or ())
+
+    store_hook = session_store.save if session_store is not None else None
+    lookup_hook = session_store.lookup if session_store is not None else None
 
     @app.before_request
     def before_request():
-        g.fingerprint = (
-            f"{request.headers.get('X-Forwarded-For', request.remote_addr)}|"
-            f"{request.headers.get('User-Agent','')[:100]}"
-        )
+        # fingerprint & hasil verifikasi session dihitung sekali lalu disimpan di g
+        # (g.fingerprint, g.secure_session) untuk dipakai ulang oleh after_request
         endpoint = request.endpoint
 
         # Skip excluded routes
-        if endpoint in excluded_routes:
+        if matcher.is_excluded(request):
             return None
 
         # Verifikasi session cookie
-        if not verify_secure_session_cookie(request):
+        if not verify_secure_session_cookie(request, server_side_lookup=lookup_hook):
             logger.warning(f"Invalid session for {endpoint} from {request.remote_addr}")
             return {"error": "Invalid session"}, 401
 
         # Validasi CSRF hanya untuk request write
         if request.method in ["POST", "PUT", "DELETE"]:
-            if not verify_csrf_request(request):
+            binding = g.secure_session.session_id if csrf_signer is not None else None
+            if not verify_csrf_request(request, signer=csrf_signer, binding=binding):
                 logger.warning(f"CSRF verification failed for {endpoint} from {request.remote_addr}")
                 return {"error": "CSRF verification failed"}, 403
 
@@ -43,14 +58,53 @@ def apply_secure_cookies(app, excluded_routes=None):
 
     @app.after_request
     def after_request(response):
-        endpoint = request.endpoint
-
-        if endpoint in excluded_routes:
+        if matcher.is_excluded(request):
             return response
 
         # Terapkan semua lapisan proteksi response
+        # (session cookie sudah membawa atribut anti-XSS: HttpOnly, Priority=High,
+        #  jadi tidak perlu cookie session_id kedua dari mitigate_cookie_theft_via_xss)
         response = set_security_headers(response)
-        response = mitigate_cookie_theft_via_xss(response)
-        response = create_secure_session_cookie(response)
-        response, _ = set_csrf_cookie(response)
+
+        # Sliding renewal: Set-Cookie hanya jika cookie hilang/invalid atau dekat kedaluwarsa
+        previous = g.get("secure_session")
+        save_hook = store_hook
+        if store_hook is not None and previous is not None and previous.valid and previous.meta:
+            # renewal merotasi session id → bawa created_at lama agar absolute_timeout tetap berlaku
+            created_at = previous.meta.get("created_at")
+            if created_at:
+                save_hook = lambda sid, meta: store_hook(sid, {**meta, "created_at": created_at})
+        response = create_secure_session_cookie(
+            response,
+            only_if_needed=True,
+            idle_timeout=idle_timeout,
+            absolute_timeout=absolute_timeout,
+            server_side_store=save_hook
+        )
+        csrf_token = request.cookies.get("csrf_token")
+        session_state = g.get("session_cookie")
+
+        # session id lama yang dirotasi tidak perlu disimpan lagi
+        if session_store is not None and session_state == "renewed" and previous is not None:
+            new_session = g.get("issued_session_id")
+            if new_session and new_session != previous.session_id:
+                session_store.delete(previous.session_id)
+
+        if csrf_signer is not None:
+            # token stateless: terbitkan ulang jika hilang, tidak cocok dengan session id
+            # yang berlaku, atau sudah di bucket terakhir / key lama
+            if session_state == "kept":
+                binding = previous.session_id
+            else:
+                binding = g.get("issued_session_id")
+            if (session_state == "issued" or csrf_signer.is_stale(csrf_token)
+                    or not csrf_signer.verify(csrf_token, binding)):
+                response, _ = set_csrf_cookie(response, signer=csrf_signer, binding=binding)
+            elif session_state == "renewed":
+                response, _ = set_csrf_cookie(response, token=csrf_token)
+        elif not csrf_token or session_state == "issued":
+            response, _ = set_csrf_cookie(response)
+        elif session_state == "renewed":
+            # perpanjang Max-Age dengan token yang sama (form yang terbuka tetap valid)
+            response, _ = set_csrf_cookie(response, token=csrf_token)
         return response
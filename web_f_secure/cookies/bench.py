@@ -0,0 +1,57 @@
+# Micro-benchmark biaya cookie per response.
+# Jalankan dari root repo:  python -m web_f_secure.cookies.bench
+
+from flask import Flask, Response
+from werkzeug.http import dump_cookie
+from bench_utils import timeit
+
+from .cookie_writer import get_cookie_policy
+from .csrf_protection import set_csrf_cookie
+from .session_protection import create_secure_session_cookie
+from .utils import generate_token, sign_data
+
+
+def _legacy_cookies(response, host, fingerprint):
+    """Cara lama: set_cookie + tulis ulang semua Set-Cookie untuk atribut tambahan."""
+    response.set_cookie("session_id", generate_token(32), max_age=1800, path="/", domain=host,
+                        secure=True, httponly=True, samesite="Strict")
+    updated = [h + "; Priority=High" if h.startswith("session_id=") else h
+               for h in response.headers.getlist("Set-Cookie")]
+    response.headers.set("Set-Cookie", ", ".join(updated))
+
+    session_data = f"{generate_token(24)}|{fingerprint}"
+    response.set_cookie("session_id", f"{session_data}|{sign_data(session_data)}", max_age=1800, path="/",
+                        domain=host, secure=True, httponly=True, samesite="Strict")
+    response.set_cookie("csrf_token", generate_token(32), max_age=1800, path="/", domain=host,
+                        secure=True, httponly=False, samesite="Lax")
+    return response
+
+
+def _single_pass_cookies(response):
+    response = create_secure_session_cookie(response, fingerprint_func=lambda: "f" * 32)
+    response, _ = set_csrf_cookie(response)
+    return response
+
+
+def bench_cookies(count=20000):
+    app = Flask(__name__)
+    app.secret_key = "bench-secret-key"
+
+    print(f"\n===== Set-Cookie, {count} response =====")
+    with app.test_request_context("/", base_url="https://localhost:5000"):
+        timeit("set_cookie + rewrite (lama)",
+               lambda: [_legacy_cookies(Response(), "localhost:5000", "f" * 32) for _ in range(count)], count)
+        timeit("cookie_writer satu pass",
+               lambda: [_single_pass_cookies(Response()) for _ in range(count)], count)
+
+    policy = get_cookie_policy("session_id", 1800, priority="High")
+    print(f"\n===== serialisasi satu cookie, {count * 5} kali =====")
+    timeit("werkzeug dump_cookie",
+           lambda: [dump_cookie("session_id", "v", max_age=1800, domain="localhost", secure=True,
+                                httponly=True, samesite="Strict") for _ in range(count * 5)], count * 5)
+    timeit("CookiePolicy.header",
+           lambda: [policy.header("v", "localhost") for _ in range(count * 5)], count * 5)
+
+
+if __name__ == "__main__":
+    bench_cookies()
@@ -0,0 +1,113 @@
+import re
+import time
+from functools import lru_cache
+from werkzeug.http import dump_cookie, http_date
+
+# ============================================================
+# 🍪 SERIALIZER SET-COOKIE SATU PASS
+# ============================================================
+# Atribut statis (Max-Age, Secure, HttpOnly, Path, SameSite, Priority, Partitioned,
+# SameParty) di-compile sekali per policy; per response hanya value, Domain & Expires
+# yang diisi. Setiap cookie ditulis sebagai satu baris Set-Cookie sendiri.
+
+_COOKIE_NO_QUOTE = re.compile(r"[\w!#$%&'()*+\-./:<=>?@\[\]^`{|}~]*", re.ASCII)
+
+
+def _quote_value(value: str) -> str:
+    # Nilai token biasa tidak perlu quote; sisanya ikuti aturan werkzeug.http.dump_cookie
+    if _COOKIE_NO_QUOTE.fullmatch(value):
+        return value
+    return dump_cookie("k", value, path=None).partition("=")[2]
+
+
+@lru_cache(maxsize=256)
+def _domain_attr(domain: str) -> str:
+    # Buang port & titik depan (request.host bisa berisi "localhost:5000")
+    return "; Domain=" + domain.partition(":")[0].lstrip(".").encode("idna").decode("ascii")
+
+
+_expires_cache = {}     # max_age -> (detik epoch, "; Expires=...")
+
+
+def _expires_attr(max_age: int) -> str:
+    # http_date hanya berubah per detik → cache per (max_age, detik)
+    now = int(time.time())
+    cached = _expires_cache.get(max_age)
+    if cached is None or cached[0] != now:
+        cached = _expires_cache[max_age] = (now, "; Expires=" + http_date(now + max_age))
+    return cached[1]
+
+
+class CookiePolicy:
+    """
+    Template atribut untuk satu jenis cookie (nama + flag keamanan).
+    Buat lewat get_cookie_policy() agar template yang sama dipakai ulang.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_age: int | None = None,
+        path: str | None = "/",
+        secure: bool = True,
+        http_only: bool = True,
+        same_site: str | None = "Strict",
+        priority: str | None = None,
+        partitioned: bool = False,
+        same_party: bool = False,
+    ):
+        if same_site is not None and same_site not in {"Strict", "Lax", "None"}:
+            raise ValueError("same_site harus 'Strict', 'Lax', atau 'None'")
+        if same_site == "None" and not secure:
+            raise ValueError("Jika same_site='None', maka secure must be True")
+        if priority is not None and priority not in {"Low", "Medium", "High"}:
+            raise ValueError("priority harus 'Low', 'Medium', atau 'High'")
+
+        self.name = name
+        self.max_age = max_age
+
+        attrs = []
+        if max_age is not None:
+            attrs.append(f"Max-Age={max_age}")
+        if secure or partitioned:                   # Partitioned (CHIPS) wajib Secure
+            attrs.append("Secure")
+        if http_only:
+            attrs.append("HttpOnly")
+        if path is not None:
+            attrs.append(f"Path={path}")
+        if same_site is not None:
+            attrs.append(f"SameSite={same_site}")
+        if partitioned:
+            attrs.append("Partitioned")
+        if priority:
+            attrs.append(f"Priority={priority}")
+        if same_party:
+            attrs.append("SameParty")
+
+        self.prefix = f"{name}="
+        self.tail = "".join(f"; {a}" for a in attrs)
+
+    def header(self, value: str, domain: str | None = None, expires: str | None = None) -> str:
+        """Satu baris Set-Cookie lengkap."""
+        line = self.prefix + _quote_value(value)
+        if domain:
+            line += _domain_attr(domain)
+        if expires is not None:
+            line += "; Expires=" + expires
+        elif self.max_age is not None:
+            line += _expires_attr(self.max_age)
+        return line + self.tail
+
+
+@lru_cache(maxsize=128)
+def get_cookie_policy(name, max_age=None, path="/", secure=True, http_only=True, same_site="Strict",
+                      priority=None, partitioned=False, same_party=False) -> CookiePolicy:
+    """CookiePolicy yang di-cache per kombinasi atribut."""
+    return CookiePolicy(name, max_age, path, secure, http_only, same_site, priority, partitioned, same_party)
+
+
+def write_cookie(response, policy: CookiePolicy, value: str, domain: str | None = None,
+                 expires: str | None = None):
+    """Tambahkan satu header Set-Cookie (tanpa membaca / menulis ulang cookie lain)."""
+    response.headers.add("Set-Cookie", policy.header(value, domain, expires))
+    return response
@@ -1,5 +1,6 @@
 from flask import Response, request
 from .utils import generate_token
+from .cookie_writer import get_cookie_policy, write_cookie
 
 def mitigate_cookie_theft_via_xss(
     response: Response,                      # Objek response Flask tempat cookie akan disisipkan
@@ -26,54 +27,19 @@ def mitigate_cookie_theft_via_xss(
     if session_value is None:
         session_value = generate_token(32)  # gunakan token acak aman
 
-    # Validasi nilai same_site agar hanya Strict, Lax, atau None
-    if same_site not in {"Strict", "Lax", "None"}:
-        raise ValueError("same_site harus 'Strict', 'Lax', atau 'None'")
-
-    # Jika same_site=None → wajib secure=True
-    if same_site == "None" and not secure:
-        raise ValueError("Jika same_site='None', maka secure must be True")
-
-    # Set cookie ke dalam response dengan flag keamanan dasar
-    response.set_cookie(
-    key = cookie_name,       # Nama cookie yang disisipkan ke browser
-    value = session_value,   # Nilai token sesi (biasanya acak)
-    max_age = max_age,       # Masa berlaku cookie dalam detik
-    expires = expires,       # Tanggal kedaluwarsa cookie (opsional)
-    path = path,             # Jalur di mana cookie berlaku (misal hanya di /api)
-    domain = domain,         # Domain yang dapat mengakses cookie
-    secure = secure,         # Wajib menggunakan HTTPS agar cookie tidak bocor lewat HTTP
-    httponly = http_only,    # Tidak dapat diakses via JavaScript (mencegah XSS)
-    samesite = same_site     # Aturan SameSite: Strict/Lax/None → mencegah pengiriman lintas situs
-)
-
-
-    # Ambil semua header Set-Cookie yang sudah ada
-    cookie_headers = response.headers.getlist("Set-Cookie")
-
-    # Jika ada header cookie, tambahkan atribut tambahan (Priority, Partitioned, SameParty)
-    if cookie_headers:
-        updated = []
-
-        for h in cookie_headers:
-            # Cari cookie dengan nama yang sesuai
-            if h.startswith(f"{cookie_name}="):
-                extras = ""
-
-                if priority:
-                    extras += f"; Priority={priority}"
-
-                if partitioned:
-                    extras += "; Partitioned"
-
-                if same_party:
-                    extras += "; SameParty"
-
-                h = h + extras  # Tambahkan atribut tambahan
-
-            updated.append(h)
-        
-        # ⚠️ Problem: Gabungan semua header menjadi satu, tidak sesuai standar HTTP
-        response.headers.set("Set-Cookie", ", ".join(updated))
-
-    return response
+    # Semua atribut (termasuk Priority, Partitioned, SameParty) di-compile sekali per policy
+    # (validasi same_site / secure ikut dilakukan saat policy dibuat)
+    policy = get_cookie_policy(
+        cookie_name,             # Nama cookie yang disisipkan ke browser
+        max_age,                 # Masa berlaku cookie dalam detik
+        path,                    # Jalur di mana cookie berlaku (misal hanya di /api)
+        secure,                  # Wajib menggunakan HTTPS agar cookie tidak bocor lewat HTTP
+        http_only,               # Tidak dapat diakses via JavaScript (mencegah XSS)
+        same_site,               # Aturan SameSite: Strict/Lax/None → mencegah pengiriman lintas situs
+        priority,                # Prioritas cookie (browser modern)
+        partitioned,             # CHIPS
+        same_party,              # Same-party context
+    )
+
+    # Satu header Set-Cookie per cookie, ditulis dalam satu pass
+    return write_cookie(response, policy, session_value, domain=domain, expires=expires)
@@ -1,6 +1,106 @@
 from flask import request, Response
-import hmac
+import base64, hashlib, hmac, re, time
 from .utils import generate_token
+from .cookie_writer import get_cookie_policy, write_cookie
+
+# ============================================================
+# 🔏 CSRF STATELESS (HMAC-BOUND)
+# ============================================================
+# Token = "kid.bucket.mac", mac = HMAC-SHA256(key[kid], "binding|bucket").
+# binding = session id (cookies) atau jti refresh token (tokens); bucket = waktu // bucket_s.
+# Verifikasi cukup hitung ulang HMAC → tidak ada tabel/dict token CSRF yang perlu dibaca/ditulis.
+# Rotasi key: token baru selalu pakai active_kid, key lama tetap diterima selama ada di keys.
+
+_KID = re.compile(r"[A-Za-z0-9_-]+")
+
+
+class CSRFSigner:
+    """
+    Penerbit & pemeriksa token CSRF stateless.
+
+    - keys: {kid: secret}; kid hanya [A-Za-z0-9_-].
+    - active_kid: key untuk token baru (default: kid pertama).
+    - bucket_s * max_buckets: umur token (token dari bucket ke-max_buckets dianggap kedaluwarsa).
+    """
+
+    def __init__(self, keys, active_kid=None, bucket_s=600, max_buckets=4):
+        if not keys:
+            raise ValueError("keys CSRFSigner tidak boleh kosong")
+        self._macs = {}
+        for kid, secret in keys.items():
+            if not _KID.fullmatch(kid):
+                raise ValueError(f"kid CSRF tidak valid: {kid!r}")
+            if isinstance(secret, str):
+                secret = secret.encode()
+            self._macs[kid] = hmac.new(secret, digestmod=hashlib.sha256)   # di-key sekali
+        self.active_kid = active_kid or next(iter(keys))
+        if self.active_kid not in self._macs:
+            raise ValueError(f"active_kid {self.active_kid!r} tidak ada di keys")
+        self.bucket_s = bucket_s
+        self.max_buckets = max(1, max_buckets)
+
+    @classmethod
+    def from_secret(cls, secret, kid="k0", **kwargs):
+        """Signer satu key, diturunkan dari secret aplikasi (domain-separated)."""
+        if isinstance(secret, str):
+            secret = secret.encode()
+        return cls({kid: hmac.new(secret, b"csrf-signer", hashlib.sha256).digest()}, **kwargs)
+
+    @classmethod
+    def from_spec(cls, spec, **kwargs):
+        """Parse "kid1:secret1,kid2:secret2" (key pertama = aktif), mis. dari env var."""
+        keys = {}
+        for item in spec.split(","):
+            kid, sep, secret = item.strip().partition(":")
+            if not sep or not secret:
+                raise ValueError("format key CSRF: kid:secret[,kid:secret...]")
+            keys[kid] = secret
+        return cls(keys, **kwargs)
+
+    def _bucket(self, now=None):
+        return int((time.time() if now is None else now) // self.bucket_s)
+
+    def _mac(self, kid, binding, bucket):
+        mac = self._macs[kid].copy()
+        mac.update(f"{binding}|{bucket}".encode())
+        return base64.urlsafe_b64encode(mac.digest()).rstrip(b"=").decode("ascii")
+
+    def _parse(self, token):
+        """Return (kid, bucket) atau None jika format/kid tidak dikenal."""
+        kid, _, rest = token.partition(".")
+        bucket, _, mac = rest.partition(".")
+        if kid not in self._macs or not mac:
+            return None
+        try:
+            return kid, int(bucket, 16)
+        except ValueError:
+            return None
+
+    def issue(self, binding, now=None) -> str:
+        bucket = self._bucket(now)
+        return f"{self.active_kid}.{bucket:x}.{self._mac(self.active_kid, binding, bucket)}"
+
+    def verify(self, token, binding, now=None) -> bool:
+        if not token or not binding:
+            return False
+        parsed = self._parse(token)
+        if parsed is None:
+            return False
+        kid, bucket = parsed
+        age = self._bucket(now) - bucket
+        if age < 0 or age >= self.max_buckets:
+            return False
+        expected = f"{kid}.{bucket:x}.{self._mac(kid, binding, bucket)}"
+        return hmac.compare_digest(expected.encode(), token.encode())     # bytes: aman untuk non-ASCII
+
+    def is_stale(self, token, now=None) -> bool:
+        """True jika token sudah di bucket terakhir atau ditandatangani key non-aktif (terbitkan ulang)."""
+        parsed = self._parse(token) if token else None
+        if parsed is None:
+            return True
+        kid, bucket = parsed
+        return kid != self.active_kid or self._bucket(now) - bucket >= self.max_buckets - 1
+
 
 def set_csrf_cookie(
     response: Response,
@@ -14,39 +114,37 @@ def set_csrf_cookie(
     secure: bool = True,
     http_only: bool = False,
     same_site: str = "Lax",
-    ensure_domain_from_request: bool = True
+    priority: str | None = None,
+    ensure_domain_from_request: bool = True,
+    signer: CSRFSigner | None = None,
+    binding: str | None = None
 ):
     """
     Set CSRF cookie (double-submit)
+    signer + binding: token diterbitkan stateless (HMAC atas binding & bucket waktu)
     """
     if domain is None and ensure_domain_from_request:
         domain = request.host
 
-    if same_site not in {"Strict", "Lax", "None"}:
-        raise ValueError("same_site harus 'Strict', 'Lax', atau 'None'")
+    policy = get_cookie_policy(cookie_name, max_age, path, secure, http_only, same_site, priority)
 
     if token is None:
-        token = generate_token(token_length)
-
-    response.set_cookie(
-        key=cookie_name,
-        value=token,
-        max_age=max_age,
-        path=path,
-        domain=domain,
-        secure=secure,
-        httponly=http_only,
-        samesite=same_site
-    )
+        token = signer.issue(binding) if signer is not None else generate_token(token_length)
+
+    write_cookie(response, policy, token, domain=domain)
     return response, token
 
 
-def verify_csrf_request(request, cookie_name="csrf_token", header_name="X-CSRF-Token") -> bool:
+def verify_csrf_request(request, cookie_name="csrf_token", header_name="X-CSRF-Token",
+                        signer: CSRFSigner | None = None, binding: str | None = None) -> bool:
     """
     Verifikasi token CSRF
+    signer + binding: token header juga harus HMAC yang valid untuk binding ini
     """
     cookie_token = request.cookies.get(cookie_name)
     header_token = request.headers.get(header_name)
     if not cookie_token or not header_token:
         return False
-    return hmac.compare_digest(cookie_token, header_token)
+    if not hmac.compare_digest(cookie_token.encode(), header_token.encode()):
+        return False
+    return signer is None or signer.verify(header_token, binding)
@@ -0,0 +1,99 @@
+import re
+from flask import g
+
+# ============================================================
+# 🚦 ATURAN EXCLUSION / INCLUSION ROUTE
+# ============================================================
+# Format rule (string), opsional diawali daftar method ("GET,HEAD /health"):
+#   "login"          → nama endpoint persis
+#   "admin.*"        → semua endpoint di blueprint "admin" (prefix "admin.")
+#   "/static/**"     → glob path URL: * = satu segmen, ** = lintas segmen, ? = satu karakter
+#   "GET /health"    → hanya untuk method tertentu
+# Rule di-compile SEKALI: endpoint tanpa method → frozenset, sisanya → satu regex.
+
+_SEP = "\x00"
+
+
+def _glob_to_regex(pattern: str) -> str:
+    out = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if ch == "*":
+            out.append(r"[^/\x00]*")
+        elif ch == "?":
+            out.append(r"[^/\x00]")
+        else:
+            out.append(re.escape(ch))
+        i += 1
+    return "".join(out)
+
+
+def _rule_to_regex(rule: str):
+    """Return (regex key "METHOD\\0endpoint\\0path", atau None jika cukup pakai frozenset)."""
+    methods, _, target = rule.strip().rpartition(" ")
+    method_re = "|".join(re.escape(m.strip().upper()) for m in methods.split(",") if m.strip()) or r"[^\x00]*"
+
+    if target.startswith("/"):
+        endpoint_re, path_re = r"[^\x00]*", _glob_to_regex(target)
+    elif target.endswith(".*"):
+        endpoint_re, path_re = re.escape(target[:-1]) + r"[^\x00]*", ".*"
+    elif not methods:
+        return None
+    else:
+        endpoint_re, path_re = re.escape(target), ".*"
+
+    return f"(?:{method_re}){_SEP}{endpoint_re}{_SEP}{path_re}"
+
+
+class RouteRules:
+    """Sekumpulan rule yang sudah di-compile (frozenset endpoint + satu regex)."""
+
+    def __init__(self, rules=()):
+        self.rules = tuple(rules)
+        endpoints, patterns = set(), []
+        for rule in self.rules:
+            regex = _rule_to_regex(rule)
+            if regex is None:
+                endpoints.add(rule.strip())
+            else:
+                patterns.append(regex)
+        self.endpoints = frozenset(endpoints)
+        self.pattern = re.compile("|".join(patterns)) if patterns else None
+
+    def matches(self, method, endpoint, path) -> bool:
+        if endpoint in self.endpoints:
+            return True
+        if self.pattern is None:
+            return False
+        return self.pattern.fullmatch(f"{method}{_SEP}{endpoint or ''}{_SEP}{path}") is not None
+
+    def __bool__(self):
+        return bool(self.rules)
+
+
+class RouteMatcher:
+    """
+    Penentu route yang dilewati proteksi session/CSRF.
+    Route dikecualikan jika cocok dengan exclude dan TIDAK cocok dengan include
+    (include dipakai untuk membuat pengecualian di dalam blueprint/glob yang di-exclude).
+    """
+
+    def __init__(self, exclude=(), include=()):
+        self.exclude = RouteRules(exclude)
+        self.include = RouteRules(include)
+
+    def is_excluded(self, request) -> bool:
+        """Hasil di-cache per request (g.route_excluded) untuk before & after hook."""
+        cached = g.get("route_excluded")
+        if cached is not None:
+            return cached
+
+        args = (request.method, request.endpoint, request.path)
+        excluded = bool(self.exclude) and self.exclude.matches(*args) and not self.include.matches(*args)
+        g.route_excluded = excluded
+        return excluded
@@ -1,5 +1,6 @@
-from flask import Response, request, current_app
+from flask import Response, request, current_app, g
 from .utils import generate_token, generate_fingerprint, sign_data, verify_signature
+from .cookie_writer import get_cookie_policy, write_cookie
 import time, hmac
 from typing import Callable, Optional
 
@@ -13,6 +14,9 @@ def create_secure_session_cookie(
     secure: bool = True,
     http_only: bool = True,
     same_site: str = "Strict",
+    priority: str | None = "High",
+    partitioned: bool = False,
+    same_party: bool = False,
     sign: bool = True,
     secret_key: str | None = None,
     bind_fingerprint: bool = True,
@@ -22,14 +26,39 @@ def create_secure_session_cookie(
     idle_timeout: Optional[int] = None,
     absolute_timeout: Optional[int] = None,
     server_side_store: Optional[Callable[[str, dict], None]] = None,
-    ensure_domain_from_request: bool = True
+    ensure_domain_from_request: bool = True,
+    only_if_needed: bool = False,
+    renew_before: Optional[int] = None
 ):
     """
     Buat session cookie aman
+
+    only_if_needed=True (dipakai after_request): cookie hanya diterbitkan ulang jika
+    hilang / tidak valid, atau (renew_on_activity) umurnya sudah dekat max_age/idle_timeout
+    — default saat separuh umur terlewati, atau renew_before detik sebelum habis.
+    rotate=False mempertahankan session id lama saat renewal. Hasilnya dicatat di
+    g.session_cookie: "kept", "renewed", atau "issued".
     """
+    if only_if_needed:
+        current = load_secure_session(request, cookie_name, verify_signature_flag=sign,
+                                      bind_fingerprint=bind_fingerprint, fingerprint_func=fingerprint_func)
+        if current.valid:
+            if not _needs_renewal(current, max_age, idle_timeout, renew_on_activity, renew_before):
+                g.session_cookie = "kept"
+                return response
+            if not rotate and not session_id:
+                session_id = current.session_id
+            g.session_cookie = "renewed"
+        else:
+            g.session_cookie = "issued"
+
     if domain is None and ensure_domain_from_request:
         domain = request.host
 
+    # atribut cookie (termasuk proteksi XSS: HttpOnly, Priority, ...) di-compile sekali per policy
+    policy = get_cookie_policy(cookie_name, max_age, path, secure, http_only, same_site,
+                               priority, partitioned, same_party)
+
     if not session_id:
         session_id = generate_token(24)
 
@@ -38,21 +67,22 @@ def create_secure_session_cookie(
     else:
         fingerprint = ""
 
-    session_data = f"{session_id}|{fingerprint}" if fingerprint else session_id
-
+    now = int(time.time())
     used_secret = secret_key or getattr(current_app, "secret_key", None)
     if sign:
         if not used_secret:
             raise ValueError("secret_key diperlukan untuk sign=True")
+        # format bertanda tangan: session_id|fingerprint|issued_at|signature
+        session_data = f"{session_id}|{fingerprint}|{now}"
         signature = sign_data(session_data)
         cookie_value = f"{session_data}|{signature}"
     else:
-        cookie_value = session_data
+        cookie_value = f"{session_id}|{fingerprint}" if fingerprint else session_id
 
     if server_side_store:
         meta = {
-            "created_at": int(time.time()),
-            "last_activity": int(time.time()),
+            "created_at": now,
+            "last_activity": now,
             "max_age": max_age,
             "idle_timeout": idle_timeout,
             "absolute_timeout": absolute_timeout
@@ -62,72 +92,153 @@ def create_secure_session_cookie(
         except Exception:
             pass
 
-    response.set_cookie(
-        key=cookie_name,
-        value=cookie_value,
-        max_age=max_age,
-        path=path,
-        domain=domain,
-        secure=secure,
-        httponly=http_only,
-        samesite=same_site
-    )
+    write_cookie(response, policy, cookie_value, domain=domain)
+    g.issued_session_id = session_id
 
     return response
 
 
-def verify_secure_session_cookie(
+def _needs_renewal(session, max_age, idle_timeout, renew_on_activity, renew_before):
+    """True jika cookie valid ini sudah dekat habis (sliding renewal)."""
+    if not renew_on_activity:
+        return False
+    if session.issued_at is None:
+        # cookie format lama tanpa issued_at → terbitkan ulang sekali ke format baru
+        return True
+    lifetime = min(max_age, idle_timeout) if idle_timeout else max_age
+    window = lifetime // 2 if renew_before is None else renew_before
+    return int(time.time()) - session.issued_at >= lifetime - window
+
+
+class VerifiedSession:
+    """
+    Hasil parse + verifikasi session cookie untuk satu request.
+    Disimpan di g.secure_session sehingga before_request & after_request
+    memakai hasil yang sama (HMAC & fingerprint tidak dihitung ulang).
+    checks mencatat pemeriksaan yang dijalankan:
+    (verify_signature_flag, bind_fingerprint, fingerprint_func, server_side_lookup).
+    """
+
+    __slots__ = ("cookie_name", "raw", "checks", "session_id", "fingerprint", "issued_at", "signature",
+                 "valid", "meta")
+
+    def __init__(self, cookie_name, raw, session_id="", fingerprint="", signature="",
+                 checks=(True, True, None, None)):
+        self.cookie_name = cookie_name
+        self.raw = raw
+        self.checks = checks
+        self.session_id = session_id
+        self.fingerprint = fingerprint
+        self.issued_at = None           # epoch saat cookie diterbitkan (format 4 bagian)
+        self.signature = signature
+        self.valid = False
+        self.meta = None
+
+
+def _checks_cover(done, wanted):
+    """True jika pemeriksaan `done` minimal seketat `wanted` (hasilnya boleh dipakai ulang)."""
+    done_sig, done_fp, done_fp_func, done_lookup = done
+    want_sig, want_fp, want_fp_func, want_lookup = wanted
+    return ((done_sig or not want_sig)
+            and (not want_fp or (done_fp and done_fp_func == want_fp_func))
+            and (want_lookup is None or done_lookup == want_lookup))
+
+
+def load_secure_session(
     request,
     cookie_name: str = "session_id",
-    secret_key: str | None = None,
     verify_signature_flag: bool = True,
     bind_fingerprint: bool = True,
     fingerprint_func: Callable[[], str] | None = None,
     server_side_lookup: Optional[Callable[[str], dict]] = None
-) -> bool:
+) -> VerifiedSession:
     """
-    Verifikasi session cookie
+    Parse & verifikasi session cookie SEKALI per request (cache di g.secure_session).
+
+    Hasil cache hanya dipakai ulang bila pemeriksaannya minimal seketat yang diminta:
+    parse tanpa verifikasi tidak pernah memenuhi panggilan yang meminta verifikasi.
+    Sebaliknya hasil yang lebih ketat (mis. before_request dengan server_side_lookup)
+    dipakai apa adanya oleh panggilan yang lebih longgar — termasuk bila tidak valid,
+    sehingga session yang di-revoke tidak dianggap valid lagi di after_request.
     """
     raw = request.cookies.get(cookie_name)
+    checks = (verify_signature_flag, bind_fingerprint, fingerprint_func, server_side_lookup)
+    cached = g.get("secure_session")
+    if (cached is not None and cached.cookie_name == cookie_name and cached.raw == raw
+            and _checks_cover(cached.checks, checks)):
+        return cached
+
+    g.secure_session = session = VerifiedSession(cookie_name, raw, checks=checks)
     if not raw:
-        return False
+        return session
 
     parts = raw.split("|")
     if len(parts) == 1:
-        session_id = parts[0]
-        fingerprint = ""
-        signature = ""
+        session.session_id = parts[0]
     elif len(parts) == 2:
-        session_id, signature = parts
-        fingerprint = ""
+        session.session_id, session.signature = parts
+    elif len(parts) == 3:
+        session.session_id, session.fingerprint, session.signature = parts
     else:
-        session_id, fingerprint, signature = parts[0], parts[1], parts[2]
+        session.session_id, session.fingerprint, issued_at, session.signature = parts[:4]
+        if not issued_at.isdigit():
+            return session
+        session.issued_at = int(issued_at)
 
     if verify_signature_flag:
-        original = f"{session_id}|{fingerprint}" if fingerprint else session_id
-        if not verify_signature(original, signature):
-            return False
+        if session.issued_at is not None:
+            original = f"{session.session_id}|{session.fingerprint}|{session.issued_at}"
+        elif session.fingerprint:
+            original = f"{session.session_id}|{session.fingerprint}"
+        else:
+            original = session.session_id
+        if not verify_signature(original, session.signature):
+            return session
 
-    if bind_fingerprint and fingerprint:
+    if bind_fingerprint and session.fingerprint:
         current_fp = fingerprint_func() if fingerprint_func else generate_fingerprint()
-        if not hmac.compare_digest(current_fp, fingerprint):
-            return False
+        if not hmac.compare_digest(current_fp, session.fingerprint):
+            return session
 
     if server_side_lookup:
         try:
-            meta = server_side_lookup(session_id)
+            meta = server_side_lookup(session.session_id)
             if not meta:
-                return False
+                return session
             now = int(time.time())
             if meta.get("absolute_timeout") and meta.get("created_at"):
                 if now > meta["created_at"] + meta["absolute_timeout"]:
-                    return False
+                    return session
             if meta.get("idle_timeout") and meta.get("last_activity"):
                 if now > meta["last_activity"] + meta["idle_timeout"]:
-                    return False
+                    return session
             if meta.get("revoked"):
-                return False
+                return session
+            session.meta = meta
         except Exception:
-            return False
+            return session
 
-    return True
+    session.valid = True
+    return session
+
+
+def verify_secure_session_cookie(
+    request,
+    cookie_name: str = "session_id",
+    secret_key: str | None = None,
+    verify_signature_flag: bool = True,
+    bind_fingerprint: bool = True,
+    fingerprint_func: Callable[[], str] | None = None,
+    server_side_lookup: Optional[Callable[[str], dict]] = None
+) -> bool:
+    """
+    Verifikasi session cookie (hasil di-cache per request, lihat load_secure_session)
+    """
+    return load_secure_session(
+        request,
+        cookie_name=cookie_name,
+        verify_signature_flag=verify_signature_flag,
+        bind_fingerprint=bind_fingerprint,
+        fingerprint_func=fingerprint_func,
+        server_side_lookup=server_side_lookup
+    ).valid
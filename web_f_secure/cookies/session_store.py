@@ -0,0 +1,352 @@
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+
+logger = logging.getLogger("security")
+
+# ============================================================
+# 🗄️ SERVER-SIDE SESSION STORE
+# ============================================================
+# Implementasi server_side_store / server_side_lookup untuk session_protection:
+# - dict ter-shard di memori (lock per shard);
+# - timing wheel untuk expiry: eviction O(1) amortized, tanpa scan seluruh session;
+# - last_activity di-update paling sering sekali per touch_interval (bukan per request);
+# - tier SQLite opsional: tulis di-batch (write-behind), dibaca saat cache miss.
+
+
+class _Session:
+    __slots__ = ("created_at", "last_activity", "max_age", "idle_timeout", "absolute_timeout",
+                 "revoked", "deadline")
+
+    def __init__(self, created_at, last_activity, max_age, idle_timeout, absolute_timeout, revoked=False):
+        self.created_at = created_at
+        self.last_activity = last_activity
+        self.max_age = max_age
+        self.idle_timeout = idle_timeout
+        self.absolute_timeout = absolute_timeout
+        self.revoked = revoked
+        self.deadline = self.compute_deadline()
+
+    def compute_deadline(self):
+        """Waktu epoch paling awal session ini tidak lagi valid."""
+        deadlines = [self.last_activity + self.max_age] if self.max_age else []
+        if self.idle_timeout:
+            deadlines.append(self.last_activity + self.idle_timeout)
+        if self.absolute_timeout:
+            deadlines.append(self.created_at + self.absolute_timeout)
+        return min(deadlines) if deadlines else self.last_activity + 86400
+
+    def as_meta(self):
+        return {
+            "created_at": self.created_at,
+            "last_activity": self.last_activity,
+            "max_age": self.max_age,
+            "idle_timeout": self.idle_timeout,
+            "absolute_timeout": self.absolute_timeout,
+            "revoked": self.revoked,
+        }
+
+
+class _Shard:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions = {}
+
+
+class SQLiteSessionTier:
+    """Persistensi session di SQLite; dipakai SessionStore untuk write-behind & cache miss."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        created_at INTEGER NOT NULL,
+        last_activity INTEGER NOT NULL,
+        max_age INTEGER,
+        idle_timeout INTEGER,
+        absolute_timeout INTEGER,
+        revoked INTEGER NOT NULL DEFAULT 0,
+        deadline INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_deadline ON sessions (deadline);
+    """
+    UPSERT = """
+    INSERT OR REPLACE INTO sessions
+    (session_id, created_at, last_activity, max_age, idle_timeout, absolute_timeout, revoked, deadline)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    def __init__(self, db_path="sessions.db"):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def write(self, rows):
+        """rows: list (session_id, _Session | None); None = hapus."""
+        upserts = [(sid, s.created_at, s.last_activity, s.max_age, s.idle_timeout, s.absolute_timeout,
+                    int(s.revoked), s.deadline) for sid, s in rows if s is not None]
+        deletes = [(sid,) for sid, s in rows if s is None]
+        conn = self._conn()
+        with conn:
+            if upserts:
+                conn.executemany(self.UPSERT, upserts)
+            if deletes:
+                conn.executemany("DELETE FROM sessions WHERE session_id = ?", deletes)
+
+    def load(self, session_id):
+        row = self._conn().execute(
+            "SELECT created_at, last_activity, max_age, idle_timeout, absolute_timeout, revoked "
+            "FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return _Session(*row[:5], revoked=bool(row[5])) if row else None
+
+    def purge(self, now, batch_size=1000):
+        conn = self._conn()
+        with conn:
+            return conn.execute(
+                "DELETE FROM sessions WHERE rowid IN (SELECT rowid FROM sessions WHERE deadline <= ? LIMIT ?)",
+                (now, batch_size)
+            ).rowcount
+
+
+class SessionStore:
+    """
+    Session store server-side untuk apply_secure_cookies / create_secure_session_cookie.
+
+    Pakai:  store.save sebagai server_side_store, store.lookup sebagai server_side_lookup.
+
+    - shards: jumlah partisi dict (lock per shard → kontensi rendah).
+    - wheel_slots * resolution_s: cakupan timing wheel; session dengan deadline lebih jauh
+      ditunda ulang saat slot-nya lewat (tetap O(1) amortized per session).
+    - touch_interval_s: last_activity hanya ditulis jika sudah lebih lama dari interval ini.
+    - max_sessions: batas memori; saat penuh, session yang paling dekat expiry dibuang
+      (masih ada di tier SQLite bila diaktifkan).
+    - db_path: aktifkan tier SQLite (write-behind, flush setiap flush_interval_s).
+    """
+
+    def __init__(self, shards=64, wheel_slots=3600, resolution_s=1, touch_interval_s=60,
+                 max_sessions=2_000_000, db_path=None, flush_interval_s=5):
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self.resolution = resolution_s
+        self.touch_interval = touch_interval_s
+        self.max_sessions = max_sessions
+        self.stats = {"stored": 0, "touched": 0, "expired": 0, "evicted": 0, "loaded": 0}
+
+        # timing wheel: slot -> set(session_id)
+        self._wheel = [set() for _ in range(wheel_slots)]
+        self._wheel_lock = threading.Lock()
+        self._tick_lock = threading.Lock()
+        self._current_tick = self._tick_of(time.time())
+        self._size = 0
+
+        # tier SQLite (opsional)
+        self.tier = SQLiteSessionTier(db_path) if db_path else None
+        self.flush_interval = flush_interval_s
+        self._dirty = {}                     # session_id -> _Session | None (hapus)
+        self._dirty_lock = threading.Lock()
+        self._next_flush = time.time() + flush_interval_s
+
+    # -----------------------------
+    # Bagian internal
+    # -----------------------------
+
+    def _shard(self, session_id):
+        return self._shards[zlib.crc32(session_id.encode()) % len(self._shards)]
+
+    def _tick_of(self, ts):
+        return int(ts // self.resolution)
+
+    def _schedule(self, session_id, deadline):
+        tick = max(self._tick_of(deadline), self._current_tick + 1)
+        with self._wheel_lock:
+            self._wheel[tick % len(self._wheel)].add(session_id)
+
+    def _resize(self, delta, stat=None):
+        with self._wheel_lock:
+            self._size += delta
+            if stat is not None:
+                self.stats[stat] += 1
+
+    def _count(self, stat):
+        # stats diperbarui dari banyak thread → di bawah lock agar tidak ada increment yang hilang
+        with self._wheel_lock:
+            self.stats[stat] += 1
+
+    def _mark_dirty(self, session_id, session):
+        if self.tier is not None:
+            with self._dirty_lock:
+                self._dirty[session_id] = session
+
+    def _maintain(self, now):
+        """Putar wheel sampai waktu sekarang & flush tier SQLite jika sudah waktunya (tanpa thread)."""
+        if self._tick_of(now) > self._current_tick and self._tick_lock.acquire(blocking=False):
+            try:
+                self._advance(now)
+            finally:
+                self._tick_lock.release()
+        if self.tier is not None and now >= self._next_flush:
+            self._next_flush = now + self.flush_interval
+            self.flush()
+
+    def _advance(self, now):
+        target = self._tick_of(now)
+        # maksimal satu putaran penuh: slot yang sama tidak perlu diproses dua kali
+        start = max(self._current_tick + 1, target - len(self._wheel) + 1)
+        for tick in range(start, target + 1):
+            with self._wheel_lock:
+                slot = self._wheel[tick % len(self._wheel)]
+                self._wheel[tick % len(self._wheel)] = set()
+            for session_id in slot:
+                shard = self._shard(session_id)
+                with shard.lock:
+                    session = shard.sessions.get(session_id)
+                    if session is None:
+                        continue
+                    expired = session.deadline <= now
+                    if expired:
+                        del shard.sessions[session_id]
+                if expired:
+                    self._resize(-1, "expired")
+                    self._mark_dirty(session_id, None)
+                else:
+                    # deadline diperpanjang (touch) atau di luar cakupan wheel → jadwalkan ulang
+                    self._schedule(session_id, session.deadline)
+        self._current_tick = target
+
+    def _evict_one(self):
+        """
+        Buang satu session dengan expiry terdekat (memori penuh).
+        False jika satu putaran wheel tidak menemukan session yang bisa dibuang
+        (slot hanya berisi id usang, atau entry-nya sudah diambil thread lain).
+        """
+        for offset in range(1, len(self._wheel) + 1):
+            index = (self._current_tick + offset) % len(self._wheel)
+            while True:
+                with self._wheel_lock:
+                    slot = self._wheel[index]
+                    session_id = slot.pop() if slot else None
+                if session_id is None:
+                    break
+                shard = self._shard(session_id)
+                with shard.lock:
+                    evicted = shard.sessions.pop(session_id, None) is not None
+                if evicted:
+                    self._resize(-1, "evicted")
+                    return True
+        return False
+
+    def _insert(self, session_id, session):
+        shard = self._shard(session_id)
+        with shard.lock:
+            existed = session_id in shard.sessions
+            shard.sessions[session_id] = session
+        if not existed:
+            self._resize(1)
+        self._schedule(session_id, session.deadline)
+        while self._size > self.max_sessions:
+            if not self._evict_one():
+                break
+
+    # -----------------------------
+    # Bagian hook session_protection
+    # -----------------------------
+
+    def save(self, session_id, meta):
+        """server_side_store: simpan/perbarui session (created_at lama dipertahankan)."""
+        now = int(time.time())
+        shard = self._shard(session_id)
+        with shard.lock:
+            old = shard.sessions.get(session_id)
+        created_at = old.created_at if old else meta.get("created_at", now)
+        session = _Session(created_at, meta.get("last_activity", now), meta.get("max_age"),
+                           meta.get("idle_timeout"), meta.get("absolute_timeout"), meta.get("revoked", False))
+        self._insert(session_id, session)
+        self._mark_dirty(session_id, session)
+        self._count("stored")
+        self._maintain(now)
+
+    def lookup(self, session_id):
+        """
+        server_side_lookup: kembalikan meta (snapshot sebelum touch) atau None.
+        Session yang masih aktif di-touch; last_activity hanya ditulis jika sudah
+        lebih lama dari touch_interval.
+        """
+        now = int(time.time())
+        self._maintain(now)
+        shard = self._shard(session_id)
+        with shard.lock:
+            session = shard.sessions.get(session_id)
+
+        if session is None and self.tier is not None:
+            session = self.tier.load(session_id)
+            if session is None or session.deadline <= now:
+                return None
+            self._insert(session_id, session)
+            self._count("loaded")
+        if session is None or session.deadline <= now:
+            return None
+
+        meta = session.as_meta()
+        if not session.revoked and session.deadline > now and now - session.last_activity >= self.touch_interval:
+            with shard.lock:
+                session.last_activity = now
+                session.deadline = session.compute_deadline()
+            self._mark_dirty(session_id, session)
+            self._count("touched")
+        return meta
+
+    def revoke(self, session_id):
+        shard = self._shard(session_id)
+        with shard.lock:
+            session = shard.sessions.get(session_id)
+            if session is not None:
+                session.revoked = True
+        if session is None and self.tier is not None:
+            # session sudah di-evict dari memori: ambil dari antrian write-behind / tier
+            # lalu masukkan lagi sebagai revoked (lookup berikutnya tidak memuat versi lama)
+            with self._dirty_lock:
+                pending = self._dirty.get(session_id, False)
+            session = self.tier.load(session_id) if pending is False else pending
+            if session is not None:
+                session.revoked = True
+                self._insert(session_id, session)
+        if session is not None:
+            self._mark_dirty(session_id, session)
+
+    def delete(self, session_id):
+        shard = self._shard(session_id)
+        with shard.lock:
+            removed = shard.sessions.pop(session_id, None) is not None
+        if removed:
+            self._resize(-1)
+        self._mark_dirty(session_id, None)
+
+    def flush(self):
+        """Tulis perubahan tertunda ke tier SQLite dalam satu transaksi."""
+        if self.tier is None:
+            return 0
+        with self._dirty_lock:
+            batch, self._dirty = self._dirty, {}
+        if not batch:
+            return 0
+        try:
+            self.tier.write(list(batch.items()))
+            self.tier.purge(int(time.time()))
+        except sqlite3.Error:
+            logger.exception("SessionStore flush failed, %d sessions re-queued", len(batch))
+            with self._dirty_lock:
+                for session_id, session in batch.items():
+                    self._dirty.setdefault(session_id, session)
+            return 0
+        return len(batch)
+
+    def __len__(self):
+        return self._size
@@ -1,7 +1,8 @@
 import secrets
 import hashlib
 import hmac
-from flask import request, current_app
+from functools import lru_cache
+from flask import request, current_app, g
 
 # ============================================================
 # 🔧 UTILITAS KEAMANAN UMUM
@@ -12,17 +13,27 @@ def generate_token(length = 32):
 
 
 def generate_fingerprint():
+    fingerprint = g.get("fingerprint")                                  # sudah dihitung di request ini?
+    if fingerprint is not None:
+        return fingerprint
 
     ua = request.headers.get("User-Agent", "")[:100]                    # ambil 100 karakter pertama
     ip = request.headers.get("X-Forwarded-For", request.remote_addr)    # ambil IP client
 
-    return hashlib.sha256(f"{ip}|{ua}".encode()).hexdigest()[:32]       # hash fingerprint
+    g.fingerprint = hashlib.sha256(f"{ip}|{ua}".encode()).hexdigest()[:32]  # hash fingerprint (sekali per request)
+    return g.fingerprint
+
+
+@lru_cache(maxsize=8)
+def _keyed_hmac(secret: bytes):
+    return hmac.new(secret, digestmod="sha256")                         # state HMAC yang sudah di-key
 
 
 def sign_data(data: str) -> str:
     secret = current_app.secret_key.encode()                            # ambil secret key Flask
-    
-    return hmac.new(secret, data.encode(), "sha256").hexdigest()
+    mac = _keyed_hmac(secret).copy()                                    # tanpa key schedule ulang
+    mac.update(data.encode())
+    return mac.hexdigest()
 
 
 def verify_signature(data: str, signature: str) -> bool:
@@ -1,17 +1,18 @@
-from .csp import apply_csp
+from .csp import apply_csp, generate_nonce, use_nonce_pool, nonce_stats, NonceGlobals
 from .hsts import apply_hsts
 from .frame_protection import apply_x_frame_options
 from .referrer_policy import apply_referrer_policy
 from .permissions_policy import apply_permissions_policy
 from .legacy_modern import apply_legacy_modern_headers
+from .policy import HeaderPolicy
+from .csp_report import (
+    CSPReportCollector, SQLiteReportSink, JSONLReportSink, create_csp_report_blueprint,
+)
+
+# Di-compile sekali saat import (startup app), dipakai ulang oleh setiap response
+default_policy = HeaderPolicy()
 
 
 def apply_secure_headers(response):
-    """Gabungkan semua header keamanan menjadi satu fungsi."""
-    response = apply_csp(response)
-    response = apply_hsts(response)
-    response = apply_x_frame_options(response)
-    response = apply_referrer_policy(response)
-    response = apply_permissions_policy(response)
-    response = apply_legacy_modern_headers(response)
-    return response
+    """Gabungkan semua header keamanan menjadi satu fungsi (bundle yang sudah di-compile)."""
+    return default_policy.apply(response)
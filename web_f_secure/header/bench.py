@@ -0,0 +1,78 @@
+# security_headers/bench.py
+# Micro-benchmark biaya header per response.
+# Jalankan dari root repo:  python -m web_f_secure.header.bench
+
+import json
+from flask import Flask, Response, g, request
+from bench_utils import timeit
+
+from .csp import NoncePool, _token_nonce
+from . import (
+    apply_hsts, apply_x_frame_options, apply_referrer_policy,
+    apply_permissions_policy, apply_legacy_modern_headers, apply_secure_headers,
+)
+
+
+def _legacy_apply_csp(response):
+    """apply_csp sebelum CSPPolicy: f-string CSP + json.dumps Report-To di setiap response."""
+    response.headers["Content-Security-Policy"] = (
+        "default-src 'none'; "
+        "base-uri 'self'; "
+        "object-src 'none'; "
+        "frame-ancestors 'self' https://partner.example.com; "
+        f"script-src 'self' 'nonce-{g.nonce}'; "
+        "style-src 'self' 'unsafe-inline'; "
+        "img-src 'self' data:; "
+        "font-src 'self' data:; "
+        "media-src 'self'; "
+        "worker-src 'self' blob:; "
+        "connect-src 'self' https://api.myservice.example wss://api.myservice.example; "
+        "form-action 'self'; "
+        "upgrade-insecure-requests; "
+        "block-all-mixed-content; "
+        "report-to csp-endpoint; report-uri /csp-report;"
+    )
+    report_to = {
+        "group": "csp-endpoint",
+        "max_age": 10886400,
+        "endpoints": [
+            {"url": f"{request.url_root.rstrip('/')}/csp-report"}
+        ]
+    }
+    response.headers["Report-To"] = json.dumps(report_to)
+    return response
+
+
+def apply_chain(response):
+    """Rantai lama: enam fungsi apply_* dipanggil per response (CSP versi lama)."""
+    response = _legacy_apply_csp(response)
+    response = apply_hsts(response)
+    response = apply_x_frame_options(response)
+    response = apply_referrer_policy(response)
+    response = apply_permissions_policy(response)
+    response = apply_legacy_modern_headers(response)
+    return response
+
+
+def bench_headers(count=20000):
+    app = Flask(__name__)
+
+    print(f"\n===== security headers, {count} response =====")
+    with app.test_request_context("/"):
+        g.nonce = "bench-nonce-0123456789"
+        timeit("rantai apply_* (lama)", lambda: [apply_chain(Response()) for _ in range(count)], count)
+        timeit("HeaderPolicy.apply", lambda: [apply_secure_headers(Response()) for _ in range(count)], count)
+        timeit("Response() saja (baseline)", lambda: [Response() for _ in range(count)], count)
+
+
+def bench_nonce(count=100000):
+    pool = NoncePool(batch_size=4096)
+
+    print(f"\n===== {count} nonce =====")
+    timeit("secrets.token_urlsafe(16)", lambda: [_token_nonce() for _ in range(count)], count)
+    timeit("NoncePool.take (batch 4096)", lambda: [pool.take() for _ in range(count)], count)
+
+
+if __name__ == "__main__":
+    bench_headers()
+    bench_nonce()
@@ -1,42 +1,316 @@
 # security_headers/csp.py
+import base64
+import os
 import secrets
 import json
+import threading
+from collections import deque
+from functools import lru_cache
 from flask import g, request
+from flask.ctx import _AppCtxGlobals
+
+
+# ------------------------------------------------------------
+# Nonce per request (lazy) + pool opsional
+# ------------------------------------------------------------
+class NoncePool:
+    """
+    Nonce yang di-generate per batch: satu os.urandom(batch_size * nonce_bytes),
+    dipotong & di-encode base64url (format sama dengan secrets.token_urlsafe).
+    Saat sisa <= low_water, thread background mengisi ulang; jika pool sempat
+    kosong, take() mengisi sendiri secara sinkron.
+    """
+
+    def __init__(self, batch_size=1024, nonce_bytes=16, low_water=None):
+        self.batch_size = batch_size
+        self.nonce_bytes = nonce_bytes
+        self.low_water = batch_size // 4 if low_water is None else low_water
+        self.refills = 0                # jumlah batch yang sudah di-generate
+        self.sync_refills = 0           # refill di jalur request (pool kosong)
+        self._nonces = deque()          # pop()/extend() atomik → take() tanpa lock
+        self._fill_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._fill()
+        threading.Thread(target=self._refill_loop, name="nonce-pool", daemon=True).start()
+
+    def _generate_batch(self):
+        size = self.nonce_bytes
+        raw = os.urandom(self.batch_size * size)
+        return [base64.urlsafe_b64encode(raw[i:i + size]).rstrip(b"=").decode()
+                for i in range(0, len(raw), size)]
+
+    def _fill(self):
+        with self._fill_lock:
+            self._nonces.extend(self._generate_batch())
+            self.refills += 1
+
+    def _refill_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if len(self._nonces) <= self.low_water:
+                self._fill()
+
+    def take(self):
+        while True:
+            try:
+                nonce = self._nonces.pop()
+            except IndexError:
+                # pool kosong sebelum thread background sempat mengisi
+                self.sync_refills += 1
+                self._fill()
+                continue
+            if len(self._nonces) <= self.low_water:
+                self._wake.set()
+            return nonce
+
+    def stats(self):
+        return {"available": len(self._nonces), "batch_size": self.batch_size,
+                "refills": self.refills, "sync_refills": self.sync_refills}
+
+
+def _token_nonce():
+    return secrets.token_urlsafe(16)
+
+
+# Sumber nonce aktif (secrets.token_urlsafe atau NoncePool.take)
+_nonce_source = _token_nonce
+_nonce_pool = None
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "generated": 0, "skipped": 0}
+
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def use_nonce_pool(batch_size=1024, nonce_bytes=16, low_water=None):
+    """Ambil nonce dari NoncePool (isi ulang di background) alih-alih secrets per request."""
+    global _nonce_source, _nonce_pool
+    _nonce_pool = NoncePool(batch_size, nonce_bytes, low_water)
+    _nonce_source = _nonce_pool.take
+    return _nonce_pool
+
+
+def nonce_stats():
+    """Counter: request, nonce yang benar-benar dibuat, dan request yang melewati pembuatan nonce."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["pool"] = _nonce_pool.stats() if _nonce_pool is not None else None
+    return stats
+
+
+class NonceGlobals(_AppCtxGlobals):
+    """
+    app.app_ctx_globals_class untuk nonce lazy: g.nonce tetap str biasa, tetapi baru
+    dibuat saat pertama kali dibaca (g.nonce, g.get("nonce"), {{ g.nonce }} di template).
+    Response JSON/static yang tidak pernah membacanya tidak membayar biaya generate.
+
+        app.app_ctx_globals_class = NonceGlobals
+        app.before_request(generate_nonce)
+    """
+
+    def _resolve_nonce(self):
+        state = self.__dict__
+        if "nonce" not in state and state.pop("_nonce_pending", False):
+            state["nonce"] = _nonce_source()
+            _count("generated")
+
+    @property
+    def nonce(self):
+        self._resolve_nonce()
+        try:
+            return self.__dict__["nonce"]
+        except KeyError:
+            raise AttributeError("nonce") from None
+
+    @property
+    def nonce_pending(self):
+        """True jika generate_nonce sudah dipanggil tetapi nonce belum pernah dibaca."""
+        return self.__dict__.get("_nonce_pending", False)
+
+    def get(self, name, default=None):
+        if name == "nonce":
+            self._resolve_nonce()
+        return super().get(name, default)
+
+    def __contains__(self, item):
+        if item == "nonce":
+            self._resolve_nonce()
+        return super().__contains__(item)
+
 
 def generate_nonce():
-    # Nonce unik per request untuk mengizinkan inline script/style yang kita kontrol
-    g.nonce = secrets.token_urlsafe(16)
+    # Nonce unik per request untuk mengizinkan inline script/style yang kita kontrol.
+    # Dengan NonceGlobals nonce baru dibuat saat dibaca; tanpa itu langsung dibuat (str).
+    _count("requests")
+    state = g._get_current_object()
+    if isinstance(state, NonceGlobals):
+        state.__dict__.pop("nonce", None)
+        state._nonce_pending = True
+    else:
+        g.nonce = _nonce_source()
+        _count("generated")
 
 
-def apply_csp(response):
-    # --- Content Security Policy (CSP) ---
-    response.headers["Content-Security-Policy"] = (
-        "default-src 'none'; "                                                              # blok semua, izinkan hanya yg disebut
-        "base-uri 'self'; "                                                                 # cegah manipulasi <base>
-        "object-src 'none'; "                                                               # blok plugin (Flash, Java)
-        "frame-ancestors 'self' https://partner.example.com; "                              # cegah clickjacking + izinkan partner tertentu
-        f"script-src 'self' 'nonce-{g.nonce}'; "                                            # izinkan script self + nonce
-        "style-src 'self' 'unsafe-inline'; "                                                # style dari self (nonce lebih aman)
-        "img-src 'self' data:; "                                                            # gambar dari self & data URI
-        "font-src 'self' data:; "                                                           # font dari self
-        "media-src 'self'; "                                                                # media hanya dari self
-        "worker-src 'self' blob:; "                                                         # izinkan worker self/blob
-        "connect-src 'self' https://api.myservice.example wss://api.myservice.example; "    # batasi fetch/ws
-        "form-action 'self'; "                                                              # kirim form hanya ke self
-        "upgrade-insecure-requests; "                                                       # paksa HTTPS
-        "block-all-mixed-content; "                                                         # blok HTTP di halaman HTTPS
-        "report-to csp-endpoint; report-uri /csp-report;"                                   # laporan pelanggaran CSP
-    )
+def nonce_for_header():
+    """
+    Nilai nonce untuk header CSP, atau None jika selama request nonce tidak pernah
+    dibaca (tidak ada inline script ber-nonce → CSP dikirim tanpa sumber nonce).
+    """
+    state = g._get_current_object()
+    if isinstance(state, NonceGlobals) and state.nonce_pending:
+        _count("skipped")
+        return None
+    return g.get("nonce")
+
+
+# Sumber khusus: posisi nonce per request ('nonce-<g.nonce>')
+NONCE = "'nonce'"
+
+# Keyword CSP yang wajib ditulis dengan tanda kutip tunggal
+QUOTED_KEYWORDS = {
+    "self", "none", "unsafe-inline", "unsafe-eval", "unsafe-hashes",
+    "strict-dynamic", "report-sample", "wasm-unsafe-eval",
+}
+
+# Directive yang tidak punya nilai sumber
+FLAG_DIRECTIVES = {"upgrade-insecure-requests", "block-all-mixed-content"}
+
+KNOWN_DIRECTIVES = FLAG_DIRECTIVES | {
+    "default-src", "base-uri", "object-src", "frame-ancestors", "frame-src", "child-src",
+    "script-src", "script-src-elem", "script-src-attr", "style-src", "style-src-elem",
+    "style-src-attr", "img-src", "font-src", "media-src", "manifest-src", "worker-src",
+    "connect-src", "form-action", "sandbox", "report-to", "report-uri",
+}
+
+# --- Content Security Policy (CSP) sebagai data: directive -> daftar sumber ---
+DEFAULT_DIRECTIVES = {
+    "default-src": ["'none'"],                                                  # blok semua, izinkan hanya yg disebut
+    "base-uri": ["'self'"],                                                     # cegah manipulasi <base>
+    "object-src": ["'none'"],                                                   # blok plugin (Flash, Java)
+    "frame-ancestors": ["'self'", "https://partner.example.com"],               # cegah clickjacking + izinkan partner tertentu
+    "script-src": ["'self'", NONCE],                                            # izinkan script self + nonce
+    "style-src": ["'self'", "'unsafe-inline'"],                                 # style dari self (nonce lebih aman)
+    "img-src": ["'self'", "data:"],                                             # gambar dari self & data URI
+    "font-src": ["'self'", "data:"],                                            # font dari self
+    "media-src": ["'self'"],                                                    # media hanya dari self
+    "worker-src": ["'self'", "blob:"],                                          # izinkan worker self/blob
+    "connect-src": ["'self'", "https://api.myservice.example",
+                    "wss://api.myservice.example"],                             # batasi fetch/ws
+    "form-action": ["'self'"],                                                  # kirim form hanya ke self
+    "upgrade-insecure-requests": [],                                            # paksa HTTPS
+    "block-all-mixed-content": [],                                              # blok HTTP di halaman HTTPS
+    "report-to": ["csp-endpoint"],                                              # laporan pelanggaran CSP
+    "report-uri": ["/csp-report"],
+}
+
+
+class CSPPolicy:
+    """
+    CSP deklaratif: directive diberikan sebagai data, divalidasi SEKALI,
+    lalu di-compile menjadi prefix + suffix di sekitar satu slot nonce.
+    Per response hanya `prefix + nonce + suffix` (tanpa format ulang string).
+    """
+
+    def __init__(self, directives=None, report_group="csp-endpoint", report_path="/csp-report",
+                 report_max_age=10886400):
+        self.directives = {name: list(sources) for name, sources in (directives or DEFAULT_DIRECTIVES).items()}
+        self.report_group = report_group
+        self.report_path = report_path
+        self.report_max_age = report_max_age
+        self._validate()
+        self.prefix, self.suffix, self.has_nonce = self._compile()
+        self.without_nonce = self._compile(include_nonce=False)[0]
+
+    def _validate(self):
+        nonce_slots = 0
+        for name, sources in self.directives.items():
+            if name not in KNOWN_DIRECTIVES:
+                raise ValueError(f"CSP: directive tidak dikenal: {name!r}")
+            if name in FLAG_DIRECTIVES and sources:
+                raise ValueError(f"CSP: {name} tidak menerima sumber")
+            if "'none'" in sources and len(sources) > 1:
+                raise ValueError(f"CSP: 'none' tidak boleh digabung sumber lain di {name}")
+            for source in sources:
+                if not source or any(ch in source for ch in " ;,\r\n\t"):
+                    raise ValueError(f"CSP: sumber tidak valid di {name}: {source!r}")
+                if source in QUOTED_KEYWORDS:
+                    raise ValueError(f"CSP: keyword {source!r} di {name} harus ditulis '{source}'")
+            nonce_slots += sources.count(NONCE)
+        if nonce_slots > 1:
+            raise ValueError("CSP: hanya boleh ada satu slot nonce")
+
+    def _compile(self, include_nonce=True):
+        parts = []
+        for name, sources in self.directives.items():
+            if not include_nonce:
+                sources = [source for source in sources if source != NONCE]
+            parts.append(" ".join([name, *sources]) if sources else name)
+        header = "; ".join(parts) + ";"
+        if NONCE not in header:
+            return header, "", False
+        prefix, suffix = header.split(NONCE)
+        return prefix + "'nonce-", "'" + suffix, True
 
+    def render(self, nonce):
+        """Header CSP untuk satu response (nonce=None → varian tanpa sumber nonce)."""
+        if nonce is None or not self.has_nonce:
+            return self.without_nonce
+        return self.prefix + nonce + self.suffix
+
+    def override(self, changes):
+        """
+        Policy baru = policy ini + perubahan directive (None = hapus directive).
+        Dipakai untuk override per blueprint; hasilnya di-compile sekali.
+        """
+        directives = dict(self.directives)
+        for name, sources in changes.items():
+            if sources is None:
+                directives.pop(name, None)
+            else:
+                directives[name] = sources
+        return CSPPolicy(directives, self.report_group, self.report_path, self.report_max_age)
+
+    def report_to(self, url_root):
+        """Header Report-To (JSON di-cache per url_root)."""
+        return _report_to_json(url_root, self.report_group, self.report_path, self.report_max_age)
+
+
+@lru_cache(maxsize=64)
+def _report_to_json(url_root, group, path, max_age):
     # --- Endpoint laporan CSP ---
     report_to = {
-        "group": "csp-endpoint",
-        "max_age": 10886400,
+        "group": group,
+        "max_age": max_age,
         "endpoints": [
-            {"url": f"{request.url_root.rstrip('/')}/csp-report"}
+            {"url": f"{url_root.rstrip('/')}{path}"}
         ]
     }
     # json.dumps menghindarkan kita dari masalah escaping braces / quotes
-    response.headers["Report-To"] = json.dumps(report_to)
+    return json.dumps(report_to)
+
+
+default_csp = CSPPolicy()
+
+# Override per blueprint: nama blueprint -> CSPPolicy yang sudah di-compile
+blueprint_csp = {}
 
+
+def register_blueprint_csp(blueprint_name, changes, base=None):
+    """Daftarkan override CSP untuk satu blueprint (di-compile saat registrasi, bukan per request)."""
+    blueprint_csp[blueprint_name] = (base or default_csp).override(changes)
+    return blueprint_csp[blueprint_name]
+
+
+def csp_for_request():
+    """CSPPolicy untuk request aktif (override blueprint jika ada)."""
+    return blueprint_csp.get(request.blueprint, default_csp) if blueprint_csp else default_csp
+
+
+def apply_csp(response):
+    policy = csp_for_request()
+    response.headers["Content-Security-Policy"] = policy.render(nonce_for_header())
+    response.headers["Report-To"] = policy.report_to(request.url_root)
     return response
@@ -0,0 +1,204 @@
+# security_headers/csp_report.py
+import atexit
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask import Blueprint, request
+
+logger = logging.getLogger(__name__)
+
+# Content-Type yang dikirim browser
+LEGACY_CONTENT_TYPE = "application/csp-report"          # report-uri (satu laporan per POST)
+REPORTING_CONTENT_TYPE = "application/reports+json"     # Reporting API / report-to (batch)
+
+
+def parse_reports(content_type, data):
+    """
+    Normalisasi payload laporan menjadi list dict
+    {"directive", "blocked_uri", "document_uri"} (format lama & Reporting API).
+    """
+    if content_type == LEGACY_CONTENT_TYPE or (isinstance(data, dict) and "csp-report" in data):
+        body = data.get("csp-report") if isinstance(data, dict) else None
+        items = [body] if isinstance(body, dict) else []
+        keys = ("effective-directive", "violated-directive", "blocked-uri", "document-uri")
+    else:
+        items = [r.get("body") for r in data if isinstance(r, dict) and r.get("type") == "csp-violation"] \
+            if isinstance(data, list) else []
+        keys = ("effectiveDirective", "violatedDirective", "blockedURL", "documentURL")
+
+    reports = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        directive = item.get(keys[0]) or item.get(keys[1]) or ""
+        reports.append({
+            # violated-directive lama bisa berisi sumbernya juga → ambil nama directive saja
+            "directive": str(directive).split(" ", 1)[0][:128],
+            "blocked_uri": str(item.get(keys[2]) or "")[:512],
+            "document_uri": str(item.get(keys[3]) or "")[:512],
+        })
+    return reports
+
+
+# ------------------------------------------------------------
+# Sink: tujuan flush ringkasan laporan
+# ------------------------------------------------------------
+class SQLiteReportSink:
+    """Simpan ringkasan ke SQLite; laporan yang sama menambah count (upsert)."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS csp_reports (
+        directive TEXT NOT NULL,
+        blocked_uri TEXT NOT NULL,
+        document_uri TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        first_seen INTEGER NOT NULL,
+        last_seen INTEGER NOT NULL,
+        PRIMARY KEY (directive, blocked_uri, document_uri)
+    )
+    """
+    UPSERT = """
+    INSERT INTO csp_reports (directive, blocked_uri, document_uri, count, first_seen, last_seen)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (directive, blocked_uri, document_uri) DO UPDATE SET
+        count = count + excluded.count,
+        last_seen = excluded.last_seen
+    """
+
+    def __init__(self, db_path="csp_reports.db"):
+        self.db_path = db_path
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(self.SCHEMA)
+
+    def write(self, summaries):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(self.UPSERT, [
+                (s["directive"], s["blocked_uri"], s["document_uri"], s["count"], s["first_seen"], s["last_seen"])
+                for s in summaries
+            ])
+
+
+class JSONLReportSink:
+    """Tambahkan ringkasan sebagai satu baris JSON per (directive, blocked-uri, document-uri)."""
+
+    def __init__(self, path="csp_reports.jsonl"):
+        self.path = path
+
+    def write(self, summaries):
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.writelines(json.dumps(s, separators=(",", ":")) + "\n" for s in summaries)
+
+
+# ------------------------------------------------------------
+# Collector: rate limit + dedup + agregasi di memori
+# ------------------------------------------------------------
+class CSPReportCollector:
+    """
+    Menampung laporan CSP dengan batas memori tetap:
+    - rate limit token bucket per client (rate laporan/detik, burst maksimum);
+    - dedup & agregasi per (directive, blocked-uri, document-uri) → count;
+    - maksimum max_keys ringkasan di memori, sisanya dihitung sebagai dropped;
+    - flush ke sink per batch setiap flush_interval_s atau saat flush_max_keys tercapai.
+    """
+
+    def __init__(self, sink, rate=5.0, burst=20, max_clients=10000, max_keys=10000,
+                 flush_interval_s=10.0, flush_max_keys=500):
+        self.sink = sink
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.max_keys = max_keys
+        self.flush_interval_s = flush_interval_s
+        self.flush_max_keys = flush_max_keys
+        self.stats = {"accepted": 0, "rate_limited": 0, "dropped": 0, "invalid": 0, "flushed": 0}
+        self._buckets = OrderedDict()   # client -> (tokens, last_ts), LRU dibatasi max_clients
+        self._pending = {}              # key -> ringkasan belum di-flush
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="csp-report-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
+
+    def allow(self, client):
+        """Token bucket per client; False jika client melebihi rate."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[client] = (tokens - 1 if allowed else tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            if not allowed:
+                self.stats["rate_limited"] += 1
+        return allowed
+
+    def add(self, reports):
+        now = int(time.time())
+        with self._lock:
+            for report in reports:
+                key = (report["directive"], report["blocked_uri"], report["document_uri"])
+                summary = self._pending.get(key)
+                if summary is None:
+                    if len(self._pending) >= self.max_keys:
+                        self.stats["dropped"] += 1
+                        continue
+                    summary = self._pending[key] = dict(report, count=0, first_seen=now)
+                summary["count"] += 1
+                summary["last_seen"] = now
+                self.stats["accepted"] += 1
+            if len(self._pending) >= self.flush_max_keys:
+                self._wake.set()
+
+    def record_invalid(self):
+        with self._lock:
+            self.stats["invalid"] += 1
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Tulis semua ringkasan tertunda ke sink dalam satu batch."""
+        with self._lock:
+            batch, self._pending = list(self._pending.values()), {}
+        if not batch:
+            return 0
+        try:
+            self.sink.write(batch)
+        except (OSError, sqlite3.Error):
+            logger.exception("CSP report flush failed, %d summaries dropped", len(batch))
+            return 0
+        with self._lock:
+            self.stats["flushed"] += len(batch)
+        return len(batch)
+
+
+def create_csp_report_blueprint(collector, url="/csp-report", max_body=64 * 1024):
+    """Blueprint penerima laporan CSP (report-uri & report-to)."""
+    bp = Blueprint("csp_report", __name__)
+
+    @bp.route(url, methods=["POST"])
+    def csp_report():
+        if request.content_length is not None and request.content_length > max_body:
+            return "", 413
+        # batasi juga body tanpa Content-Length (chunked)
+        request.max_content_length = max_body
+        if not collector.allow(request.remote_addr or "unknown"):
+            return "", 429
+
+        data = request.get_json(force=True, silent=True)
+        reports = parse_reports(request.mimetype, data) if data is not None else []
+        if not reports:
+            collector.record_invalid()
+            return "", 400
+
+        collector.add(reports)
+        return "", 204
+
+    return bp
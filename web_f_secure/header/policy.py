@@ -0,0 +1,68 @@
+# security_headers/policy.py
+from werkzeug.datastructures import Headers
+from flask import request
+
+from .csp import csp_for_request, nonce_for_header
+from .hsts import apply_hsts
+from .frame_protection import apply_x_frame_options
+from .referrer_policy import apply_referrer_policy
+from .permissions_policy import apply_permissions_policy
+from .legacy_modern import apply_legacy_modern_headers
+
+# Header statis: fungsi-fungsi apply_* lama tetap menjadi sumber nilainya
+STATIC_HEADER_FUNCS = (
+    apply_hsts,
+    apply_x_frame_options,
+    apply_referrer_policy,
+    apply_permissions_policy,
+    apply_legacy_modern_headers,
+)
+
+
+class _HeaderSink:
+    """Objek mirip response, hanya untuk menampung header saat compile."""
+
+    def __init__(self):
+        self.headers = Headers()
+
+
+class HeaderPolicy:
+    """
+    Bundle security header yang di-compile SEKALI saat startup.
+
+    - Header statis (HSTS, X-Frame-Options, Permissions-Policy, legacy, ...) disimpan
+      sebagai tuple (name, value) beku; header yang di-set dua kali (X-Frame-Options)
+      otomatis hanya muncul sekali.
+    - CSP diambil dari CSPPolicy yang sudah di-compile (prefix + slot nonce + suffix),
+      termasuk override per blueprint (lihat csp.register_blueprint_csp).
+    - Per response hanya nonce (jika dibaca selama request) dan URL Report-To (JSON di-cache per url_root) yang diisi.
+    """
+
+    def __init__(self, static_funcs=STATIC_HEADER_FUNCS, csp_lookup=csp_for_request):
+        sink = _HeaderSink()
+        for func in static_funcs:
+            func(sink)
+        self.static_headers = tuple(sink.headers.items())
+        self._managed_names = frozenset(
+            name.lower() for name in ("Content-Security-Policy", "Report-To", *dict(self.static_headers))
+        )
+        self.csp_lookup = csp_lookup
+
+    def apply(self, response):
+        """Pasang semua header dalam satu pass (pengganti rantai apply_* per response)."""
+        headers = response.headers
+        csp = self.csp_lookup()
+        dynamic = (
+            ("Content-Security-Policy", csp.render(nonce_for_header())),
+            ("Report-To", csp.report_to(request.url_root)),
+        )
+        # Jalur umum: view belum men-set header yang kita kelola → cukup append
+        if not any(name.lower() in self._managed_names for name in headers.keys()):
+            headers.extend(dynamic)
+            headers.extend(self.static_headers)
+            return response
+
+        # View sudah men-set sebagian header → timpa (semantik sama seperti rantai lama)
+        for name, value in dynamic + self.static_headers:
+            headers[name] = value
+        return response
@@ -6,6 +6,45 @@ from flask import Flask
 from .config import Config              # konfigurasi terpusat
 from .token_manager import TokenManager # pengelola JWT
 from .storage import TokenStore         # storage refresh token (SQLite default)
+from .storage_memory import MemoryTokenStore
+from .storage_redis import RedisTokenStore
+from ..cookies.csrf_protection import CSRFSigner
+
+def create_token_store(config):
+    """Pilih backend storage refresh token berdasarkan TOKEN_BACKEND."""
+    backend = config['TOKEN_BACKEND']
+    if backend == 'memory':
+        return MemoryTokenStore(shards=config['TOKEN_MEMORY_SHARDS'])
+    if backend == 'redis':
+        return RedisTokenStore(
+            host=config['TOKEN_REDIS_HOST'],
+            port=config['TOKEN_REDIS_PORT'],
+            db=config['TOKEN_REDIS_DB'],
+            password=config['TOKEN_REDIS_PASSWORD'],
+            prefix=config['TOKEN_REDIS_PREFIX'],
+            max_connections=config['TOKEN_REDIS_POOL_SIZE'],
+            csrf_ttl=int(config['REFRESH_EXPIRES'].total_seconds())
+        )
+    if backend == 'sqlite':
+        return TokenStore(
+            config['DATABASE_PATH'],
+            write_behind=config['TOKEN_WRITE_BEHIND'],           # antrikan mutasi & flush per batch
+            flush_interval_ms=config['TOKEN_FLUSH_INTERVAL_MS'],
+            flush_max_rows=config['TOKEN_FLUSH_MAX_ROWS'],
+            shared_state=config['TOKEN_SQLITE_SHARED']           # file DB dipakai bersama banyak worker
+        )
+    raise ValueError(f"unknown TOKEN_BACKEND: {backend!r}")
+
+def create_csrf_signer(config):
+    """CSRFSigner untuk mode TOKEN_CSRF_STATELESS (None = pakai csrf_map di token store)."""
+    if not config['TOKEN_CSRF_STATELESS']:
+        return None
+    bucket_s = config['TOKEN_CSRF_BUCKET_S']
+    # token tetap valid selama refresh token-nya (+1 bucket karena bucket berjalan)
+    max_buckets = -(-int(config['REFRESH_EXPIRES'].total_seconds()) // bucket_s) + 1
+    if config['TOKEN_CSRF_KEYS']:
+        return CSRFSigner.from_spec(config['TOKEN_CSRF_KEYS'], bucket_s=bucket_s, max_buckets=max_buckets)
+    return CSRFSigner.from_secret(config['SECRET_KEY'], bucket_s=bucket_s, max_buckets=max_buckets)
 
 def create_app():
     """
@@ -18,16 +57,34 @@ def create_app():
     # load configuration dari Config class
     app.config.from_object(Config)
 
-    # inisialisasi token storage (TokenStore) dan attach ke app
-    # (TokenStore bertanggung jawab terhadap penyimpanan refresh token & CSRF map)
-    app.token_store = TokenStore(app.config['DATABASE_PATH'])
+    # inisialisasi token storage dan attach ke app
+    # (bertanggung jawab terhadap penyimpanan user, refresh token & CSRF map)
+    app.token_store = create_token_store(app.config)
+
+    # isi Bloom filter jti refresh token (aktif + revoked) dari storage saat startup (dilewati untuk backend shared)
+    if app.config['TOKEN_JTI_FILTER']:
+        app.token_store.enable_jti_filter(
+            capacity=app.config['TOKEN_JTI_FILTER_CAPACITY'],
+            fp_rate=app.config['TOKEN_JTI_FILTER_FP_RATE']
+        )
+
+    # jalankan compaction berkala agar tabel refresh_tokens & csrf_map tidak tumbuh tanpa batas
+    if app.config['TOKEN_PURGE_INTERVAL_S'] > 0:
+        app.token_store.start_compaction(
+            interval_s=app.config['TOKEN_PURGE_INTERVAL_S'],
+            batch_size=app.config['TOKEN_PURGE_BATCH_SIZE']
+        )
 
     # inisialisasi TokenManager (encode/decode/rotate tokens)
     app.token_manager = TokenManager(
         secret_key=app.config['SECRET_KEY'],             # secret untuk sign JWT
         issuer=app.config['JWT_ISSUER'],                 # nilai iss claim
-        salt=app.config['REFRESH_TOKEN_SALT']           # salt untuk hashing refresh token
+        salt=app.config['REFRESH_TOKEN_SALT'],          # salt untuk hashing refresh token
+        verify_cache_size=app.config['TOKEN_VERIFY_CACHE_SIZE']  # cache token terverifikasi (decode_fast)
     )
 
+    # signer CSRF stateless (token terikat ke jti refresh token, diverifikasi tanpa storage)
+    app.csrf_signer = create_csrf_signer(app.config)
+
     # kembalikan aplikasi siap pakai
     return app
@@ -0,0 +1,67 @@
+# tokens/bench.py
+# Micro-benchmark for access-token verification on protected routes.
+# Run from repo root:  python -m web_f_secure.tokens.bench
+
+from functools import wraps
+from flask import Flask, request, jsonify, g, current_app
+from bench_utils import timeit
+from .config import Config
+from .middleware import token_required
+from .token_manager import TokenManager
+
+def _legacy_token_required(f):
+    """token_required as it was before decode_fast (PyJWT jwt.decode on every request)."""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        token = request.cookies.get(current_app.config['ACCESS_COOKIE'])
+        if not token:
+            return jsonify({"msg": "missing access token"}), 401
+        payload = current_app.token_manager.decode(token, expect_type="access")
+        if not payload:
+            return jsonify({"msg": "invalid or expired access token"}), 401
+        g.current_user = payload.get("sub")
+        return f(*args, **kwargs)
+    return wrapper
+
+def _bench_app():
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.token_manager = TokenManager()
+
+    @app.route("/legacy")
+    @_legacy_token_required
+    def legacy():
+        return jsonify({"user": g.current_user})
+
+    @app.route("/fast")
+    @token_required
+    def fast():
+        return jsonify({"user": g.current_user})
+
+    return app
+
+def bench_decode(count=20000, active_users=500):
+    manager = TokenManager()
+    # a few hundred active sessions, each sending its access token repeatedly
+    active = [manager.create_token_pair(f"user{i}")[0] for i in range(active_users)]
+    tokens = [active[i % active_users] for i in range(count)]
+    uncached = TokenManager(verify_cache_size=0)
+
+    print(f"\n===== decode {count} access token =====")
+    timeit("decode (PyJWT)", lambda: [manager.decode(t, "access") for t in tokens], count)
+    timeit("decode_fast (cache off)", lambda: [uncached.decode_fast(t, "access") for t in tokens], count)
+    timeit("decode_fast (cache on)", lambda: [manager.decode_fast(t, "access") for t in tokens], count)
+
+def bench_requests(count=5000):
+    app = _bench_app()
+    token = app.token_manager.create_token_pair("bench")[0]
+    client = app.test_client()
+    client.set_cookie(Config.ACCESS_COOKIE, token)
+
+    print(f"\n===== {count} GET protected route (same access token) =====")
+    timeit("token_required via decode", lambda: [client.get("/legacy") for _ in range(count)], count)
+    timeit("token_required via decode_fast", lambda: [client.get("/fast") for _ in range(count)], count)
+
+if __name__ == "__main__":
+    bench_decode()
+    bench_requests()
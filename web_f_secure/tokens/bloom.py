@@ -0,0 +1,82 @@
+# tokens/bloom.py
+# In-process Bloom filter for refresh-token jti values.
+# A miss means "definitely not an active jti" -> can be rejected without a DB lookup.
+# A hit means "maybe active" -> caller must still do the authoritative DB check.
+
+import hashlib
+import math
+import threading
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter sized from (capacity, target false-positive rate).
+    - Uses double hashing over one blake2b digest to derive k bit positions.
+    - Items cannot be removed; revoked jti stay "maybe present" until the filter
+      is rebuilt from storage (see TokenStore.rebuild_jti_filter).
+    - Tracks simple counters so the observed false-positive rate can be monitored.
+    """
+
+    def __init__(self, capacity=100_000, fp_rate=0.01):
+        # optimal bit count m and hash count k for the requested capacity / fp rate
+        self.capacity = max(1, int(capacity))
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        # counters for monitoring
+        self.checks = 0            # total membership checks
+        self.rejected = 0          # misses (rejected without touching storage)
+        self.false_positives = 0   # hits that storage reported as unknown/revoked
+        self._lock = threading.Lock()
+
+    def _positions(self, item):
+        """Derive k bit positions from two 64-bit halves of one digest."""
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        """Insert item into the filter."""
+        positions = self._positions(item)
+        with self._lock:
+            for pos in positions:
+                self._bits[pos >> 3] |= 1 << (pos & 7)
+            self.count += 1
+
+    def __contains__(self, item):
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def check(self, item):
+        """Membership test that also updates the check/reject counters."""
+        present = item in self
+        self.checks += 1
+        if not present:
+            self.rejected += 1
+        return present
+
+    def record_false_positive(self):
+        """Called when the filter said 'maybe' but storage had no record for the jti."""
+        self.false_positives += 1
+
+    def estimated_fp_rate(self):
+        """Theoretical false-positive rate for the current fill: (1 - e^(-kn/m))^k."""
+        k, n, m = self.num_hashes, self.count, self.num_bits
+        return (1 - math.exp(-k * n / m)) ** k
+
+    def stats(self):
+        """Counters + observed and estimated false-positive rates."""
+        passed = self.checks - self.rejected
+        return {
+            "items": self.count,
+            "capacity": self.capacity,
+            "bits": self.num_bits,
+            "hashes": self.num_hashes,
+            "checks": self.checks,
+            "rejected": self.rejected,
+            "false_positives": self.false_positives,
+            "observed_fp_rate": (self.false_positives / passed) if passed else 0.0,
+            "estimated_fp_rate": self.estimated_fp_rate(),
+        }
@@ -18,12 +18,46 @@ class Config:
     # Lifetime refresh token (lebih panjang, tetapi kita gunakan rotation)
     REFRESH_EXPIRES = timedelta(days=int(os.environ.get("REFRESH_EXPIRES_DAYS", 7)))
 
+    # Jumlah access token terverifikasi yang di-cache oleh TokenManager.decode_fast (0 = nonaktif)
+    TOKEN_VERIFY_CACHE_SIZE = int(os.environ.get("TOKEN_VERIFY_CACHE_SIZE", 1024))
+
     # Salt server-side untuk HMAC hashing refresh token (jangan bocorkan)
     REFRESH_TOKEN_SALT = os.environ.get("REFRESH_TOKEN_SALT", "refresh-salt-change-me")
 
     # Path SQLite database untuk penyimpanan refresh tokens / csrf map
     DATABASE_PATH = os.environ.get("TOKEN_DB_PATH", "./tokens_storage.db")
 
+    # Backend refresh token: "sqlite" (default), "memory" (satu proses, ter-shard) atau
+    # "redis" (dipakai bersama semua worker/node)
+    TOKEN_BACKEND = os.environ.get("TOKEN_BACKEND", "sqlite")
+    TOKEN_MEMORY_SHARDS = int(os.environ.get("TOKEN_MEMORY_SHARDS", 16))
+    TOKEN_REDIS_HOST = os.environ.get("TOKEN_REDIS_HOST", "127.0.0.1")
+    TOKEN_REDIS_PORT = int(os.environ.get("TOKEN_REDIS_PORT", 6379))
+    TOKEN_REDIS_DB = int(os.environ.get("TOKEN_REDIS_DB", 0))
+    TOKEN_REDIS_PASSWORD = os.environ.get("TOKEN_REDIS_PASSWORD") or None
+    TOKEN_REDIS_PREFIX = os.environ.get("TOKEN_REDIS_PREFIX", "tok:")
+    TOKEN_REDIS_POOL_SIZE = int(os.environ.get("TOKEN_REDIS_POOL_SIZE", 10))
+
+    # Backend sqlite: set 1 jika file DB dipakai bersama beberapa worker/proses
+    # (gunicorn -w N). shared_state=True → Bloom filter jti lokal tidak dipakai.
+    TOKEN_SQLITE_SHARED = bool(int(os.environ.get("TOKEN_SQLITE_SHARED", "0")))
+
+    # Write-behind (backend sqlite): antrikan insert/revoke refresh token & csrf map, flush per batch
+    TOKEN_WRITE_BEHIND = bool(int(os.environ.get("TOKEN_WRITE_BEHIND", "0")))
+    TOKEN_FLUSH_INTERVAL_MS = int(os.environ.get("TOKEN_FLUSH_INTERVAL_MS", 50))
+    TOKEN_FLUSH_MAX_ROWS = int(os.environ.get("TOKEN_FLUSH_MAX_ROWS", 100))
+
+    # Compaction: hapus refresh token expired/revoked & csrf_map yatim secara berkala (0 = nonaktif)
+    TOKEN_PURGE_INTERVAL_S = int(os.environ.get("TOKEN_PURGE_INTERVAL_S", 3600))
+    TOKEN_PURGE_BATCH_SIZE = int(os.environ.get("TOKEN_PURGE_BATCH_SIZE", 500))
+
+    # Bloom filter jti refresh token yang dikenal, aktif maupun revoked (tolak jti tak dikenal tanpa lookup SQLite).
+    # Filter bersifat per proses: aktifkan hanya jika SATU proses yang menerbitkan token
+    # (backend memory, atau sqlite tanpa worker lain). Default nonaktif.
+    TOKEN_JTI_FILTER = bool(int(os.environ.get("TOKEN_JTI_FILTER", "0")))
+    TOKEN_JTI_FILTER_CAPACITY = int(os.environ.get("TOKEN_JTI_FILTER_CAPACITY", 100000))
+    TOKEN_JTI_FILTER_FP_RATE = float(os.environ.get("TOKEN_JTI_FILTER_FP_RATE", 0.01))
+
     # Nama cookie untuk access token (HttpOnly)
     ACCESS_COOKIE = os.environ.get("ACCESS_COOKIE_NAME", "access_token")
 
@@ -36,6 +70,13 @@ class Config:
     # Header name yang harus dikirim client berisi nilai CSRF cookie (double-submit)
     CSRF_HEADER = os.environ.get("CSRF_HEADER_NAME", "X-CSRF-Token")
 
+    # CSRF stateless: token = HMAC(jti refresh token, bucket waktu) → tanpa baris csrf_map.
+    # TOKEN_CSRF_KEYS "kid1:secret1,kid2:secret2" (key pertama aktif, sisanya tetap diterima
+    # untuk rotasi); kosong = satu key turunan SECRET_KEY. Umur token mengikuti REFRESH_EXPIRES.
+    TOKEN_CSRF_STATELESS = bool(int(os.environ.get("TOKEN_CSRF_STATELESS", "1")))
+    TOKEN_CSRF_KEYS = os.environ.get("TOKEN_CSRF_KEYS", "")
+    TOKEN_CSRF_BUCKET_S = int(os.environ.get("TOKEN_CSRF_BUCKET_S", 3600))
+
     # Cookie flags (production: COOKIE_SECURE True)
     COOKIE_SECURE = bool(int(os.environ.get("COOKIE_SECURE", "1")))  # 1 = True, 0 = False
     COOKIE_SAMESITE = os.environ.get("COOKIE_SAMESITE", "Lax")       # 'Lax' atau 'Strict' atau 'None'
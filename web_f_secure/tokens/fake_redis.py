@@ -0,0 +1,216 @@
+# tokens/fake_redis.py
+# Local in-process Redis-protocol stand-in for development and tests.
+# Implements only the commands RedisTokenStore uses; not a general Redis replacement.
+# Run standalone:  python -m web_f_secure.tokens.fake_redis  (listens on 127.0.0.1:6379)
+
+import fnmatch
+import socketserver
+import threading
+import time
+
+class _Database:
+    """Thread-safe keyspace: key -> str | dict | set, with optional absolute expiry."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}
+        self.expires = {}
+
+    def get(self, key):
+        # lazy expiry, like Redis does on access
+        exp = self.expires.get(key)
+        if exp is not None and exp <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def delete(self, key):
+        self.expires.pop(key, None)
+        return self.data.pop(key, None) is not None
+
+class _WrongType(Exception):
+    pass
+
+class _Status(str):
+    """Simple-string reply (+OK / -ERR); plain str values are sent as bulk strings."""
+
+OK = _Status("+OK")
+
+def _typed(db, key, kind):
+    value = db.get(key)
+    if value is not None and not isinstance(value, kind):
+        raise _WrongType()
+    return value
+
+def _cmd_set(db, key, value, *opts):
+    db.delete(key)
+    db.data[key] = value
+    opts = [o.upper() if i % 2 == 0 else o for i, o in enumerate(opts)]
+    if "EX" in opts:
+        db.expires[key] = time.time() + int(opts[opts.index("EX") + 1])
+    return OK
+
+def _cmd_hset(db, key, *pairs):
+    h = _typed(db, key, dict)
+    if h is None:
+        h = db.data[key] = {}
+    added = 0
+    for field, value in zip(pairs[::2], pairs[1::2]):
+        added += field not in h
+        h[field] = value
+    return added
+
+def _cmd_hsetnx(db, key, field, value):
+    h = _typed(db, key, dict)
+    if h is None:
+        h = db.data[key] = {}
+    if field in h:
+        return 0
+    h[field] = value
+    return 1
+
+def _cmd_hgetall(db, key):
+    h = _typed(db, key, dict) or {}
+    return [item for pair in h.items() for item in pair]
+
+def _cmd_sadd(db, key, *members):
+    s = _typed(db, key, set)
+    if s is None:
+        s = db.data[key] = set()
+    before = len(s)
+    s.update(members)
+    return len(s) - before
+
+def _cmd_srem(db, key, *members):
+    s = _typed(db, key, set)
+    if not s:
+        return 0
+    before = len(s)
+    s.difference_update(members)
+    if not s:
+        db.delete(key)
+    return before - len(s)
+
+def _cmd_expireat(db, key, when, *opts):
+    if db.get(key) is None:
+        return 0
+    when, current = int(when), db.expires.get(key)
+    opts = {o.upper() for o in opts}
+    # Redis 7 options; a key without expiry counts as an infinite TTL for GT / LT
+    if ("NX" in opts and current is not None) or ("XX" in opts and current is None):
+        return 0
+    if ("GT" in opts and (current is None or when <= current)) or \
+            ("LT" in opts and current is not None and when >= current):
+        return 0
+    db.expires[key] = when
+    return 1
+
+def _cmd_expire(db, key, seconds, *opts):
+    return _cmd_expireat(db, key, time.time() + int(seconds), *opts)
+
+def _cmd_scan(db, cursor, *opts):
+    # single-pass SCAN: always returns cursor 0 with every matching key
+    opts = list(opts)
+    pattern = opts[opts.index("MATCH") + 1] if "MATCH" in opts else "*"
+    keys = [k for k in list(db.data) if db.get(k) is not None and fnmatch.fnmatchcase(k, pattern)]
+    return ["0", keys]
+
+COMMANDS = {
+    "PING": lambda db, *a: _Status("+PONG"),
+    "SELECT": lambda db, *a: OK,
+    "AUTH": lambda db, *a: OK,
+    "FLUSHDB": lambda db: (db.data.clear(), db.expires.clear(), OK)[-1],
+    "DBSIZE": lambda db: sum(1 for k in list(db.data) if db.get(k) is not None),
+    "GET": lambda db, key: _typed(db, key, str),
+    "SET": _cmd_set,
+    "DEL": lambda db, *keys: sum(db.delete(k) for k in keys),
+    "EXISTS": lambda db, *keys: sum(db.get(k) is not None for k in keys),
+    "EXPIRE": _cmd_expire,
+    "EXPIREAT": _cmd_expireat,
+    "HSET": _cmd_hset,
+    "HSETNX": _cmd_hsetnx,
+    "HGET": lambda db, key, field: (_typed(db, key, dict) or {}).get(field),
+    "HGETALL": _cmd_hgetall,
+    "SADD": _cmd_sadd,
+    "SREM": _cmd_srem,
+    "SMEMBERS": lambda db, key: sorted(_typed(db, key, set) or ()),
+    "SCAN": _cmd_scan,
+}
+
+def _encode_reply(value):
+    if isinstance(value, _Status):
+        return (value + "\r\n").encode()
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode_reply(v) for v in value)
+    data = str(value).encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # inline command (e.g. typed via telnet)
+            return line.decode().split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            size = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(size + 2)[:-2].decode())
+        return args
+
+    def handle(self):
+        db = self.server.db
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            if not args:
+                continue
+            func = COMMANDS.get(args[0].upper())
+            if func is None:
+                reply = _Status(f"-ERR unknown command '{args[0]}'")
+            else:
+                try:
+                    with db.lock:
+                        reply = func(db, *args[1:])
+                except _WrongType:
+                    reply = _Status("-WRONGTYPE Operation against a key holding the wrong kind of value")
+                except (TypeError, ValueError, IndexError):
+                    reply = _Status(f"-ERR wrong arguments for '{args[0]}' command")
+            self.wfile.write(_encode_reply(reply))
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """
+    Threaded TCP server speaking RESP2 over an in-memory keyspace.
+    port=0 picks a free port; start() runs it in a daemon thread and returns (host, port).
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), _Handler)
+        self.db = _Database()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-redis", daemon=True)
+        self._thread.start()
+        return self.server_address
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+if __name__ == "__main__":
+    server = FakeRedisServer(port=6379)
+    print("fake redis listening on %s:%d" % server.server_address)
+    server.serve_forever()
@@ -2,6 +2,7 @@
 # Lightweight Flask decorators for verifying access tokens and CSRF double-submit.
 # Keep decorators minimal: they should call TokenManager on app object.
 
+import hmac
 from functools import wraps
 from flask import request, jsonify, g, current_app
 
@@ -9,7 +10,7 @@ def token_required(f):
     """
     Decorator to assert that a valid access token (from cookie) exists.
     - Reads access token from configured cookie name.
-    - Decodes via app.token_manager.decode.
+    - Decodes via app.token_manager.decode_fast (same checks as decode, cached HS256 path).
     - On success, stores current user identifier in flask.g for downstream use.
     """
     @wraps(f)
@@ -21,7 +22,7 @@ def token_required(f):
             return jsonify({"msg": "missing access token"}), 401
 
         # decode & validate token
-        payload = current_app.token_manager.decode(token, expect_type="access")
+        payload = current_app.token_manager.decode_fast(token, expect_type="access")
         if not payload:
             # invalid or expired
             return jsonify({"msg": "invalid or expired access token"}), 401
@@ -36,6 +37,8 @@ def validate_csrf(f):
     Decorator to enforce CSRF validation for state-changing requests.
     - Expects a non-HttpOnly cookie containing CSRF token and a header with the same value.
     - Skips validation for safe HTTP methods (GET, HEAD, OPTIONS).
+    - Stateless mode (app.csrf_signer): the header token must also be a valid HMAC
+      for the jti of the refresh token cookie (no storage lookup).
     """
     @wraps(f)
     def wrapper(*args, **kwargs):
@@ -44,8 +47,15 @@ def validate_csrf(f):
             # get cookie and header
             cookie_val = request.cookies.get(current_app.config['CSRF_COOKIE'])
             header_val = request.headers.get(current_app.config['CSRF_HEADER'])
-            # missing or mismatch -> forbidden
-            if not cookie_val or not header_val or cookie_val != header_val:
+            # missing or mismatch -> forbidden (compare bytes: compare_digest rejects non-ASCII str)
+            if not cookie_val or not header_val or not hmac.compare_digest(cookie_val.encode(), header_val.encode()):
                 return jsonify({"msg": "CSRF validation failed"}), 403
+
+            signer = getattr(current_app, "csrf_signer", None)
+            if signer is not None:
+                refresh = request.cookies.get(current_app.config['REFRESH_COOKIE'])
+                payload = current_app.token_manager.decode_fast(refresh, expect_type="refresh") if refresh else None
+                if not payload or not signer.verify(header_val, payload.get("jti")):
+                    return jsonify({"msg": "CSRF validation failed"}), 403
         return f(*args, **kwargs)
     return wrapper
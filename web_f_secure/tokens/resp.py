@@ -0,0 +1,139 @@
+# tokens/resp.py
+# Minimal Redis-protocol (RESP2) client with connection pooling and pipelining.
+# Only the standard library is used so the Redis backend has no extra dependency.
+
+import queue
+import socket
+from contextlib import contextmanager
+
+class RedisError(Exception):
+    """Protocol or connection failure talking to the server."""
+
+class ResponseError(RedisError):
+    """Error reply (-ERR ...) from the server; the connection stays usable."""
+
+def _encode_command(args):
+    """Encode one command as a RESP array of bulk strings."""
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode()
+        else:
+            data = str(arg).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+class RedisConnection:
+    """
+    One TCP connection speaking RESP2.
+    - execute(): single command round trip.
+    - pipeline(): send many commands in one write, then read all replies.
+    """
+
+    def __init__(self, host="127.0.0.1", port=6379, db=0, password=None, timeout=5.0):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if password:
+            self.execute("AUTH", password)
+        if db:
+            self.execute("SELECT", db)
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise RedisError("connection closed by server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            return ResponseError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            size = int(body)
+            if size < 0:
+                return None
+            data = self._reader.read(size + 2)
+            return data[:-2].decode()
+        if kind == b"*":
+            size = int(body)
+            if size < 0:
+                return None
+            return [self._read_reply() for _ in range(size)]
+        raise RedisError(f"unknown reply type: {line!r}")
+
+    def pipeline(self, commands):
+        """Send all commands at once, return replies in order; raise the first error reply."""
+        self._sock.sendall(b"".join(_encode_command(cmd) for cmd in commands))
+        replies = [self._read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, ResponseError):
+                raise reply
+        return replies
+
+    def execute(self, *args):
+        return self.pipeline([args])[0]
+
+    def close(self):
+        try:
+            self._reader.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+class RedisPool:
+    """
+    Bounded pool of RedisConnection objects shared by request threads.
+    Connections that fail with a socket/protocol error are discarded, not reused.
+    """
+
+    def __init__(self, host="127.0.0.1", port=6379, db=0, password=None, max_connections=10, timeout=5.0):
+        self._options = {"host": host, "port": port, "db": db, "password": password, "timeout": timeout}
+        self._idle = queue.LifoQueue()
+        self._slots = queue.Queue()
+        for _ in range(max_connections):
+            self._slots.put(None)
+
+    @contextmanager
+    def connection(self):
+        # wait for a free slot, reuse an idle connection if available
+        self._slots.get()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+        try:
+            if conn is None:
+                conn = RedisConnection(**self._options)
+            yield conn
+        except ResponseError:
+            # all replies were read, the connection can go back to the pool
+            raise
+        except (OSError, RedisError):
+            # socket/protocol errors leave unread data behind -> discard connection
+            if conn is not None:
+                conn.close()
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._idle.put(conn)
+            self._slots.put(None)
+
+    def execute(self, *args):
+        with self.connection() as conn:
+            return conn.execute(*args)
+
+    def pipeline(self, commands):
+        with self.connection() as conn:
+            return conn.pipeline(commands)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
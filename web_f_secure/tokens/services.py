@@ -5,13 +5,26 @@
 from flask import jsonify, make_response
 from .utils import gen_random_string, hash_token_hmac
 
+def issue_csrf_token(app, jti):
+    """
+    CSRF token for a refresh jti.
+    - Stateless mode (app.csrf_signer): HMAC over (jti, time bucket), nothing stored.
+    - Otherwise: random value persisted via token_store.store_csrf_for_jti.
+    """
+    signer = getattr(app, "csrf_signer", None)
+    if signer is not None:
+        return signer.issue(jti)
+    csrf_val = gen_random_string(24)
+    app.token_store.store_csrf_for_jti(jti, csrf_val)
+    return csrf_val
+
 def handle_login(app, username, password):
     """
     Business logic for login:
     - Validate credentials (demo check here).
     - Generate token pair using app.token_manager.
     - Store hashed refresh token in app.token_store.
-    - Create CSRF token and map it to refresh jti.
+    - Create CSRF token bound to refresh jti (stateless HMAC, or csrf_map row).
     - Return Flask response with cookies set.
     """
     # simple demo validation; in production use password hash verify
@@ -25,9 +38,8 @@ def handle_login(app, username, password):
     refresh_hash = hash_token_hmac(refresh_token, app.config['REFRESH_TOKEN_SALT'])
     app.token_store.insert_refresh(refresh_jti, username, refresh_hash, app.token_manager.refresh_exp_ts())
 
-    # create CSRF token and map to jti
-    csrf_val = gen_random_string(24)
-    app.token_store.store_csrf_for_jti(refresh_jti, csrf_val)
+    # create CSRF token bound to jti
+    csrf_val = issue_csrf_token(app, refresh_jti)
 
     # build response and set cookies
     resp = make_response(jsonify({"msg": "logged in"}))
@@ -40,15 +52,14 @@ def handle_refresh(app, refresh_cookie):
     """
     Business logic for refreshing:
     - Rotate refresh token safely using TokenManager.rotate_refresh.
-    - On success, store new CSRF and set new cookies.
+    - On success, issue new CSRF and set new cookies.
     """
     result = app.token_manager.rotate_refresh(refresh_cookie, app.token_store)
     if not result["ok"]:
         return jsonify({"msg": result["msg"]}), 401
 
     new_access, new_refresh, new_jti = result["tokens"]
-    csrf_val = gen_random_string(24)
-    app.token_store.store_csrf_for_jti(new_jti, csrf_val)
+    csrf_val = issue_csrf_token(app, new_jti)
 
     resp = make_response(jsonify({"msg": "token refreshed"}))
     resp.set_cookie(app.config['ACCESS_COOKIE'], new_access, httponly=True, secure=app.config['COOKIE_SECURE'], samesite=app.config['COOKIE_SAMESITE'])
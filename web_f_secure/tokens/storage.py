@@ -2,9 +2,12 @@
 # Abstraction layer for user and token storage.
 # Token storage pakai SQLite, user storage sederhana (bisa dipindahkan ke DB juga).
 
+import atexit
+import logging
 import sqlite3
+import threading
 import time
-from werkzeug.security import generate_password_hash, check_password_hash
+from .storage_base import BaseTokenStore
 
 # SQL schema untuk dua tabel utama:
 # - refresh_tokens: menyimpan token refresh yang aktif
@@ -25,21 +28,85 @@ CREATE TABLE IF NOT EXISTS csrf_map (
 );
 """
 
-class TokenStore:
+# Migrasi schema berurutan; versi disimpan di PRAGMA user_version.
+# Tambahkan entry baru di akhir list (jangan ubah entry lama).
+MIGRATIONS = [
+    # 1: index untuk revoke_all_for_user & purge berdasarkan expiry / revoked
     """
-    Abstraksi penyimpanan user + refresh token.
+    CREATE INDEX IF NOT EXISTS idx_refresh_tokens_username ON refresh_tokens (username);
+    CREATE INDEX IF NOT EXISTS idx_refresh_tokens_expires_at ON refresh_tokens (expires_at);
+    CREATE INDEX IF NOT EXISTS idx_refresh_tokens_revoked ON refresh_tokens (revoked, created_at);
+    """,
+]
+
+logger = logging.getLogger(__name__)
+
+SQL_INSERT_REFRESH = """
+    INSERT OR REPLACE INTO refresh_tokens
+    (jti, username, token_hash, created_at, expires_at, revoked)
+    VALUES (?, ?, ?, ?, ?, 0)
+"""
+SQL_MARK_REVOKED = "UPDATE refresh_tokens SET revoked = 1 WHERE jti = ?"
+SQL_STORE_CSRF = "INSERT OR REPLACE INTO csrf_map (jti, csrf_value) VALUES (?, ?)"
+
+# Purge per chunk (LIMIT) agar lock writer tidak ditahan lama
+SQL_PURGE_EXPIRED = """
+    DELETE FROM refresh_tokens WHERE id IN (
+        SELECT id FROM refresh_tokens WHERE expires_at < ? LIMIT ?
+    )
+"""
+SQL_PURGE_REVOKED = """
+    DELETE FROM refresh_tokens WHERE id IN (
+        SELECT id FROM refresh_tokens WHERE revoked = 1 AND created_at < ? LIMIT ?
+    )
+"""
+SQL_PURGE_CSRF_ORPHANS = """
+    DELETE FROM csrf_map WHERE rowid IN (
+        SELECT c.rowid FROM csrf_map c
+        LEFT JOIN refresh_tokens r ON r.jti = c.jti
+        WHERE r.jti IS NULL LIMIT ?
+    )
+"""
+
+class TokenStore(BaseTokenStore):
+    """
+    Backend SQLite untuk penyimpanan user + refresh token (lihat BaseTokenStore).
     - User disimpan di memori (dict), karena ini hanya contoh.
     - Refresh token disimpan di SQLite agar mudah dirotasi dan direvoke.
+    - write_behind=True: insert_refresh, mark_revoked & store_csrf_for_jti diantrikan
+      dan di-flush dalam satu transaksi setiap flush_interval_ms atau flush_max_rows.
+      Pembacaan tetap melihat data yang belum di-flush (overlay di memori).
     """
 
-    def __init__(self, db_path="tokens.db"):
+    def __init__(self, db_path="tokens.db", write_behind=False, flush_interval_ms=50, flush_max_rows=100,
+                 shared_state=False):
+        super().__init__()
         # path DB untuk token
         self.db_path = db_path
-        # penyimpanan user sederhana di memori
-        self.users = {}
+        # True jika file DB dipakai beberapa proses (mis. gunicorn multi-worker)
+        self.shared_state = shared_state
         # inisialisasi DB schema
         self._init_db()
 
+        # state write-behind
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_rows = flush_max_rows
+        self._pending = []              # antrian (seq, sql, params) belum di-flush
+        self._seq = 0                   # nomor urut mutasi terakhir
+        self._overlay_refresh = {}      # jti -> (seq, record) hasil insert_refresh belum di-flush
+        self._overlay_revoked = {}      # jti -> seq mark_revoked belum di-flush
+        self._overlay_csrf = {}         # jti -> (seq, csrf_value) belum di-flush
+        self._cv = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+
+        if write_behind:
+            self._flusher = threading.Thread(target=self._flush_loop, name="token-store-flush", daemon=True)
+            self._flusher.start()
+            # pastikan antrian tersisa ditulis saat proses berhenti
+            atexit.register(self.close)
+
     def _conn(self):
         """Membuka koneksi SQLite (check_same_thread=False agar aman di dev server multi-thread)."""
         return sqlite3.connect(self.db_path, check_same_thread=False)
@@ -48,27 +115,74 @@ class TokenStore:
         """Membuat tabel jika belum ada."""
         with self._conn() as conn:
             conn.executescript(SCHEMA)
+            self._migrate(conn)
+
+    def _migrate(self, conn):
+        """Jalankan migrasi yang belum diterapkan (berdasarkan PRAGMA user_version)."""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+            conn.executescript(script)
+            conn.execute(f"PRAGMA user_version = {number}")
 
     # -----------------------------
-    # Bagian User Management
+    # Bagian Write-Behind Queue
     # -----------------------------
 
-    def create_user(self, username, password):
-        """
-        Registrasi user baru.
-        - Untuk production, sebaiknya user juga disimpan di DB.
-        """
-        if username in self.users:
-            return False
-        self.users[username] = generate_password_hash(password)
-        return True
+    def _enqueue(self, sql, params):
+        """Antrikan satu mutasi; return nomor urutnya. Caller wajib memegang self._cv."""
+        self._seq += 1
+        self._pending.append((self._seq, sql, params))
+        if len(self._pending) >= self.flush_max_rows:
+            self._cv.notify()
+        return self._seq
 
-    def verify_user(self, username, password):
-        """
-        Verifikasi login user.
-        - Return True jika username ada dan password cocok.
-        """
-        return username in self.users and check_password_hash(self.users[username], password)
+    def _flush_loop(self):
+        """Thread background: flush setiap flush_interval atau saat antrian penuh."""
+        while True:
+            with self._cv:
+                if not self._closed and len(self._pending) < self.flush_max_rows:
+                    self._cv.wait(self.flush_interval)
+                if self._closed:
+                    return
+            self.flush()
+
+    def flush(self):
+        """Tulis semua mutasi yang tertunda dalam satu transaksi."""
+        with self._flush_lock:
+            with self._cv:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            try:
+                with self._conn() as conn:
+                    for _, sql, params in batch:
+                        conn.execute(sql, params)
+            except sqlite3.Error:
+                # gagal tulis → kembalikan ke depan antrian untuk dicoba lagi
+                logger.exception("TokenStore flush failed, %d writes re-queued", len(batch))
+                with self._cv:
+                    self._pending = batch + self._pending
+                return 0
+
+            # data sudah ada di DB → hapus overlay yang tercakup batch ini
+            last_seq = batch[-1][0]
+            with self._cv:
+                for overlay in (self._overlay_refresh, self._overlay_csrf):
+                    for jti in [j for j, (seq, _) in overlay.items() if seq <= last_seq]:
+                        del overlay[jti]
+                for jti in [j for j, seq in self._overlay_revoked.items() if seq <= last_seq]:
+                    del self._overlay_revoked[jti]
+            return len(batch)
+
+    def close(self):
+        """Hentikan thread flush dan tulis semua mutasi yang tersisa (shutdown)."""
+        if self.write_behind and not self._closed:
+            with self._cv:
+                self._closed = True
+                self._cv.notify()
+            self._flusher.join()
+        self.flush()
 
     # -----------------------------
     # Bagian Refresh Token Management
@@ -81,32 +195,54 @@ class TokenStore:
         - expires_at: epoch integer
         """
         now = int(time.time())
-        with self._conn() as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO refresh_tokens
-                (jti, username, token_hash, created_at, expires_at, revoked)
-                VALUES (?, ?, ?, ?, ?, 0)
-                """,
-                (jti, username, token_hash, now, int(expires_at))
-            )
+        params = (jti, username, token_hash, now, int(expires_at))
+        if self.write_behind:
+            with self._cv:
+                seq = self._enqueue(SQL_INSERT_REFRESH, params)
+                record = {"jti": jti, "username": username, "token_hash": token_hash, "revoked": False}
+                self._overlay_refresh[jti] = (seq, record)
+        else:
+            with self._conn() as conn:
+                conn.execute(SQL_INSERT_REFRESH, params)
+
+        # filter diisi setelah record ada → rebuild_jti_filter tidak melewatkan jti ini
+        self._filter_add(jti)
 
     def get_refresh_by_jti(self, jti):
-        """Ambil data refresh token berdasarkan jti."""
+        """Ambil data refresh token berdasarkan jti (termasuk tulisan yang belum di-flush)."""
+        if self.write_behind:
+            with self._cv:
+                inserted = self._overlay_refresh.get(jti)
+                revoked_seq = self._overlay_revoked.get(jti)
+            if inserted:
+                seq, record = inserted
+                return {**record, "revoked": revoked_seq is not None and revoked_seq > seq}
+        else:
+            revoked_seq = None
+
         with self._conn() as conn:
             c = conn.execute("SELECT jti, username, token_hash, revoked FROM refresh_tokens WHERE jti = ?", (jti,))
             row = c.fetchone()
             if not row:
                 return None
-            return {"jti": row[0], "username": row[1], "token_hash": row[2], "revoked": bool(row[3])}
+            return {"jti": row[0], "username": row[1], "token_hash": row[2],
+                    "revoked": bool(row[3]) or revoked_seq is not None}
 
     def mark_revoked(self, jti):
         """Set revoked=1 pada refresh token tertentu."""
+        if self.write_behind:
+            with self._cv:
+                self._overlay_revoked[jti] = self._enqueue(SQL_MARK_REVOKED, (jti,))
+            return
+
         with self._conn() as conn:
-            conn.execute("UPDATE refresh_tokens SET revoked = 1 WHERE jti = ?", (jti,))
+            conn.execute(SQL_MARK_REVOKED, (jti,))
 
     def revoke_all_for_user(self, username):
         """Revoke semua refresh token milik user (bila terdeteksi reuse/theft)."""
+        # jalur jarang (deteksi pencurian) → flush dulu agar token tertunda ikut direvoke
+        if self.write_behind:
+            self.flush()
         with self._conn() as conn:
             conn.execute("UPDATE refresh_tokens SET revoked = 1 WHERE username = ?", (username,))
 
@@ -116,15 +252,68 @@ class TokenStore:
 
     def store_csrf_for_jti(self, jti, csrf_value):
         """Simpan relasi jti -> csrf_value untuk validasi double-submit."""
+        if self.write_behind:
+            with self._cv:
+                seq = self._enqueue(SQL_STORE_CSRF, (jti, csrf_value))
+                self._overlay_csrf[jti] = (seq, csrf_value)
+            return
+
         with self._conn() as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO csrf_map (jti, csrf_value) VALUES (?, ?)",
-                (jti, csrf_value)
-            )
+            conn.execute(SQL_STORE_CSRF, (jti, csrf_value))
 
     def get_csrf_for_jti(self, jti):
         """Ambil csrf_value untuk jti tertentu."""
+        if self.write_behind:
+            with self._cv:
+                pending = self._overlay_csrf.get(jti)
+            if pending:
+                return pending[1]
+
         with self._conn() as conn:
             c = conn.execute("SELECT csrf_value FROM csrf_map WHERE jti = ?", (jti,))
             row = c.fetchone()
             return row[0] if row else None
+
+    def _known_jtis(self):
+        """jti refresh token yang belum expired, revoked maupun tidak (sumber rebuild Bloom filter)."""
+        with self._conn() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT jti FROM refresh_tokens WHERE expires_at >= ?", (int(time.time()),)
+            )]
+
+    # -----------------------------
+    # Bagian Compaction / Purge
+    # -----------------------------
+
+    def purge_expired(self, batch_size=500, max_batches=None, revoked_retention=86400):
+        """
+        Hapus baris yang tidak dibutuhkan lagi, per chunk berisi batch_size baris:
+        - refresh token yang sudah expired
+        - refresh token revoked yang lebih tua dari revoked_retention detik
+          (reuse token yang sudah dihapus tetap ditolak: jti tidak dikenal → revoke_all)
+        - baris csrf_map yang jti-nya sudah tidak ada di refresh_tokens
+        Return dict jumlah baris terhapus & waktu yang dipakai.
+        """
+        started = time.perf_counter()
+        now = int(time.time())
+        if self.write_behind:
+            self.flush()
+
+        stats = {"refresh_purged": 0, "csrf_purged": 0, "batches": 0}
+        steps = [
+            ("refresh_purged", SQL_PURGE_EXPIRED, lambda: (now, batch_size)),
+            ("refresh_purged", SQL_PURGE_REVOKED, lambda: (now - revoked_retention, batch_size)),
+            ("csrf_purged", SQL_PURGE_CSRF_ORPHANS, lambda: (batch_size,)),
+        ]
+        for key, sql, params in steps:
+            while max_batches is None or stats["batches"] < max_batches:
+                # satu transaksi per chunk → writer lain bisa masuk di antara chunk
+                with self._conn() as conn:
+                    deleted = conn.execute(sql, params()).rowcount
+                stats["batches"] += 1
+                stats[key] += deleted
+                if deleted < batch_size:
+                    break
+
+        stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return stats
@@ -0,0 +1,196 @@
+# tokens/storage_base.py
+# Interface bersama untuk semua backend penyimpanan refresh token.
+# Backend: SQLite (storage.TokenStore), memori ter-shard (storage_memory), Redis (storage_redis).
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from werkzeug.security import generate_password_hash, check_password_hash
+from .bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+class BaseTokenStore(ABC):
+    """
+    Kontrak storage yang dipakai TokenManager & services:
+    - insert_refresh / get_refresh_by_jti / mark_revoked / revoke_all_for_user
+    - store_csrf_for_jti / get_csrf_for_jti
+    - purge_expired (opsional) untuk compaction berkala
+
+    Bagian yang sama untuk semua backend (user di memori, Bloom filter jti,
+    thread compaction) diimplementasikan di sini.
+
+    shared_state=True berarti state dipakai bersama beberapa proses/node
+    (mis. Redis): Bloom filter lokal tidak boleh dipakai karena tidak melihat
+    jti yang dibuat oleh worker lain.
+    """
+
+    shared_state = False
+
+    def __init__(self):
+        # penyimpanan user sederhana di memori
+        self.users = {}
+        # Bloom filter jti aktif (opsional, lihat enable_jti_filter)
+        self.jti_filter = None
+        self._filter_lock = threading.Lock()
+        self._filter_pending = None     # jti yang di-insert selama rebuild berjalan
+
+    # -----------------------------
+    # Bagian User Management
+    # -----------------------------
+
+    def create_user(self, username, password):
+        """
+        Registrasi user baru.
+        - Untuk production, sebaiknya user juga disimpan di DB.
+        """
+        if username in self.users:
+            return False
+        self.users[username] = generate_password_hash(password)
+        return True
+
+    def verify_user(self, username, password):
+        """
+        Verifikasi login user.
+        - Return True jika username ada dan password cocok.
+        """
+        return username in self.users and check_password_hash(self.users[username], password)
+
+    # -----------------------------
+    # Bagian yang wajib diimplementasikan backend
+    # (abstract → backend yang belum lengkap gagal saat dibuat, bukan di tengah request)
+    # -----------------------------
+
+    @abstractmethod
+    def insert_refresh(self, jti, username, token_hash, expires_at):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_refresh_by_jti(self, jti):
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_revoked(self, jti):
+        raise NotImplementedError
+
+    @abstractmethod
+    def revoke_all_for_user(self, username):
+        raise NotImplementedError
+
+    @abstractmethod
+    def store_csrf_for_jti(self, jti, csrf_value):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_csrf_for_jti(self, jti):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _known_jtis(self):
+        """Iterable jti refresh token yang belum expired, termasuk yang revoked (untuk rebuild Bloom filter)."""
+        raise NotImplementedError
+
+    def purge_expired(self, **kwargs):
+        """Hapus data expired/revoked; backend tanpa kebutuhan purge cukup return statistik kosong."""
+        return {"refresh_purged": 0, "csrf_purged": 0, "batches": 0, "elapsed_ms": 0.0}
+
+    def flush(self):
+        """Tulis mutasi tertunda (hanya relevan untuk backend dengan write-behind)."""
+        return 0
+
+    def close(self):
+        """Lepas resource (koneksi, thread) saat shutdown."""
+        self.flush()
+
+    # -----------------------------
+    # Bagian Bloom Filter jti
+    # -----------------------------
+
+    def enable_jti_filter(self, capacity=100_000, fp_rate=0.01):
+        """Aktifkan Bloom filter jti dan isi ulang dari storage (dipanggil saat startup)."""
+        if self.shared_state:
+            logger.warning("%s is shared across workers; jti filter disabled", type(self).__name__)
+            return 0
+        self._filter_capacity = capacity
+        self._filter_fp_rate = fp_rate
+        return self.rebuild_jti_filter()
+
+    def rebuild_jti_filter(self):
+        """
+        Bangun ulang filter dari semua refresh token yang belum expired.
+        jti revoked SENGAJA tetap dimasukkan: reuse token hasil rotasi harus lolos filter
+        agar sampai ke jalur revoke_all_for_user (deteksi pencurian). Bloom filter tidak
+        bisa menghapus item → rebuild berkala membuang jti yang sudah expired/di-purge.
+        """
+        # insert yang terjadi selama snapshot dibaca dicatat lalu ikut masuk filter baru
+        with self._filter_lock:
+            self._filter_pending = set()
+        try:
+            self.flush()
+            jtis = list(self._known_jtis())
+
+            # kapasitas minimal 2x jumlah jti sekarang agar ada ruang untuk token baru
+            new_filter = BloomFilter(max(self._filter_capacity, 2 * len(jtis)), self._filter_fp_rate)
+            for jti in jtis:
+                new_filter.add(jti)
+        except BaseException:
+            with self._filter_lock:
+                self._filter_pending = None
+            raise
+
+        with self._filter_lock:
+            for jti in self._filter_pending:
+                new_filter.add(jti)
+            self._filter_pending = None
+            self.jti_filter = new_filter
+        return len(jtis)
+
+    def might_have_refresh(self, jti):
+        """
+        False → jti pasti tidak dikenal storage (tanpa akses storage).
+        True  → mungkin dikenal (aktif atau revoked), lanjutkan ke get_refresh_by_jti.
+        """
+        if self.jti_filter is None:
+            return True
+        return self.jti_filter.check(jti)
+
+    def jti_filter_stats(self):
+        """Metrik filter (termasuk observed/estimated false-positive rate)."""
+        return self.jti_filter.stats() if self.jti_filter is not None else None
+
+    def _filter_add(self, jti):
+        """Dipanggil SETELAH record tersimpan (atau diantrikan) agar rebuild tidak kehilangan jti."""
+        with self._filter_lock:
+            if self.jti_filter is not None:
+                self.jti_filter.add(jti)
+            if self._filter_pending is not None:
+                self._filter_pending.add(jti)
+
+    # -----------------------------
+    # Bagian Compaction
+    # -----------------------------
+
+    def start_compaction(self, interval_s=3600, **purge_kwargs):
+        """Jalankan purge_expired secara berkala di thread background."""
+        self._compaction_stop = threading.Event()
+
+        def loop():
+            while not self._compaction_stop.wait(interval_s):
+                try:
+                    stats = self.purge_expired(**purge_kwargs)
+                    logger.info("%s compaction: %s", type(self).__name__, stats)
+                    # buang jti yang sudah revoked/expired dari Bloom filter
+                    if self.jti_filter is not None:
+                        self.rebuild_jti_filter()
+                except Exception:
+                    logger.exception("%s compaction failed", type(self).__name__)
+
+        thread = threading.Thread(target=loop, name="token-store-compaction", daemon=True)
+        thread.start()
+        return thread
+
+    def stop_compaction(self):
+        """Hentikan thread compaction (bila berjalan)."""
+        stop = getattr(self, "_compaction_stop", None)
+        if stop is not None:
+            stop.set()
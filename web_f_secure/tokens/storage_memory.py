@@ -0,0 +1,135 @@
+# tokens/storage_memory.py
+# Backend refresh token murni di memori, dibagi ke beberapa shard.
+# Cocok untuk test & deployment satu proses; tiap shard punya lock sendiri
+# sehingga request paralel jarang saling menunggu.
+
+import threading
+import time
+import zlib
+from .storage_base import BaseTokenStore
+
+class _Shard:
+    """Satu partisi data: refresh token per jti, index jti per user, dan csrf map."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.refresh = {}       # jti -> {"jti", "username", "token_hash", "revoked", "created_at", "expires_at"}
+        self.by_user = {}       # username -> set(jti) yang berada di shard ini
+        self.csrf = {}          # jti -> csrf_value
+
+class MemoryTokenStore(BaseTokenStore):
+    """
+    Implementasi BaseTokenStore di memori proses.
+    - jti dipetakan ke shard dengan crc32(jti) % shards.
+    - revoke_all_for_user memakai index username → set(jti) per shard (tanpa full scan).
+    """
+
+    def __init__(self, shards=16):
+        super().__init__()
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+
+    def _shard(self, jti):
+        return self._shards[zlib.crc32(jti.encode()) % len(self._shards)]
+
+    # -----------------------------
+    # Bagian Refresh Token Management
+    # -----------------------------
+
+    def insert_refresh(self, jti, username, token_hash, expires_at):
+        """Simpan data refresh token (menimpa jti yang sama, revoked di-reset)."""
+        shard = self._shard(jti)
+        record = {"jti": jti, "username": username, "token_hash": token_hash, "revoked": False,
+                  "created_at": int(time.time()), "expires_at": int(expires_at)}
+        with shard.lock:
+            old = shard.refresh.get(jti)
+            if old and old["username"] != username:
+                shard.by_user.get(old["username"], set()).discard(jti)
+            shard.refresh[jti] = record
+            shard.by_user.setdefault(username, set()).add(jti)
+        self._filter_add(jti)
+
+    def get_refresh_by_jti(self, jti):
+        """Ambil data refresh token berdasarkan jti."""
+        shard = self._shard(jti)
+        with shard.lock:
+            rec = shard.refresh.get(jti)
+            if not rec:
+                return None
+            return {"jti": rec["jti"], "username": rec["username"],
+                    "token_hash": rec["token_hash"], "revoked": rec["revoked"]}
+
+    def mark_revoked(self, jti):
+        """Set revoked pada refresh token tertentu."""
+        shard = self._shard(jti)
+        with shard.lock:
+            rec = shard.refresh.get(jti)
+            if rec:
+                rec["revoked"] = True
+
+    def revoke_all_for_user(self, username):
+        """Revoke semua refresh token milik user di seluruh shard."""
+        for shard in self._shards:
+            with shard.lock:
+                for jti in shard.by_user.get(username, ()):
+                    shard.refresh[jti]["revoked"] = True
+
+    # -----------------------------
+    # Bagian CSRF Mapping (optional)
+    # -----------------------------
+
+    def store_csrf_for_jti(self, jti, csrf_value):
+        """Simpan relasi jti -> csrf_value untuk validasi double-submit."""
+        shard = self._shard(jti)
+        with shard.lock:
+            shard.csrf[jti] = csrf_value
+
+    def get_csrf_for_jti(self, jti):
+        """Ambil csrf_value untuk jti tertentu."""
+        shard = self._shard(jti)
+        with shard.lock:
+            return shard.csrf.get(jti)
+
+    # -----------------------------
+    # Bagian Filter & Compaction
+    # -----------------------------
+
+    def _known_jtis(self):
+        now = int(time.time())
+        jtis = []
+        for shard in self._shards:
+            with shard.lock:
+                jtis.extend(jti for jti, rec in shard.refresh.items() if rec["expires_at"] >= now)
+        return jtis
+
+    def purge_expired(self, batch_size=500, max_batches=None, revoked_retention=86400):
+        """
+        Sama seperti TokenStore.purge_expired: hapus token expired, token revoked
+        yang lebih tua dari revoked_retention, dan csrf yatim — satu shard per batch.
+        """
+        started = time.perf_counter()
+        now = int(time.time())
+        stats = {"refresh_purged": 0, "csrf_purged": 0, "batches": 0}
+
+        for shard in self._shards:
+            if max_batches is not None and stats["batches"] >= max_batches:
+                break
+            with shard.lock:
+                dead = [jti for jti, rec in shard.refresh.items()
+                        if rec["expires_at"] < now
+                        or (rec["revoked"] and rec["created_at"] < now - revoked_retention)]
+                for jti in dead[:batch_size]:
+                    rec = shard.refresh.pop(jti)
+                    users = shard.by_user.get(rec["username"])
+                    if users is not None:
+                        users.discard(jti)
+                        if not users:
+                            del shard.by_user[rec["username"]]
+                orphans = [jti for jti in shard.csrf if jti not in shard.refresh][:batch_size]
+                for jti in orphans:
+                    del shard.csrf[jti]
+            stats["batches"] += 1
+            stats["refresh_purged"] += min(len(dead), batch_size)
+            stats["csrf_purged"] += len(orphans)
+
+        stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return stats
@@ -0,0 +1,173 @@
+# tokens/storage_redis.py
+# Backend refresh token di Redis (atau server lain yang bicara protokol Redis).
+# State dipakai bersama semua worker/node → refresh token bisa di-scale horizontal.
+# Untuk development/test jalankan fake_redis.FakeRedisServer sebagai pengganti Redis.
+
+import time
+from werkzeug.security import generate_password_hash, check_password_hash
+from .resp import RedisPool
+from .storage_base import BaseTokenStore
+
+class RedisTokenStore(BaseTokenStore):
+    """
+    Implementasi BaseTokenStore di atas Redis.
+    Layout key (semua diawali prefix):
+    - {prefix}rt:{jti}         hash refresh token, EXPIREAT = expires_at (Redis yang membuang token expired)
+    - {prefix}user:{username}  set jti milik user (index untuk revoke_all_for_user)
+    - {prefix}csrf:{jti}       string csrf_value, TTL sama dengan refresh token
+    - {prefix}users            hash username -> password hash (dipakai bersama semua worker)
+    Mutasi yang terdiri dari beberapa perintah dikirim dalam satu pipeline (satu round trip).
+    """
+
+    shared_state = True
+
+    def __init__(self, host="127.0.0.1", port=6379, db=0, password=None, prefix="tok:",
+                 max_connections=10, timeout=5.0, csrf_ttl=7 * 86400):
+        super().__init__()
+        self.prefix = prefix
+        # TTL csrf map bila jti tidak punya refresh token yang diketahui
+        self.csrf_ttl = csrf_ttl
+        self.pool = RedisPool(host=host, port=port, db=db, password=password,
+                              max_connections=max_connections, timeout=timeout)
+
+    def _rt(self, jti):
+        return f"{self.prefix}rt:{jti}"
+
+    def _user(self, username):
+        return f"{self.prefix}user:{username}"
+
+    def _csrf(self, jti):
+        return f"{self.prefix}csrf:{jti}"
+
+    def close(self):
+        self.pool.close()
+
+    # -----------------------------
+    # Bagian User Management
+    # -----------------------------
+
+    def create_user(self, username, password):
+        """Registrasi user baru (HSETNX → aman walau dua worker mendaftarkan nama yang sama)."""
+        added = self.pool.execute("HSETNX", f"{self.prefix}users", username, generate_password_hash(password))
+        return added == 1
+
+    def verify_user(self, username, password):
+        """Verifikasi login user terhadap hash password di Redis."""
+        pw_hash = self.pool.execute("HGET", f"{self.prefix}users", username)
+        return pw_hash is not None and check_password_hash(pw_hash, password)
+
+    # -----------------------------
+    # Bagian Refresh Token Management
+    # -----------------------------
+
+    def insert_refresh(self, jti, username, token_hash, expires_at):
+        """Simpan refresh token + index user dalam satu pipeline."""
+        key, user_key = self._rt(jti), self._user(username)
+        expires_at = int(expires_at)
+        self.pool.pipeline([
+            ("DEL", key),
+            ("HSET", key, "username", username, "token_hash", token_hash, "revoked", 0,
+             "created_at", int(time.time()), "expires_at", expires_at),
+            ("EXPIREAT", key, expires_at),
+            ("SADD", user_key, jti),
+            # index user hidup selama token yang paling lama berlaku: set expiry bila belum
+            # ada (NX), selain itu hanya diperpanjang (GT) — token berumur pendek tidak boleh
+            # memperpendek index (revoke_all_for_user akan kehilangan token lain). Redis >= 7.0.
+            ("EXPIREAT", user_key, expires_at, "NX"),
+            ("EXPIREAT", user_key, expires_at, "GT"),
+        ])
+        self._filter_add(jti)
+
+    def get_refresh_by_jti(self, jti):
+        """Ambil data refresh token berdasarkan jti."""
+        flat = self.pool.execute("HGETALL", self._rt(jti))
+        rec = dict(zip(flat[::2], flat[1::2]))
+        if "username" not in rec:
+            return None
+        return {"jti": jti, "username": rec["username"],
+                "token_hash": rec["token_hash"], "revoked": rec["revoked"] == "1"}
+
+    def _revoke_many(self, jtis):
+        """
+        Tandai revoked tanpa membuat ulang key yang sudah expired:
+        baca expires_at dulu, lalu HSET + EXPIREAT ke nilai yang sama. Jika key expired
+        di antara dua pipeline, hash sisa langsung kedaluwarsa lagi.
+        """
+        jtis = list(jtis)
+        if not jtis:
+            return
+        expiries = self.pool.pipeline([("HGET", self._rt(jti), "expires_at") for jti in jtis])
+        commands = []
+        for jti, expires_at in zip(jtis, expiries):
+            if expires_at is None:
+                continue
+            commands.append(("HSET", self._rt(jti), "revoked", 1))
+            commands.append(("EXPIREAT", self._rt(jti), expires_at))
+        if commands:
+            self.pool.pipeline(commands)
+
+    def mark_revoked(self, jti):
+        """Set revoked pada refresh token tertentu."""
+        self._revoke_many([jti])
+
+    def revoke_all_for_user(self, username):
+        """Revoke semua refresh token milik user (lewat index set, tanpa SCAN)."""
+        self._revoke_many(self.pool.execute("SMEMBERS", self._user(username)))
+
+    # -----------------------------
+    # Bagian CSRF Mapping (optional)
+    # -----------------------------
+
+    def store_csrf_for_jti(self, jti, csrf_value):
+        """Simpan relasi jti -> csrf_value; TTL mengikuti refresh token bila ada."""
+        expires_at = self.pool.execute("HGET", self._rt(jti), "expires_at")
+        ttl = int(expires_at) - int(time.time()) if expires_at is not None else self.csrf_ttl
+        self.pool.execute("SET", self._csrf(jti), csrf_value, "EX", max(1, ttl))
+
+    def get_csrf_for_jti(self, jti):
+        """Ambil csrf_value untuk jti tertentu."""
+        return self.pool.execute("GET", self._csrf(jti))
+
+    # -----------------------------
+    # Bagian Filter & Compaction
+    # -----------------------------
+
+    def _scan(self, pattern, count=500):
+        cursor = "0"
+        while True:
+            cursor, keys = self.pool.execute("SCAN", cursor, "MATCH", pattern, "COUNT", count)
+            yield from keys
+            if cursor == "0":
+                return
+
+    def _known_jtis(self):
+        # key expired sudah dibuang Redis lewat TTL → semua key yang tersisa masih berlaku
+        rt_prefix = self._rt("")
+        return [key[len(rt_prefix):] for key in self._scan(rt_prefix + "*")]
+
+    def purge_expired(self, batch_size=500, max_batches=None, revoked_retention=86400):
+        """
+        Token expired & csrf sudah dibuang Redis lewat TTL; yang tersisa hanya
+        merapikan index user (jti yang key-nya sudah hilang), satu pipeline per batch.
+        Token revoked tetap disimpan sampai expired (revoked_retention tidak dipakai).
+        """
+        started = time.perf_counter()
+        stats = {"refresh_purged": 0, "csrf_purged": 0, "batches": 0}
+        user_keys = list(self._scan(self._user("") + "*", count=batch_size))
+
+        for start in range(0, len(user_keys), batch_size):
+            if max_batches is not None and stats["batches"] >= max_batches:
+                break
+            chunk = user_keys[start:start + batch_size]
+            members = self.pool.pipeline([("SMEMBERS", key) for key in chunk])
+            pairs = [(key, jti) for key, jtis in zip(chunk, members) for jti in jtis]
+            if pairs:
+                exists = self.pool.pipeline([("EXISTS", self._rt(jti)) for _, jti in pairs])
+                dead = [("SREM", key, jti) for (key, jti), alive in zip(pairs, exists) if not alive]
+                if dead:
+                    self.pool.pipeline(dead)
+                stats["refresh_purged"] += len(dead)
+            stats["batches"] += 1
+
+        stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return stats
@@ -2,11 +2,59 @@
 # Core JWT handling: create token pairs, decode/verify, rotate refresh tokens.
 # Uses PyJWT (pip install PyJWT). Designed to be single-responsibility.
 
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import threading
+import time
 import jwt                        # PyJWT library
+from collections import OrderedDict
 from datetime import datetime
 from .utils import gen_random_string, hash_token_hmac
 from .config import Config        # fallback config if needed
 
+def _b64url_decode(segment):
+    """Same padding rules as PyJWT's base64url_decode."""
+    data = segment.encode("ascii")
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+class _VerifiedCache:
+    """
+    Small LRU of recently verified tokens: token string -> payload.
+    Entries are dropped once the token's exp has passed.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token, now):
+        with self._lock:
+            payload = self._entries.get(token)
+            if payload is None:
+                return None
+            if payload["exp"] <= now:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return payload
+
+    def put(self, token, payload):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[token] = payload
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
 class TokenManager:
     """
     TokenManager handles creation and verification of access and refresh tokens.
@@ -14,7 +62,7 @@ class TokenManager:
     - Refresh rotation logic provided via rotate_refresh(store).
     """
 
-    def __init__(self, secret_key=None, issuer=None, salt=None):
+    def __init__(self, secret_key=None, issuer=None, salt=None, verify_cache_size=1024):
         # secret key for signing tokens; fallback to Config.SECRET_KEY if not provided
         self.secret = secret_key or Config.SECRET_KEY
         # issuer claim for tokens
@@ -26,6 +74,12 @@ class TokenManager:
         # lifetime deltas from Config
         self.access_delta = Config.ACCESS_EXPIRES
         self.refresh_delta = Config.REFRESH_EXPIRES
+        # pre-keyed HMAC state for decode_fast (copied per token instead of re-keying)
+        self._mac = hmac.new(self.secret.encode(), digestmod=hashlib.sha256)
+        # recently verified tokens for decode_fast
+        self._verified = _VerifiedCache(verify_cache_size)
+        # header segments already seen as {"alg": HS256, ...} (our tokens share one header)
+        self._known_headers = set()
 
     def _base_claims(self, sub, token_type="access", delta=None, jti=None):
         """
@@ -83,6 +137,63 @@ class TokenManager:
             # signature invalid or tampered
             return None
 
+    def decode_fast(self, token, expect_type=None):
+        """
+        Same result as decode(token, expect_type), specialized for our own HS256 tokens:
+        - recently verified tokens are served from a small cache (exp re-checked);
+        - signature is checked with the pre-keyed HMAC, claims with plain comparisons.
+        Anything outside the shape create_token_pair produces (other alg, float exp,
+        aud/nbf claims, non-string sub/jti, ...) is handed to decode() so edge cases
+        keep PyJWT's exact semantics.
+        """
+        if not isinstance(token, str):
+            return self.decode(token, expect_type)
+        now = time.time()
+
+        payload = self._verified.get(token, now)
+        if payload is None:
+            if token.count(".") != 2 or not token.isascii():
+                return self.decode(token, expect_type)
+            header_b64, payload_b64, signature_b64 = token.split(".")
+            try:
+                if header_b64 not in self._known_headers:
+                    header = json.loads(_b64url_decode(header_b64))
+                    if not isinstance(header, dict):
+                        return None
+                    if header.get("alg") != self.alg:
+                        return self.decode(token, expect_type)
+                    if len(self._known_headers) < 16:
+                        self._known_headers.add(header_b64)
+                payload = json.loads(_b64url_decode(payload_b64))
+                if not isinstance(payload, dict):
+                    return None
+                signature = _b64url_decode(signature_b64)
+            except (ValueError, binascii.Error):
+                # PyJWT raises DecodeError for the same inputs
+                return None
+
+            mac = self._mac.copy()
+            mac.update(f"{header_b64}.{payload_b64}".encode("ascii"))
+            if not hmac.compare_digest(mac.digest(), signature):
+                return None
+
+            exp, iat = payload.get("exp"), payload.get("iat", 0)
+            if (type(exp) is not int or type(iat) is not int
+                    or "nbf" in payload or "aud" in payload
+                    or not isinstance(payload.get("sub", ""), str)
+                    or not isinstance(payload.get("jti", ""), str)):
+                return self.decode(token, expect_type)
+            if exp <= now or iat > now:
+                return None
+            self._verified.put(token, payload)
+
+        # validate issuer & token type (same order as decode)
+        if payload.get("iss") != self.issuer:
+            return None
+        if expect_type and payload.get("type") != expect_type:
+            return None
+        return dict(payload)
+
     def refresh_exp_ts(self):
         """
         Helper returning epoch timestamp when a new refresh token will expire.
@@ -114,11 +225,23 @@ class TokenManager:
         jti = decoded.get("jti")
         username = decoded.get("sub")
 
+        # in-memory filter: a miss means storage has never seen this jti (or it has
+        # expired) -> reject without touching storage (no read, no revoke-all write).
+        # Revoked jtis stay in the filter across rebuilds, so reuse of a rotated token
+        # still passes and is handled by the revoke-all path below.
+        if not store.might_have_refresh(jti):
+            return {"ok": False, "msg": "refresh token not recognized", "tokens": None}
+
         # lookup in storage by jti
         rec = store.get_refresh_by_jti(jti)
         # compute hash (must use same salt)
         token_hash = hash_token_hmac(refresh_token, self.salt)
 
+        # filter said "maybe" but storage has no record at all -> false positive
+        # (a revoked record is a true hit: the filter holds revoked jtis on purpose)
+        if store.jti_filter is not None and not rec:
+            store.jti_filter.record_false_positive()
+
         # if no record -> possible reuse/forgery: revoke all sessions for user
         if not rec:
             if username: